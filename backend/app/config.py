@@ -0,0 +1,17 @@
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+load_dotenv(PROJECT_ROOT / ".env")
+DATA_ROOT = Path(os.getenv("ICU_DATA_ROOT", PROJECT_ROOT / "data" / "mimic-iii-clinical-database-demo-1.4"))
+FULL_DATA_PATH = DATA_ROOT / "full_medical_data_clean.csv"
+ALERTS_PATH = DATA_ROOT / "alert_episodes.csv"
+MODEL_PATH = DATA_ROOT / "risk_model_v2.pkl"
+RISK_HISTORY_PATH = DATA_ROOT / "risk_history.npy"
+# JSON list of ICU units (see app/units.py); unset means a single unit over DATA_ROOT.
+UNITS_CONFIG_PATH = Path(os.environ["ICU_UNITS_CONFIG"]) if os.getenv("ICU_UNITS_CONFIG") else None
+FRONTEND_ROOT = PROJECT_ROOT / "frontend"
+ML_ROOT = PROJECT_ROOT / "ml"
@@ -3,81 +3,43 @@ from __future__ import annotations
 import asyncio
 import os
 import smtplib
+import threading
+import time
 from collections import deque
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from pathlib import Path
-from typing import Any
-
-import joblib
-import numpy as np
-import pandas as pd
-from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
+from typing import TYPE_CHECKING, Any
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
-
-
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-load_dotenv(PROJECT_ROOT / ".env")
-DATA_ROOT = PROJECT_ROOT / "data" / "mimic-iii-clinical-database-demo-1.4"
-FULL_DATA_PATH = DATA_ROOT / "full_medical_data_clean.csv"
-ALERTS_PATH = DATA_ROOT / "patient_alerts.csv"
-MODEL_PATH = DATA_ROOT / "risk_model_v2.pkl"
-FRONTEND_ROOT = PROJECT_ROOT / "frontend"
-
-DEFAULT_COLUMNS = [
-    "subject_id",
-    "charttime",
-    "heart_rate",
-    "bp_mean",
-    "spo2",
-    "temp",
-    "creatinine",
-    "lactate",
-    "wbc",
-]
-
-SAFE_BOUNDS = {
-    "heart_rate": (35.0, 190.0),
-    "bp_mean": (40.0, 135.0),
-    "spo2": (72.0, 100.0),
-    "temp": (34.0, 41.0),
-    "creatinine": (0.3, 8.0),
-    "lactate": (0.3, 9.5),
-    "wbc": (1.0, 35.0),
-}
-
-
-def clean_numeric(df: pd.DataFrame, col: str) -> pd.Series:
-    if col not in df.columns:
-        return pd.Series([np.nan] * len(df))
-    series = pd.to_numeric(df[col], errors="coerce")
-    lo, hi = SAFE_BOUNDS.get(col, (-np.inf, np.inf))
-    return series.clip(lower=lo, upper=hi)
-
-
-def normalize_risk(probability: float) -> str:
-    if probability >= 0.86:
-        return "critical"
-    if probability >= 0.7:
-        return "high"
-    if probability >= 0.4:
-        return "medium"
-    return "low"
+from pydantic import BaseModel
 
+from .config import FRONTEND_ROOT, UNITS_CONFIG_PATH
+from .static_assets import Asset, StaticAssetCache
 
-@dataclass
-class Snapshot:
-    last_refreshed: str
-    summary: dict[str, Any]
-    rows: list[dict[str, Any]]
-    by_id: dict[int, dict[str, Any]]
-    timeline: dict[int, list[dict[str, Any]]]
-    alerts: list[dict[str, Any]]
+if TYPE_CHECKING:
+    # pandas, NumPy and joblib load with the repository module on first use, not at import.
+    from .repository import ICURepository, Snapshot
+    from .units import UnitRegistry
+
+
+class FeatureVector(BaseModel):
+    hr_avg: float
+    bp_avg: float
+    spo2_avg: float
+    temp_avg: float
+    hr_trend: float
+    creatinine: float
+    lactate: float
+    wbc: float
+    spo2_missing: int = 0
+    temp_missing: int = 0
+
+
+class ScoreRequest(BaseModel):
+    items: list[FeatureVector]
 
 
 @dataclass
@@ -90,218 +52,15 @@ class NotificationEvent:
     message: str
 
 
-class ICURepository:
-    def __init__(self) -> None:
-        self.model = self._load_model()
-        self.snapshot: Snapshot | None = None
-
-    @staticmethod
-    def _load_model() -> Any | None:
-        if MODEL_PATH.exists():
-            try:
-                return joblib.load(MODEL_PATH)
-            except Exception:
-                return None
-        return None
-
-    @staticmethod
-    def _load_frame(path: Path) -> pd.DataFrame:
-        if not path.exists():
-            raise FileNotFoundError(f"Expected file was not found: {path}")
-        return pd.read_csv(path)
-
-    def _feature_frame(self, g: pd.DataFrame) -> pd.DataFrame:
-        g = g.sort_values("charttime")
-        last = g.tail(3)
-        row = {
-            "hr_avg": float(last["heart_rate"].mean()),
-            "bp_avg": float(last["bp_mean"].mean()),
-            "spo2_avg": float(last["spo2"].mean()),
-            "temp_avg": float(last["temp"].mean()),
-            "hr_trend": float(last["heart_rate"].iloc[-1] - last["heart_rate"].iloc[-2]),
-            "creatinine": float(last["creatinine"].iloc[-1]),
-            "lactate": float(last["lactate"].iloc[-1]),
-            "wbc": float(last["wbc"].iloc[-1]),
-            "spo2_missing": int(pd.isna(last["spo2"].iloc[-1])),
-            "temp_missing": int(pd.isna(last["temp"].iloc[-1])),
-        }
-        return pd.DataFrame([row])
-
-    def _hybrid_risk(self, features: pd.DataFrame, latest: pd.Series) -> float:
-        ml_prob = None
-        if self.model is not None:
-            try:
-                ml_prob = float(self.model.predict_proba(features)[0][1])
-            except Exception:
-                ml_prob = None
-
-        rule_penalty = 0.0
-        hr = latest["heart_rate"]
-        bp = latest["bp_mean"]
-        spo2 = latest["spo2"]
-        lac = latest["lactate"]
-
-        if pd.notna(hr):
-            if hr > 120:
-                rule_penalty += 0.2
-            elif hr < 50:
-                rule_penalty += 0.15
-        if pd.notna(bp):
-            if bp < 60:
-                rule_penalty += 0.25
-            elif bp > 110:
-                rule_penalty += 0.1
-        if pd.notna(spo2) and spo2 < 90:
-            rule_penalty += 0.2
-        if pd.notna(lac) and lac > 2.2:
-            rule_penalty += 0.15
-
-        rule_prob = min(0.98, max(0.02, 0.12 + rule_penalty))
-        if ml_prob is None:
-            return rule_prob
-        return float(np.clip((0.68 * ml_prob) + (0.32 * rule_prob), 0.01, 0.99))
-
-    def build_snapshot(self) -> Snapshot:
-        df = self._load_frame(FULL_DATA_PATH)
-        for col in DEFAULT_COLUMNS:
-            if col not in df.columns:
-                df[col] = np.nan
-
-        df["charttime"] = pd.to_datetime(df["charttime"], errors="coerce")
-        df = df.dropna(subset=["subject_id", "charttime"])
-        df["subject_id"] = pd.to_numeric(df["subject_id"], errors="coerce").astype("Int64")
-        df = df.dropna(subset=["subject_id"])
-        df["subject_id"] = df["subject_id"].astype(int)
-
-        for col in ["heart_rate", "bp_mean", "spo2", "temp", "creatinine", "lactate", "wbc"]:
-            df[col] = clean_numeric(df, col)
-
-        timeline: dict[int, list[dict[str, Any]]] = {}
-        rows: list[dict[str, Any]] = []
-
-        grouped = df.sort_values(["subject_id", "charttime"]).groupby("subject_id")
-        for subject_id, g in grouped:
-            if len(g) < 3:
-                continue
-
-            latest = g.iloc[-1]
-            features = self._feature_frame(g)
-            risk_prob = self._hybrid_risk(features, latest)
-            risk_tier = normalize_risk(risk_prob)
-            trend = float(features["hr_trend"].iloc[0])
-
-            reasons = []
-            if pd.notna(latest["heart_rate"]) and latest["heart_rate"] > 120:
-                reasons.append("tachycardia")
-            if pd.notna(latest["bp_mean"]) and latest["bp_mean"] < 60:
-                reasons.append("hypotension")
-            if pd.notna(latest["spo2"]) and latest["spo2"] < 90:
-                reasons.append("hypoxemia")
-            if pd.notna(latest["lactate"]) and latest["lactate"] > 2.2:
-                reasons.append("elevated lactate")
-            if not reasons:
-                reasons.append("monitoring")
-
-            row = {
-                "subject_id": subject_id,
-                "updated_at": latest["charttime"].isoformat(),
-                "risk_probability": round(risk_prob, 4),
-                "risk_tier": risk_tier,
-                "risk_reasons": reasons,
-                "heart_rate": None if pd.isna(latest["heart_rate"]) else round(float(latest["heart_rate"]), 1),
-                "bp_mean": None if pd.isna(latest["bp_mean"]) else round(float(latest["bp_mean"]), 1),
-                "spo2": None if pd.isna(latest["spo2"]) else round(float(latest["spo2"]), 1),
-                "temp": None if pd.isna(latest["temp"]) else round(float(latest["temp"]), 1),
-                "creatinine": None if pd.isna(latest["creatinine"]) else round(float(latest["creatinine"]), 2),
-                "lactate": None if pd.isna(latest["lactate"]) else round(float(latest["lactate"]), 2),
-                "wbc": None if pd.isna(latest["wbc"]) else round(float(latest["wbc"]), 2),
-                "heart_rate_trend": round(trend, 2),
-            }
-            rows.append(row)
-
-            # Keep small timeline payload for efficient frontend rendering.
-            tail = g.tail(12)
-            timeline[subject_id] = [
-                {
-                    "charttime": t.isoformat(),
-                    "heart_rate": None if pd.isna(hr) else round(float(hr), 1),
-                    "bp_mean": None if pd.isna(bp) else round(float(bp), 1),
-                    "spo2": None if pd.isna(spo2) else round(float(spo2), 1),
-                    "temp": None if pd.isna(temp) else round(float(temp), 1),
-                }
-                for t, hr, bp, spo2, temp in zip(
-                    tail["charttime"],
-                    tail["heart_rate"],
-                    tail["bp_mean"],
-                    tail["spo2"],
-                    tail["temp"],
-                )
-            ]
-
-        rows.sort(key=lambda x: x["risk_probability"], reverse=True)
-        by_id = {r["subject_id"]: r for r in rows}
-
-        critical = sum(1 for r in rows if r["risk_tier"] == "critical")
-        high = sum(1 for r in rows if r["risk_tier"] == "high")
-        medium = sum(1 for r in rows if r["risk_tier"] == "medium")
-        low = sum(1 for r in rows if r["risk_tier"] == "low")
-        avg_risk = round(float(np.mean([r["risk_probability"] for r in rows])) if rows else 0.0, 4)
-
-        alerts = []
-        if ALERTS_PATH.exists():
-            try:
-                alerts_df = pd.read_csv(ALERTS_PATH)
-                for _, row in alerts_df.tail(60).iterrows():
-                    sid = int(row.get("subject_id")) if pd.notna(row.get("subject_id")) else None
-                    if sid is None:
-                        continue
-                    alerts.append(
-                        {
-                            "subject_id": sid,
-                            "charttime": str(row.get("charttime", "")),
-                            "alert": str(row.get("alert", "Clinical alert")).strip() or "Clinical alert",
-                            "risk_tier": by_id.get(sid, {}).get("risk_tier", "medium"),
-                            "alert_heart_rate": None
-                            if pd.isna(row.get("heart_rate"))
-                            else float(row.get("heart_rate")),
-                            "alert_bp_mean": None
-                            if pd.isna(row.get("bp_mean"))
-                            else float(row.get("bp_mean")),
-                        }
-                    )
-            except Exception:
-                alerts = []
-
-        summary = {
-            "patients_monitored": len(rows),
-            "critical_count": critical,
-            "high_count": high,
-            "medium_count": medium,
-            "low_count": low,
-            "average_risk": avg_risk,
-        }
-
-        return Snapshot(
-            last_refreshed=datetime.now(UTC).isoformat(),
-            summary=summary,
-            rows=rows,
-            by_id=by_id,
-            timeline=timeline,
-            alerts=alerts,
-        )
-
-    def get_snapshot(self, force: bool = False) -> Snapshot:
-        if force or self.snapshot is None:
-            self.snapshot = self.build_snapshot()
-        return self.snapshot
-
-
 class NotificationEngine:
     def __init__(self) -> None:
         self.enabled = os.getenv("ENABLE_EMAIL_ALERTS", "true").lower() == "true"
         self.sender = os.getenv("EMAIL_USER")
         self.password = os.getenv("EMAIL_PASS")
         self.recipients = [e.strip() for e in os.getenv("EMAIL_TO", "").split(",") if e.strip()]
+        self.smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
+        self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
+        self.smtp_starttls = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
         self.cooldown_minutes = int(os.getenv("ALERT_COOLDOWN_MINUTES", "30"))
         self.minimum_tier = os.getenv("ALERT_MINIMUM_TIER", "critical").lower()
         self.minimum_prob = float(os.getenv("ALERT_MINIMUM_PROBABILITY", "0.85"))
@@ -377,8 +136,9 @@ This alert was generated automatically by ICU Intelligence.
 
         msg = self._build_message(row)
         try:
-            server = smtplib.SMTP("smtp.gmail.com", 587, timeout=15)
-            server.starttls()
+            server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=15)
+            if self.smtp_starttls:
+                server.starttls()
             server.login(self.sender, self.password)
             server.sendmail(self.sender, self.recipients, msg.as_string())
             server.quit()
@@ -426,7 +186,44 @@ This alert was generated automatically by ICU Intelligence.
         }
 
 
-repo = ICURepository()
+@dataclass
+class StartupProgress:
+    phase: str = "starting"
+    error: str | None = None
+    started_at: str | None = None
+    phase_seconds: dict[str, float] = field(default_factory=dict)
+    _started: float = field(default_factory=time.perf_counter)
+    _phase_started: float = field(default_factory=time.perf_counter)
+
+    def begin(self) -> None:
+        self.started_at = datetime.now(UTC).isoformat()
+        self._started = self._phase_started = time.perf_counter()
+
+    def enter(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phase_seconds[self.phase] = round(now - self._phase_started, 4)
+        self.phase = phase
+        self._phase_started = now
+
+    def info(self) -> dict[str, Any]:
+        return {
+            "phase": self.phase,
+            "started_at": self.started_at,
+            "seconds_since_start": round(time.perf_counter() - self._started, 4),
+            "phase_seconds": dict(self.phase_seconds),
+            "error": self.error,
+        }
+
+
+# Seconds between checks for finished unit builds and units due for a refresh.
+UNIT_POLL_SECONDS = 1.0
+RISK_TIERS = "^(critical|high|medium|low)$"
+
+units: UnitRegistry | None = None
+_units_lock = threading.Lock()
+repo: ICURepository | None = None
+_repo_lock = threading.Lock()
+startup = StartupProgress()
 notifier = NotificationEngine()
 app = FastAPI(title="ICU Intelligence API", version="2.0.0")
 
@@ -437,24 +234,93 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-if FRONTEND_ROOT.exists():
-    app.mount("/assets", StaticFiles(directory=str(FRONTEND_ROOT)), name="assets")
+assets = StaticAssetCache(FRONTEND_ROOT)
+
+
+def get_repo() -> ICURepository:
+    """The default unit's repository, created on first use; the import pulls in pandas, NumPy and joblib."""
+    global repo
+    if repo is None:
+        with _repo_lock:
+            if repo is None:
+                repo = get_units().default_repository
+    return repo
+
+
+def get_units() -> UnitRegistry:
+    """Create the unit registry, one repository per configured unit, on first use."""
+    global units
+    if units is None:
+        with _units_lock:
+            if units is None:
+                from .units import UnitRegistry, load_unit_configs
+
+                configs = load_unit_configs(UNITS_CONFIG_PATH, float(os.getenv("ALERT_SCAN_INTERVAL_SECONDS", "20")))
+                units = UnitRegistry(configs, workers=int(os.getenv("UNIT_BUILD_WORKERS", "0")) or None)
+    return units
+
+
+def unit_repo(unit: str) -> ICURepository:
+    repository = get_units().get(unit)
+    if repository is None:
+        raise HTTPException(status_code=404, detail="Unit not found")
+    return repository
+
+
+def current_snapshot(force: bool = False) -> Snapshot:
+    return get_repo().get_snapshot(force=force)
+
+
+def snapshot_view(repository: ICURepository, at: datetime | None) -> Snapshot:
+    """The live snapshot, or what it showed at ``at`` when a time is given."""
+    if at is None:
+        return repository.get_snapshot()
+    try:
+        return repository.snapshot_at(at)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
+def warm_start() -> None:
+    """Import, load the models and build every unit's first snapshot, recording time spent in each phase."""
+    try:
+        startup.enter("importing")
+        registry = get_units()
+        get_repo()
+        startup.enter("loading_model")
+        registry.load_models(float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "10")))
+        startup.enter("building_snapshot")
+        registry.build_all()
+        startup.enter("ready")
+    except Exception as exc:
+        startup.error = f"{type(exc).__name__}: {exc}"
+        startup.enter("failed")
 
 
 async def monitor_and_notify() -> None:
-    interval_seconds = int(os.getenv("ALERT_SCAN_INTERVAL_SECONDS", "20"))
+    await asyncio.to_thread(warm_start)
+    # The warm-up snapshots serve the first scan; after that each unit is rebuilt on its own
+    # cadence and every finished build is scanned once.
+    snaps = [] if units is None else [r.snapshot for r in units.repositories.values() if r.snapshot is not None]
     while True:
         try:
-            snap = repo.get_snapshot(force=True)
-            await notifier.process_snapshot(snap)
+            for snap in snaps:
+                await notifier.process_snapshot(snap)
+            registry = await asyncio.to_thread(get_units)
+            snaps = await asyncio.to_thread(registry.poll)
+            if startup.phase == "failed" and registry.ready():
+                startup.error = None
+                startup.enter("ready")
         except Exception:
             # Keep monitor running even if one cycle fails.
-            pass
-        await asyncio.sleep(interval_seconds)
+            snaps = []
+        await asyncio.sleep(UNIT_POLL_SECONDS)
 
 
 @app.on_event("startup")
 async def startup_monitor() -> None:
+    startup.begin()
+    assets.load()
     app.state.monitor_task = asyncio.create_task(monitor_and_notify())
 
 
@@ -463,6 +329,12 @@ async def shutdown_monitor() -> None:
     task = getattr(app.state, "monitor_task", None)
     if task:
         task.cancel()
+    if units is not None:
+        units.shutdown()
+    elif repo is not None:
+        repo.stop_model_watcher()
+        repo.inference.stop()
+        repo.risk_history.flush(force=True)
 
 
 @app.get("/api/health")
@@ -470,19 +342,47 @@ def health() -> dict[str, Any]:
     return {"status": "ok", "time": datetime.now(UTC).isoformat()}
 
 
-@app.get("/api/summary")
-def summary() -> dict[str, Any]:
-    snap = repo.get_snapshot()
-    return {"last_refreshed": snap.last_refreshed, "summary": snap.summary}
+@app.get("/api/ready")
+def ready(response: Response) -> dict[str, Any]:
+    # Readiness never triggers loading itself; it reports whether the default unit's snapshot can be
+    # served yet. Other units report their own state, so one unit's bad feed does not take the API down.
+    snap = repo.snapshot if repo is not None else None
+    if snap is None:
+        response.status_code = 503
+    return {
+        "ready": snap is not None,
+        "units_ready": None if units is None else {n: r.snapshot is not None for n, r in units.repositories.items()},
+        "last_refreshed": None if snap is None else snap.last_refreshed,
+        "startup": startup.info(),
+    }
 
 
-@app.get("/api/patients")
-def list_patients(
-    risk: str | None = Query(default=None, pattern="^(critical|high|medium|low)$"),
-    search: str | None = None,
-    limit: int = Query(default=120, ge=1, le=500),
-) -> dict[str, Any]:
-    snap = repo.get_snapshot()
+def summary_payload(repository: ICURepository) -> dict[str, Any]:
+    snap = repository.get_snapshot()
+    return {
+        "last_refreshed": snap.last_refreshed,
+        "summary": snap.summary,
+        "model_version": snap.model_version,
+        "model_loaded_at": snap.model_loaded_at,
+    }
+
+
+def snapshot_payload(repository: ICURepository, at: datetime | None, limit: int, alerts: int) -> dict[str, Any]:
+    snap = snapshot_view(repository, at)
+    recent = snap.alerts[-alerts:] if alerts else []
+    return {
+        "last_refreshed": snap.last_refreshed,
+        "as_of": snap.as_of,
+        "model_version": snap.model_version,
+        "summary": snap.summary,
+        "count": len(snap.rows),
+        "items": snap.rows[:limit],
+        "alerts": recent[::-1],
+    }
+
+
+def patients_payload(repository: ICURepository, risk: str | None, search: str | None, limit: int) -> dict[str, Any]:
+    snap = repository.get_snapshot()
     rows = snap.rows
 
     if risk:
@@ -500,31 +400,183 @@ def list_patients(
     return {"count": len(rows), "items": rows[:limit]}
 
 
-@app.get("/api/patients/{subject_id}")
-def patient_detail(subject_id: int) -> dict[str, Any]:
-    snap = repo.get_snapshot()
+def patient_payload(repository: ICURepository, subject_id: int, at: datetime | None) -> dict[str, Any]:
+    snap = snapshot_view(repository, at)
     patient = snap.by_id.get(subject_id)
     if patient is None:
         raise HTTPException(status_code=404, detail="Patient not found")
 
     return {
+        "as_of": snap.as_of,
         "patient": patient,
         "timeline": snap.timeline.get(subject_id, []),
     }
 
 
-@app.get("/api/alerts/live")
-def live_alerts(limit: int = Query(default=20, ge=1, le=100)) -> dict[str, Any]:
-    snap = repo.get_snapshot()
+def risk_history_payload(repository: ICURepository, subject_id: int, limit: int) -> dict[str, Any]:
+    # Each live snapshot records its scores: make sure the first one exists.
+    repository.get_snapshot()
+    points = repository.risk_trajectory(subject_id)
+    if points is None:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    points = points[-limit:]
+    return {"subject_id": subject_id, "count": len(points), "items": points}
+
+
+def alerts_payload(repository: ICURepository, limit: int) -> dict[str, Any]:
+    snap = repository.get_snapshot()
     alerts = snap.alerts[-limit:]
     alerts.reverse()
     return {"count": len(alerts), "items": alerts}
 
 
+def reload_payload(repository: ICURepository) -> dict[str, Any]:
+    # Model deserialization happens on a background thread; the data refresh uses the active model.
+    scheduled = repository.request_model_reload()
+    snap = repository.get_snapshot(force=True)
+    return {
+        "status": "reloaded",
+        "last_refreshed": snap.last_refreshed,
+        "model_version": snap.model_version,
+        "model_reload": "scheduled" if scheduled else "in_progress",
+    }
+
+
+# Routes without a unit serve the default unit (the first configured one).
+
+
+@app.get("/api/summary")
+def summary() -> dict[str, Any]:
+    return summary_payload(get_repo())
+
+
+@app.get("/api/snapshot")
+def snapshot(
+    at: datetime | None = None,
+    limit: int = Query(default=120, ge=1, le=500),
+    alerts: int = Query(default=20, ge=0, le=100),
+) -> dict[str, Any]:
+    """Summary, highest-risk patients and latest alerts, now or as of ``at``."""
+    return snapshot_payload(get_repo(), at, limit, alerts)
+
+
+@app.get("/api/patients")
+def list_patients(
+    risk: str | None = Query(default=None, pattern=RISK_TIERS),
+    search: str | None = None,
+    limit: int = Query(default=120, ge=1, le=500),
+) -> dict[str, Any]:
+    return patients_payload(get_repo(), risk, search, limit)
+
+
+@app.get("/api/patients/{subject_id}")
+def patient_detail(subject_id: int, at: datetime | None = None) -> dict[str, Any]:
+    return patient_payload(get_repo(), subject_id, at)
+
+
+@app.get("/api/patients/{subject_id}/risk-history")
+def patient_risk_history(subject_id: int, limit: int = Query(default=96, ge=1, le=10000)) -> dict[str, Any]:
+    return risk_history_payload(get_repo(), subject_id, limit)
+
+
+@app.get("/api/alerts/live")
+def live_alerts(limit: int = Query(default=20, ge=1, le=100)) -> dict[str, Any]:
+    return alerts_payload(get_repo(), limit)
+
+
+@app.get("/api/units")
+def list_units() -> dict[str, Any]:
+    """Every unit's state and summary, plus totals added up from those summaries."""
+    registry = get_units()
+    return {"default": registry.default, "summary": registry.summary(), "units": registry.info()}
+
+
+@app.get("/api/units/{unit}/summary")
+def unit_summary(unit: str) -> dict[str, Any]:
+    return summary_payload(unit_repo(unit))
+
+
+@app.get("/api/units/{unit}/snapshot")
+def unit_snapshot(
+    unit: str,
+    at: datetime | None = None,
+    limit: int = Query(default=120, ge=1, le=500),
+    alerts: int = Query(default=20, ge=0, le=100),
+) -> dict[str, Any]:
+    return snapshot_payload(unit_repo(unit), at, limit, alerts)
+
+
+@app.get("/api/units/{unit}/patients")
+def unit_patients(
+    unit: str,
+    risk: str | None = Query(default=None, pattern=RISK_TIERS),
+    search: str | None = None,
+    limit: int = Query(default=120, ge=1, le=500),
+) -> dict[str, Any]:
+    return patients_payload(unit_repo(unit), risk, search, limit)
+
+
+@app.get("/api/units/{unit}/patients/{subject_id}")
+def unit_patient_detail(unit: str, subject_id: int, at: datetime | None = None) -> dict[str, Any]:
+    return patient_payload(unit_repo(unit), subject_id, at)
+
+
+@app.get("/api/units/{unit}/patients/{subject_id}/risk-history")
+def unit_patient_risk_history(
+    unit: str, subject_id: int, limit: int = Query(default=96, ge=1, le=10000)
+) -> dict[str, Any]:
+    return risk_history_payload(unit_repo(unit), subject_id, limit)
+
+
+@app.get("/api/units/{unit}/alerts/live")
+def unit_alerts(unit: str, limit: int = Query(default=20, ge=1, le=100)) -> dict[str, Any]:
+    return alerts_payload(unit_repo(unit), limit)
+
+
+@app.post("/api/units/{unit}/reload")
+def unit_reload(unit: str) -> dict[str, Any]:
+    return reload_payload(unit_repo(unit))
+
+
 @app.post("/api/reload")
 def reload_data() -> dict[str, Any]:
-    snap = repo.get_snapshot(force=True)
-    return {"status": "reloaded", "last_refreshed": snap.last_refreshed}
+    return reload_payload(get_repo())
+
+
+@app.get("/api/metrics")
+def metrics() -> dict[str, Any]:
+    repository = get_repo()
+    snap = repository.snapshot
+    return {
+        "time": datetime.now(UTC).isoformat(),
+        "startup": startup.info(),
+        "model": repository.model_info(),
+        "inference": repository.inference.metrics(),
+        "score_cache": repository.score_cache.stats(),
+        "as_of_cache": repository.as_of_cache.stats(),
+        "risk_history": repository.risk_history.stats(),
+        "units": None if units is None else units.info(),
+        "snapshot": None
+        if snap is None
+        else {
+            "last_refreshed": snap.last_refreshed,
+            "patients": snap.summary["patients_monitored"],
+            "model_version": snap.model_version,
+            "model_loaded_at": snap.model_loaded_at,
+        },
+    }
+
+
+@app.post("/api/score")
+async def score_features(payload: ScoreRequest) -> dict[str, Any]:
+    repository = await asyncio.to_thread(get_repo)
+    version, probs = await repository.score_rows([item.model_dump() for item in payload.items])
+    if probs is None:
+        raise HTTPException(status_code=503, detail="Risk model not loaded")
+    return {
+        "model_version": version,
+        "items": [{"ml_probability": round(float(p), 4)} for p in probs],
+    }
 
 
 @app.get("/api/notifications/status")
@@ -537,7 +589,7 @@ async def alerts_ws(ws: WebSocket) -> None:
     await ws.accept()
     try:
         while True:
-            snap = repo.get_snapshot()
+            snap = await asyncio.to_thread(current_snapshot)
             payload = {
                 "timestamp": datetime.now(UTC).isoformat(),
                 "summary": snap.summary,
@@ -549,25 +601,37 @@ async def alerts_ws(ws: WebSocket) -> None:
         return
 
 
+def asset_response(request: Request, asset: Asset) -> Response:
+    encoding = assets.negotiate(asset, request.headers.get("accept-encoding"))
+    headers = assets.headers(asset, encoding, request.query_params.get("v"))
+    if assets.not_modified(asset, request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=asset.variants[encoding], media_type=asset.media_type, headers=headers)
+
+
 @app.get("/")
-def home() -> FileResponse:
-    index_file = FRONTEND_ROOT / "index.html"
-    if not index_file.exists():
+def home(request: Request) -> Response:
+    index = assets.index
+    if index is None:
         raise HTTPException(status_code=404, detail="Frontend not found")
-    return FileResponse(index_file)
+    return asset_response(request, index)
+
+
+@app.get("/assets/{file_path:path}")
+def asset_files(request: Request, file_path: str) -> Response:
+    asset = assets.get(file_path)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return asset_response(request, asset)
 
 
 @app.get("/{file_path:path}")
-def frontend_files(file_path: str) -> FileResponse:
+def frontend_files(request: Request, file_path: str) -> Response:
     if file_path.startswith("api/") or file_path.startswith("ws/"):
         raise HTTPException(status_code=404, detail="Not found")
 
-    target = FRONTEND_ROOT / file_path
-    if target.exists() and target.is_file():
-        return FileResponse(target)
-
-    # SPA fallback for deep links.
-    index_file = FRONTEND_ROOT / "index.html"
-    if index_file.exists():
-        return FileResponse(index_file)
-    raise HTTPException(status_code=404, detail="Frontend not found")
+    # SPA fallback for deep links, served from memory like every other asset.
+    asset = assets.get(file_path) or assets.index
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Frontend not found")
+    return asset_response(request, asset)
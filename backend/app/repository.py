@@ -0,0 +1,774 @@
+"""Snapshot data layer: census loading, feature extraction, model lifecycle and scoring.
+
+Kept apart from main.py so that importing the API does not pull in pandas, NumPy,
+joblib or the model; main.py imports this module on first use.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import joblib
+import numpy as np
+import pandas as pd
+from pandas.errors import OutOfBoundsDatetime
+
+from .config import ALERTS_PATH, FULL_DATA_PATH, ML_ROOT, MODEL_PATH, RISK_HISTORY_PATH
+from .risk_history import RiskHistory
+
+# Shared clinical logic lives with the ML pipeline scripts.
+sys.path.append(str(ML_ROOT))
+from clinical_rules import CLINICAL_RULES, RuleResult  # noqa: E402
+from features import FEATURE_COLUMNS, WINDOW, features_at  # noqa: E402
+from inference_service import InferenceService  # noqa: E402
+from schema import read_typed_csv, widen_floats  # noqa: E402
+
+
+DEFAULT_COLUMNS = [
+    "subject_id",
+    "charttime",
+    "heart_rate",
+    "bp_mean",
+    "spo2",
+    "temp",
+    "creatinine",
+    "lactate",
+    "wbc",
+]
+
+# Observations per patient in the snapshot's timeline payload.
+TIMELINE_POINTS = 12
+
+SAFE_BOUNDS = {
+    "heart_rate": (35.0, 190.0),
+    "bp_mean": (40.0, 135.0),
+    "spo2": (72.0, 100.0),
+    "temp": (34.0, 41.0),
+    "creatinine": (0.3, 8.0),
+    "lactate": (0.3, 9.5),
+    "wbc": (1.0, 35.0),
+}
+
+
+def clean_numeric(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series([np.nan] * len(df))
+    series = pd.to_numeric(df[col], errors="coerce")
+    lo, hi = SAFE_BOUNDS.get(col, (-np.inf, np.inf))
+    return series.clip(lower=lo, upper=hi)
+
+
+def normalize_risk(probability: float) -> str:
+    if probability >= 0.86:
+        return "critical"
+    if probability >= 0.7:
+        return "high"
+    if probability >= 0.4:
+        return "medium"
+    return "low"
+
+
+def _rounded(values: pd.Series, digits: int) -> list[float | None]:
+    """round() of each value, None where missing; computed once per distinct value."""
+    codes, uniques = pd.factorize(values)
+    rounded = [round(v, digits) for v in uniques.tolist()] + [None]
+    # Missing values have code -1, which picks the trailing None.
+    return [rounded[code] for code in codes.tolist()]
+
+
+def _duration_label(span: pd.Timedelta) -> str:
+    minutes = int(span.total_seconds() // 60)
+    return f"{minutes // 60}h" if minutes % 60 == 0 else f"{minutes}min"
+
+
+def _isoformat(times: pd.Series) -> list[str]:
+    """Timestamp.isoformat() of each value, formatted once per distinct time."""
+    codes, uniques = pd.factorize(times)
+    text = [t.isoformat() for t in uniques]
+    return [text[code] for code in codes.tolist()]
+
+
+@dataclass
+class Snapshot:
+    last_refreshed: str
+    summary: dict[str, Any]
+    rows: list[dict[str, Any]]
+    by_id: dict[int, dict[str, Any]]
+    timeline: dict[int, list[dict[str, Any]]]
+    alerts: list[dict[str, Any]]
+    model_version: str | None = None
+    model_loaded_at: str | None = None
+    # Set on historical views: the start of the as-of bucket they were computed for.
+    as_of: str | None = None
+    # The live snapshot's sorted observations, which historical views are computed from.
+    history: PatientHistory | None = field(default=None, repr=False)
+
+
+@dataclass(frozen=True)
+class PatientHistory:
+    """Observations sorted by (subject_id, charttime) with each patient's row range.
+
+    A patient's rows are contiguous and time-sorted, so its last row at or before
+    a time is one ``searchsorted`` within ``starts[i]:ends[i]``.
+    """
+
+    frame: pd.DataFrame
+    starts: np.ndarray
+    ends: np.ndarray
+    times: np.ndarray  # charttime as int64 nanoseconds
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> PatientHistory:
+        subject = df["subject_id"].to_numpy()
+        new_group = np.ones(len(subject), dtype=bool)
+        new_group[1:] = subject[1:] != subject[:-1]
+        starts = np.flatnonzero(new_group)
+        ends = np.append(starts[1:], len(subject))
+        times = df["charttime"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        return cls(frame=df, starts=starts, ends=ends, times=times)
+
+    def positions_at(self, at: pd.Timestamp | None) -> np.ndarray:
+        """Row of each patient's last observation at or before ``at`` (the latest when None).
+
+        Patients with fewer than WINDOW observations by then are left out.
+        """
+        if at is None:
+            last = self.ends - 1
+        else:
+            # searchsorted(side="right") in every patient's range at once: a binary search
+            # over all ranges in lockstep, about log2(longest stay) vectorised steps.
+            target = pd.Timestamp(at).as_unit("ns").value
+            lo, hi = self.starts.copy(), self.ends.copy()
+            active = lo < hi
+            while active.any():
+                mid = (lo + hi) // 2
+                before = np.zeros(len(mid), dtype=bool)
+                before[active] = self.times[mid[active]] <= target
+                lo = np.where(before, mid + 1, lo)
+                hi = np.where(active & ~before, mid, hi)
+                active = lo < hi
+            last = lo - 1
+        return last[last - self.starts >= WINDOW - 1]
+
+    def tail_positions(self, positions: np.ndarray, points: int) -> np.ndarray:
+        """Up to ``points`` rows ending at each position, patient by patient in time order."""
+        starts = self.starts[np.searchsorted(self.starts, positions, side="right") - 1]
+        window = positions[:, None] + np.arange(1 - points, 1)
+        return window[window >= starts[:, None]]
+
+
+class SnapshotCache:
+    """LRU of historical snapshots keyed by as-of bucket, for one live snapshot at a time."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.entries: OrderedDict[int, Snapshot] = OrderedDict()
+        self.generation: str | None = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, generation: str, bucket: int) -> Snapshot | None:
+        with self._lock:
+            if generation != self.generation:
+                # The live snapshot was rebuilt (new data or model): every view is stale.
+                self.entries.clear()
+                self.generation = generation
+            snap = self.entries.get(bucket)
+            if snap is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(bucket)
+            self.hits += 1
+            return snap
+
+    def put(self, generation: str, bucket: int, snap: Snapshot) -> None:
+        with self._lock:
+            if generation != self.generation or self.capacity <= 0:
+                return
+            self.entries[bucket] = snap
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+@dataclass(frozen=True)
+class ModelState:
+    model: Any | None = None
+    version: str | None = None
+    loaded_at: str | None = None
+    load_seconds: float | None = None
+    fingerprint: tuple[int, int] | None = None
+    # Contents of the model's metadata file (risk_model_v2.json) when it describes this payload.
+    metadata: dict[str, Any] | None = None
+
+
+@dataclass
+class ModelReloadStats:
+    succeeded: int = 0
+    failed: int = 0
+    unchanged: int = 0
+    last_error: str | None = None
+    last_attempt: str | None = None
+    history: deque[dict[str, Any]] = field(default_factory=lambda: deque(maxlen=20))
+
+
+class ScoreCache:
+    """LRU of model probabilities keyed by (model version, hash of the feature vector)."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.entries: OrderedDict[tuple[str | None, int], float] = OrderedDict()
+        self.model_version: str | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def feature_keys(features: pd.DataFrame) -> np.ndarray:
+        return pd.util.hash_pandas_object(features[FEATURE_COLUMNS], index=False).to_numpy()
+
+    def lookup(self, version: str | None, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return cached probabilities (NaN where missing) and the indices that still need scoring."""
+        probs = np.full(len(keys), np.nan)
+        with self._lock:
+            if version != self.model_version:
+                # New model version: every cached score is stale.
+                self.entries.clear()
+                self.model_version = version
+            for i, key in enumerate(keys.tolist()):
+                value = self.entries.get((version, key))
+                if value is not None:
+                    self.entries.move_to_end((version, key))
+                    probs[i] = value
+            hit = ~np.isnan(probs)
+            self.hits += int(hit.sum())
+            self.misses += int((~hit).sum())
+        return probs, np.flatnonzero(~hit)
+
+    def store(self, version: str | None, keys: np.ndarray, probs: np.ndarray) -> None:
+        with self._lock:
+            if version != self.model_version:
+                return
+            for key, prob in zip(keys.tolist(), probs.tolist()):
+                self.entries[(version, key)] = prob
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "capacity": self.capacity,
+            "model_version": self.model_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class ICURepository:
+    def __init__(
+        self,
+        full_data_path: Path = FULL_DATA_PATH,
+        alerts_path: Path = ALERTS_PATH,
+        model_path: Path = MODEL_PATH,
+        risk_history_path: Path | None = RISK_HISTORY_PATH,
+    ) -> None:
+        self.full_data_path = full_data_path
+        self.alerts_path = alerts_path
+        self.model_path = model_path
+        self.snapshot: Snapshot | None = None
+        self.reload_stats = ModelReloadStats()
+        self._reload_lock = threading.Lock()
+        self._failed_fingerprint: tuple[int, int] | None = None
+        self._watch_stop = threading.Event()
+        self._watch_thread: threading.Thread | None = None
+        self._build_lock = threading.Lock()
+        # The model is loaded by ensure_model (startup warm-up or first snapshot), not here.
+        self.model_state = ModelState()
+        self._model_initialized = False
+        self._model_init_lock = threading.Lock()
+        self.inference = InferenceService(
+            lambda: self.model_state.model,
+            FEATURE_COLUMNS,
+            max_batch_rows=int(os.getenv("INFERENCE_MAX_BATCH_ROWS", "1024")),
+            max_wait_ms=float(os.getenv("INFERENCE_MAX_WAIT_MS", "5")),
+        )
+        # A snapshot build waits at most this long for the model, then falls back to rule-only risk.
+        self.inference_timeout = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "30"))
+        self.score_cache = ScoreCache(int(os.getenv("SCORE_CACHE_SIZE", "200000")))
+        self.as_of_cache = SnapshotCache(int(os.getenv("AS_OF_CACHE_SIZE", "32")))
+        self.as_of_bucket = pd.Timedelta(seconds=int(os.getenv("AS_OF_BUCKET_SECONDS", "60")))
+        # Trajectory of every live snapshot's scores; None as the path keeps it in memory only.
+        self.risk_history = RiskHistory(
+            int(os.getenv("RISK_HISTORY_POINTS", "96")),
+            risk_history_path,
+            flush_seconds=float(os.getenv("RISK_HISTORY_FLUSH_SECONDS", "60")),
+        )
+        self.escalation_window = pd.Timedelta(minutes=int(os.getenv("RISK_ESCALATION_WINDOW_MINUTES", "60")))
+        self.escalation_delta = float(os.getenv("RISK_ESCALATION_DELTA", "0.2"))
+
+    @property
+    def model(self) -> Any | None:
+        return self.model_state.model
+
+    def _model_fingerprint(self) -> tuple[int, int] | None:
+        try:
+            stat = self.model_path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load_model(self) -> ModelState:
+        """Deserialize, validate and warm the model file; raises if it is unusable."""
+        fingerprint = self._model_fingerprint()
+        if fingerprint is None:
+            return ModelState()
+
+        started = time.perf_counter()
+        payload = self.model_path.read_bytes()
+        model = joblib.load(io.BytesIO(payload))
+        if not hasattr(model, "predict_proba"):
+            raise TypeError(f"{type(model).__name__} has no predict_proba")
+
+        # Warm-up batch doubles as validation: one probability pair per row, all in [0, 1].
+        probe = pd.DataFrame(np.zeros((8, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+        probs = np.asarray(model.predict_proba(probe))
+        if probs.shape != (len(probe), 2) or not np.all((probs >= 0) & (probs <= 1)):
+            raise ValueError(f"predict_proba returned unexpected output with shape {probs.shape}")
+
+        digest = hashlib.sha256(payload).hexdigest()
+        metadata = self._read_model_metadata(digest)
+        return ModelState(
+            model=model,
+            version=digest[:12],
+            loaded_at=datetime.now(UTC).isoformat(),
+            load_seconds=round(time.perf_counter() - started, 4),
+            fingerprint=fingerprint,
+            metadata=metadata,
+        )
+
+    def _read_model_metadata(self, digest: str) -> dict[str, Any] | None:
+        """The exporter's metadata for the payload with sha256 ``digest``, or None.
+
+        Metadata written for another payload (a model copied in by hand, or an
+        export caught between its two writes) is ignored; metadata for this payload
+        that names different feature columns makes the model unusable.
+        """
+        path = self.model_path.with_suffix(".json")
+        try:
+            metadata = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(metadata, dict) or metadata.get("sha256") != digest:
+            return None
+        columns = metadata.get("feature_columns")
+        if columns is not None and list(columns) != list(FEATURE_COLUMNS):
+            raise ValueError(f"Model was exported for feature columns {columns}, not {FEATURE_COLUMNS}")
+        return metadata
+
+    def ensure_model(self) -> ModelState:
+        """Load the model once on first use; later changes arrive through reload_model."""
+        if not self._model_initialized:
+            with self._model_init_lock:
+                if not self._model_initialized:
+                    try:
+                        self.model_state = self._load_model()
+                    except Exception as exc:
+                        self.reload_stats.last_error = str(exc)
+                    self._model_initialized = True
+        return self.model_state
+
+    def reload_model(self) -> bool:
+        """Load MODEL_PATH off the request path and swap it in; returns True when the model changed."""
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self.reload_stats.last_attempt = datetime.now(UTC).isoformat()
+            fingerprint = self._model_fingerprint()
+            try:
+                state = self._load_model()
+            except Exception as exc:
+                self._failed_fingerprint = fingerprint
+                self.reload_stats.failed += 1
+                self.reload_stats.last_error = f"{type(exc).__name__}: {exc}"
+                return False
+
+            current = self.model_state
+            if state.version == current.version:
+                self.model_state = replace(current, fingerprint=state.fingerprint)
+                self.reload_stats.unchanged += 1
+                return False
+
+            # Single attribute assignment: readers see either the old or the new model, never a mix.
+            self.model_state = state
+            self._model_initialized = True
+            self.score_cache.clear()
+            self._failed_fingerprint = None
+            self.reload_stats.succeeded += 1
+            self.reload_stats.last_error = None
+            self.reload_stats.history.appendleft(
+                {"version": state.version, "loaded_at": state.loaded_at, "load_seconds": state.load_seconds}
+            )
+            if self.snapshot is not None:
+                self.get_snapshot(force=True)
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def request_model_reload(self) -> bool:
+        """Schedule reload_model on a background thread; False if a reload is already running."""
+        if self._reload_lock.locked():
+            return False
+        threading.Thread(target=self.reload_model, name="model-reload", daemon=True).start()
+        return True
+
+    def _watch_model(self, interval_seconds: float) -> None:
+        while not self._watch_stop.wait(interval_seconds):
+            fingerprint = self._model_fingerprint()
+            if fingerprint is None or fingerprint == self._failed_fingerprint:
+                continue
+            if fingerprint != self.model_state.fingerprint:
+                try:
+                    self.reload_model()
+                except Exception as exc:
+                    # Rescoring failures must not kill the watcher.
+                    self.reload_stats.last_error = f"{type(exc).__name__}: {exc}"
+
+    def start_model_watcher(self, interval_seconds: float) -> None:
+        if interval_seconds <= 0 or (self._watch_thread and self._watch_thread.is_alive()):
+            return
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(
+            target=self._watch_model, args=(interval_seconds,), name="model-watcher", daemon=True
+        )
+        self._watch_thread.start()
+
+    def stop_model_watcher(self) -> None:
+        self._watch_stop.set()
+
+    def model_info(self) -> dict[str, Any]:
+        state = self.model_state
+        return {
+            "loaded": state.model is not None,
+            "path": str(self.model_path),
+            "version": state.version,
+            "loaded_at": state.loaded_at,
+            "load_seconds": state.load_seconds,
+            "metadata": state.metadata,
+            "reload_in_progress": self._reload_lock.locked(),
+            "reloads_succeeded": self.reload_stats.succeeded,
+            "reloads_failed": self.reload_stats.failed,
+            "reloads_unchanged": self.reload_stats.unchanged,
+            "last_reload_attempt": self.reload_stats.last_attempt,
+            "last_error": self.reload_stats.last_error,
+            "recent_versions": list(self.reload_stats.history),
+        }
+
+    @staticmethod
+    def _load_frame(path: Path) -> pd.DataFrame:
+        if not path.exists():
+            raise FileNotFoundError(f"Expected file was not found: {path}")
+        return read_typed_csv(path, usecols=DEFAULT_COLUMNS)
+
+    def _model_probability(self, features: pd.DataFrame, model_state: ModelState) -> np.ndarray | None:
+        """Score features, skipping inference for vectors already scored by the same model version."""
+        keys = ScoreCache.feature_keys(features)
+        probs, missing = self.score_cache.lookup(model_state.version, keys)
+        if len(missing):
+            scored = self.inference.score(
+                features.iloc[missing], model=model_state.model, timeout=self.inference_timeout
+            )
+            if scored is None:
+                return None
+            probs[missing] = scored
+            self.score_cache.store(model_state.version, keys[missing], scored)
+        return probs
+
+    def _hybrid_risk(self, features: pd.DataFrame, rules: RuleResult, model_state: ModelState) -> np.ndarray:
+        ml_prob = None
+        if model_state.model is not None and len(features):
+            try:
+                ml_prob = self._model_probability(features, model_state)
+            except Exception:
+                ml_prob = None
+
+        rule_prob = np.clip(0.12 + rules.penalty(), 0.02, 0.98)
+        if ml_prob is None:
+            return rule_prob
+        return np.clip((0.68 * ml_prob) + (0.32 * rule_prob), 0.01, 0.99)
+
+    async def score_rows(self, rows: list[dict[str, Any]]) -> tuple[str | None, np.ndarray | None]:
+        """Model probabilities for raw feature vectors; (None, None) when no model is loaded."""
+        state = await asyncio.to_thread(self.ensure_model)
+        if state.model is None:
+            return None, None
+        features = pd.DataFrame(rows, columns=FEATURE_COLUMNS)
+        return state.version, await self.inference.score_async(features, model=state.model)
+
+    def _prepare_frame(self) -> pd.DataFrame:
+        df = self._load_frame(self.full_data_path)
+        for col in DEFAULT_COLUMNS:
+            if col not in df.columns:
+                df[col] = np.nan
+
+        df["charttime"] = pd.to_datetime(df["charttime"], errors="coerce")
+        df = df.dropna(subset=["subject_id", "charttime"])
+        df["subject_id"] = pd.to_numeric(df["subject_id"], errors="coerce").astype("Int32")
+        df = df.dropna(subset=["subject_id"])
+        df["subject_id"] = df["subject_id"].astype(np.int32)
+
+        for col in ["heart_rate", "bp_mean", "spo2", "temp", "creatinine", "lactate", "wbc"]:
+            df[col] = clean_numeric(df, col)
+        return df
+
+    def build_snapshot(self) -> Snapshot:
+        model_state = self.ensure_model()
+        df = self._prepare_frame()
+        df = df.sort_values(["subject_id", "charttime"])
+        history = PatientHistory.from_frame(df)
+
+        rows, timeline = self._score_positions(history, history.positions_at(None), model_state)
+        self._record_risk(rows)
+        by_id = {r["subject_id"]: r for r in rows}
+        return Snapshot(
+            last_refreshed=datetime.now(UTC).isoformat(),
+            summary=self._summarize(rows),
+            rows=rows,
+            by_id=by_id,
+            timeline=timeline,
+            alerts=self._read_alerts(by_id),
+            model_version=model_state.version,
+            model_loaded_at=model_state.loaded_at,
+            history=history,
+        )
+
+    def _score_positions(
+        self, history: PatientHistory, positions: np.ndarray, model_state: ModelState
+    ) -> tuple[list[dict[str, Any]], dict[int, list[dict[str, Any]]]]:
+        """Dashboard rows (highest risk first) and timelines for the patients' rows at ``positions``."""
+        df = history.frame
+        rows: list[dict[str, Any]] = []
+
+        # Features at each patient's chosen observation, straight from the sorted frame.
+        features = features_at(df, positions)
+        # Vitals and labs are float32 in ``df``; rules and display rounding use the values as written.
+        latest_frame = widen_floats(df.iloc[positions])
+        subject_ids = latest_frame["subject_id"].tolist()
+        features = features.reset_index(drop=True)
+
+        # Keep small timeline payload for efficient frontend rendering.
+        timeline: dict[int, list[dict[str, Any]]] = {sid: [] for sid in subject_ids}
+        tail = widen_floats(df.iloc[history.tail_positions(positions, TIMELINE_POINTS)])
+        for sid, t, hr, bp, spo2, temp in zip(
+            tail["subject_id"].tolist(),
+            _isoformat(tail["charttime"]),
+            _rounded(tail["heart_rate"], 1),
+            _rounded(tail["bp_mean"], 1),
+            _rounded(tail["spo2"], 1),
+            _rounded(tail["temp"], 1),
+        ):
+            timeline[sid].append({"charttime": t, "heart_rate": hr, "bp_mean": bp, "spo2": spo2, "temp": temp})
+
+        # Rules and the model run once over every patient's chosen observation.
+        rules = CLINICAL_RULES.evaluate(latest_frame)
+        risk_probs = self._hybrid_risk(features, rules, model_state)
+        all_reasons = rules.reasons()
+        trends = features["hr_trend"].to_numpy()
+
+        values = [_rounded(latest_frame[col], 1) for col in ["heart_rate", "bp_mean", "spo2", "temp"]]
+        values += [_rounded(latest_frame[col], 2) for col in ["creatinine", "lactate", "wbc"]]
+        for subject_id, updated_at, risk_prob, reasons, trend, hr, bp, spo2, temp, creat, lact, wbc in zip(
+            subject_ids, _isoformat(latest_frame["charttime"]), risk_probs.tolist(), all_reasons, trends, *values
+        ):
+            row = {
+                "subject_id": subject_id,
+                "updated_at": updated_at,
+                "risk_probability": round(risk_prob, 4),
+                "risk_tier": normalize_risk(risk_prob),
+                "risk_reasons": reasons,
+                "heart_rate": hr,
+                "bp_mean": bp,
+                "spo2": spo2,
+                "temp": temp,
+                "creatinine": creat,
+                "lactate": lact,
+                "wbc": wbc,
+                "heart_rate_trend": round(float(trend), 2),
+            }
+            rows.append(row)
+
+        rows.sort(key=lambda x: x["risk_probability"], reverse=True)
+        return rows, timeline
+
+    def _record_risk(self, rows: list[dict[str, Any]]) -> None:
+        """Append the rows' scores to the risk history and add a reason to fast-rising patients."""
+        if not rows:
+            return
+        subject_ids = np.array([r["subject_id"] for r in rows])
+        times = np.array([r["updated_at"] for r in rows], dtype="datetime64[ns]").view(np.int64)
+        self.risk_history.record(subject_ids, times, np.array([r["risk_probability"] for r in rows]))
+
+        change = self.risk_history.changes(subject_ids, times, self.escalation_window.value)
+        window = _duration_label(self.escalation_window)
+        for i in np.flatnonzero(change >= self.escalation_delta).tolist():
+            reason = f"risk +{change[i] * 100:.0f}% in {window}"
+            reasons = rows[i]["risk_reasons"]
+            rows[i]["risk_reasons"] = [reason] if reasons == ["monitoring"] else [reason, *reasons]
+        self.risk_history.flush()
+
+    def risk_trajectory(self, subject_id: int) -> list[dict[str, Any]] | None:
+        """One patient's recorded scores, oldest first; None when none were recorded."""
+        found = self.risk_history.points(subject_id)
+        if found is None:
+            return None
+        points = []
+        for t, p in zip(found[0].tolist(), found[1].tolist()):
+            probability = round(p, 4)
+            points.append(
+                {
+                    "time": pd.Timestamp(t).isoformat(),
+                    "risk_probability": probability,
+                    "risk_tier": normalize_risk(probability),
+                }
+            )
+        return points
+
+    @staticmethod
+    def _summarize(rows: list[dict[str, Any]]) -> dict[str, Any]:
+        critical = sum(1 for r in rows if r["risk_tier"] == "critical")
+        high = sum(1 for r in rows if r["risk_tier"] == "high")
+        medium = sum(1 for r in rows if r["risk_tier"] == "medium")
+        low = sum(1 for r in rows if r["risk_tier"] == "low")
+        avg_risk = round(float(np.mean([r["risk_probability"] for r in rows])) if rows else 0.0, 4)
+        return {
+            "patients_monitored": len(rows),
+            "critical_count": critical,
+            "high_count": high,
+            "medium_count": medium,
+            "low_count": low,
+            "average_risk": avg_risk,
+        }
+
+    def _read_alerts(self, by_id: dict[int, dict[str, Any]], at: pd.Timestamp | None = None) -> list[dict[str, Any]]:
+        """The last 60 alert episodes; as of ``at``, those started by then, open if they ran past it."""
+        alerts = []
+        if self.alerts_path.exists():
+            try:
+                # One row per alert episode (ml/alert_episodes.py), ordered by the episode's last observation.
+                episodes = read_typed_csv(self.alerts_path)
+                if at is not None:
+                    episodes = episodes[episodes["start"] <= at]
+                    episodes = episodes.assign(open=episodes["open"].astype(bool) | (episodes["end"] > at))
+                episodes = widen_floats(episodes.tail(60))
+                for row in episodes.to_dict("records"):
+                    sid = int(row.get("subject_id")) if pd.notna(row.get("subject_id")) else None
+                    if sid is None:
+                        continue
+                    alerts.append(
+                        {
+                            "subject_id": sid,
+                            "charttime": str(row.get("end", "")),
+                            "started": str(row.get("start", "")),
+                            "observations": int(row["count"]) if pd.notna(row.get("count")) else 1,
+                            "ongoing": bool(row.get("open", False)),
+                            "alert": str(row.get("alert", "Clinical alert")).strip() or "Clinical alert",
+                            "risk_tier": by_id.get(sid, {}).get("risk_tier", "medium"),
+                            "alert_heart_rate": None
+                            if pd.isna(row.get("heart_rate"))
+                            else float(row.get("heart_rate")),
+                            "alert_bp_mean": None
+                            if pd.isna(row.get("bp_mean"))
+                            else float(row.get("bp_mean")),
+                            "peak_value": None
+                            if pd.isna(row.get("peak_value"))
+                            else float(row.get("peak_value")),
+                        }
+                    )
+            except Exception:
+                alerts = []
+        return alerts
+
+    def snapshot_at(self, at: datetime) -> Snapshot:
+        """What the dashboard showed at ``at``, from the live snapshot's observations.
+
+        ``at`` is floored to AS_OF_BUCKET_SECONDS and views are cached per bucket until
+        the live snapshot is rebuilt. Scores use the current model; aware times are
+        converted to UTC, the census's clock. Raises ValueError for times outside
+        pandas' nanosecond range (years 1677-2262).
+        """
+        try:
+            stamp = pd.Timestamp(at)
+            if stamp.tzinfo is not None:
+                stamp = stamp.tz_convert("UTC").tz_localize(None)
+            stamp = stamp.floor(self.as_of_bucket).as_unit("ns")
+        except (OverflowError, OutOfBoundsDatetime) as exc:
+            raise ValueError(f"as-of time {at} is outside the supported range") from exc
+        bucket = stamp.value
+        live = self.get_snapshot()
+        snap = self.as_of_cache.get(live.last_refreshed, bucket)
+        if snap is not None:
+            return snap
+
+        model_state = self.ensure_model()
+        history = live.history
+        rows, timeline = self._score_positions(history, history.positions_at(stamp), model_state)
+        by_id = {r["subject_id"]: r for r in rows}
+        snap = Snapshot(
+            last_refreshed=live.last_refreshed,
+            summary=self._summarize(rows),
+            rows=rows,
+            by_id=by_id,
+            timeline=timeline,
+            alerts=self._read_alerts(by_id, stamp),
+            model_version=model_state.version,
+            model_loaded_at=model_state.loaded_at,
+            as_of=stamp.isoformat(),
+        )
+        self.as_of_cache.put(live.last_refreshed, bucket, snap)
+        return snap
+
+    def get_snapshot(self, force: bool = False) -> Snapshot:
+        snap = self.snapshot
+        if snap is not None and not force:
+            return snap
+        # One build at a time: requests arriving during the startup build wait for it instead of
+        # starting their own.
+        with self._build_lock:
+            if not force and self.snapshot is not None:
+                return self.snapshot
+            self.snapshot = self.build_snapshot()
+            return self.snapshot
@@ -0,0 +1,197 @@
+"""Per-patient risk trajectories kept as fixed-size rings of (observation time, probability).
+
+Every live snapshot records each patient's score at its latest observation. A
+patient's ring holds its last ``capacity`` points: int64 nanosecond timestamps and
+float32 probabilities, with tiers derived from the probability when read. A point
+for a time the ring already holds replaces it (a model swap rescoring the same
+observation); points older than the ring's newest are dropped.
+
+All rings live in one structured array, one record per patient, so recording a
+snapshot is a handful of vectorised writes. ``flush`` copies it into a .npy file
+written through a memory map and renamed into place; on startup the file is
+loaded back, re-laid out if ``capacity`` changed.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+
+def record_dtype(capacity: int) -> np.dtype:
+    return np.dtype(
+        [
+            ("subject_id", np.int64),
+            ("head", np.int32),  # slot the next point is written to
+            ("count", np.int32),
+            ("times", np.int64, (capacity,)),
+            ("probs", np.float32, (capacity,)),
+        ]
+    )
+
+
+def _chronological(record: np.void) -> tuple[np.ndarray, np.ndarray]:
+    capacity = len(record["times"])
+    count = int(record["count"])
+    order = (int(record["head"]) - count + np.arange(count)) % capacity
+    return record["times"][order], record["probs"][order]
+
+
+class RiskHistory:
+    def __init__(self, capacity: int, path: Path | None = None, flush_seconds: float = 60.0) -> None:
+        self.capacity = max(int(capacity), 1)
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self.dtype = record_dtype(self.capacity)
+        self.records = np.zeros(0, dtype=self.dtype)
+        self.index: dict[int, int] = {}
+        self.points_recorded = 0
+        self.last_flush: float = time.monotonic()
+        self.last_flush_seconds: float | None = None
+        self.load_error: str | None = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        if path is not None and path.exists():
+            try:
+                self.load(path)
+            except (OSError, ValueError) as exc:
+                # An unreadable file must not keep the backend from starting; it is overwritten on flush.
+                self.load_error = f"{type(exc).__name__}: {exc}"
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _slots(self, subject_ids: np.ndarray) -> np.ndarray:
+        """Record row of each patient, adding rows (and growing the array) for new ones."""
+        known = len(self.index)
+        slots = np.empty(len(subject_ids), dtype=np.int64)
+        for i, sid in enumerate(subject_ids.tolist()):
+            slot = self.index.get(sid)
+            if slot is None:
+                slot = self.index[sid] = len(self.index)
+            slots[i] = slot
+        used = len(self.index)
+        if used > len(self.records):
+            grown = np.zeros(max(used, 2 * len(self.records)), dtype=self.dtype)
+            grown[: len(self.records)] = self.records
+            self.records = grown
+        if used > known:
+            self.records["subject_id"][known:used] = list(self.index)[known:]
+        return slots
+
+    def record(self, subject_ids: np.ndarray, times: np.ndarray, probs: np.ndarray) -> int:
+        """Append one point per patient (unique ids); returns how many were appended."""
+        with self._lock:
+            slots = self._slots(np.asarray(subject_ids))
+            times = np.asarray(times, dtype=np.int64)
+            probs = np.asarray(probs, dtype=np.float32)
+            head = self.records["head"][slots]
+            count = self.records["count"][slots]
+            last = (head - 1) % self.capacity
+            last_time = np.where(count > 0, self.records["times"][slots, last], np.iinfo(np.int64).min)
+
+            same = (count > 0) & (times == last_time)
+            self.records["probs"][slots[same], last[same]] = probs[same]
+            new = times > last_time
+            rows, at = slots[new], head[new]
+            self.records["times"][rows, at] = times[new]
+            self.records["probs"][rows, at] = probs[new]
+            self.records["head"][rows] = (at + 1) % self.capacity
+            self.records["count"][rows] = np.minimum(count[new] + 1, self.capacity)
+
+            self.points_recorded += int(new.sum())
+            self._dirty = self._dirty or bool(new.any() or same.any())
+            return int(new.sum())
+
+    def points(self, subject_id: int) -> tuple[np.ndarray, np.ndarray] | None:
+        """(times, probabilities) of one patient, oldest first; None for an unknown patient."""
+        with self._lock:
+            slot = self.index.get(subject_id)
+            if slot is None:
+                return None
+            return _chronological(self.records[slot].copy())
+
+    def changes(self, subject_ids: np.ndarray, times: np.ndarray, window_ns: int) -> np.ndarray:
+        """Probability at ``times`` minus the earliest probability within ``window_ns`` before it.
+
+        Zero for patients whose newest point is not at ``times`` or has no earlier point in the window.
+        """
+        with self._lock:
+            slots = np.array([self.index.get(sid, -1) for sid in np.asarray(subject_ids).tolist()], dtype=np.int64)
+            change = np.zeros(len(slots))
+            known = slots >= 0
+            rows = slots[known]
+            now = np.asarray(times, dtype=np.int64)[known]
+            head = self.records["head"][rows]
+            count = self.records["count"][rows]
+            newest = (head - 1) % self.capacity
+            current = self.records["probs"][rows, newest].astype(float)
+            present = (count > 0) & (self.records["times"][rows, newest] == now)
+
+            # Walk each ring back from its newest point while points stay inside the window;
+            # usually a step or two rather than the whole ring.
+            earliest = current.copy()
+            active = present.copy()
+            back = 1
+            while active.any() and back < self.capacity:
+                slot = (head - 1 - back) % self.capacity
+                active &= (back < count) & (self.records["times"][rows, slot] >= now - window_ns)
+                earliest = np.where(active, self.records["probs"][rows, slot], earliest)
+                back += 1
+            change[known] = np.where(present, current - earliest, 0.0)
+            return change
+
+    def flush(self, force: bool = False) -> bool:
+        """Write the rings to ``path`` if they changed, at most every ``flush_seconds`` unless ``force``."""
+        if self.path is None or not self._dirty:
+            return False
+        if not force and time.monotonic() - self.last_flush < self.flush_seconds:
+            return False
+        started = time.perf_counter()
+        with self._lock:
+            used = len(self.index)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            mapped = np.lib.format.open_memmap(tmp, mode="w+", dtype=self.dtype, shape=(used,))
+            mapped[:] = self.records[:used]
+            mapped.flush()
+            del mapped
+            os.replace(tmp, self.path)
+            self._dirty = False
+        self.last_flush = time.monotonic()
+        self.last_flush_seconds = round(time.perf_counter() - started, 4)
+        return True
+
+    def load(self, path: Path) -> None:
+        stored = np.load(path, mmap_mode="r")
+        if stored.dtype == self.dtype:
+            records = np.array(stored)
+        else:
+            # Written with another capacity: keep each patient's newest points.
+            records = np.zeros(len(stored), dtype=self.dtype)
+            records["subject_id"] = stored["subject_id"]
+            for row, record in enumerate(stored):
+                times, probs = _chronological(record)
+                kept = min(len(times), self.capacity)
+                records["times"][row, :kept] = times[len(times) - kept :]
+                records["probs"][row, :kept] = probs[len(probs) - kept :]
+                records["count"][row] = kept
+                records["head"][row] = kept % self.capacity
+        with self._lock:
+            self.records = records
+            self.index = {sid: row for row, sid in enumerate(records["subject_id"].tolist())}
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "patients": len(self.index),
+            "capacity": self.capacity,
+            "points_recorded": self.points_recorded,
+            "bytes": int(self.records[: len(self.index)].nbytes),
+            "path": None if self.path is None else str(self.path),
+            "last_flush_seconds": self.last_flush_seconds,
+            "load_error": self.load_error,
+        }
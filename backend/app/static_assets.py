@@ -0,0 +1,143 @@
+"""Frontend assets held in memory with precompressed variants.
+
+Every file under the frontend folder is read once, hashed and compressed (gzip,
+plus brotli when the ``brotli`` package is installed). index.html is rewritten so
+its local script and stylesheet references carry ``?v=<hash>``; requests for that
+exact version are cached by browsers as immutable, anything else revalidates
+through the ETag.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip is always available.
+    brotli = None
+
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+MIN_COMPRESS_BYTES = 256
+LOCAL_REFERENCE = re.compile(r'(?P<attr>\b(?:src|href)=")(?P<prefix>\./|/)?(?P<path>[^":?#]+)"')
+
+
+@dataclass(frozen=True)
+class Asset:
+    media_type: str
+    digest: str
+    variants: dict[str, bytes]
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest}"'
+
+
+def _encoding_weights(accept_encoding: str | None) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    return weights
+
+
+class StaticAssetCache:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.assets: dict[str, Asset] = {}
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build(body: bytes, media_type: str) -> Asset:
+        variants = {"identity": body}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                compressed["br"] = brotli.compress(body, quality=11)
+            variants.update({enc: data for enc, data in compressed.items() if len(data) < len(body)})
+        return Asset(media_type, hashlib.sha256(body).hexdigest()[:16], variants)
+
+    def _version_references(self, html: str, files: dict[str, bytes]) -> str:
+        def versioned(match: re.Match[str]) -> str:
+            path = match["path"]
+            body = files.get(path)
+            if body is None or path == "index.html":
+                return match[0]
+            digest = hashlib.sha256(body).hexdigest()[:16]
+            return f'{match["attr"]}{match["prefix"] or ""}{path}?v={digest}"'
+
+        return LOCAL_REFERENCE.sub(versioned, html)
+
+    def load(self) -> None:
+        """Read and compress every frontend file; safe to call again to pick up a new deploy."""
+        files: dict[str, bytes] = {}
+        if self.root.is_dir():
+            for path in sorted(self.root.rglob("*")):
+                if path.is_file():
+                    files[path.relative_to(self.root).as_posix()] = path.read_bytes()
+
+        assets: dict[str, Asset] = {}
+        for name, body in files.items():
+            if name == "index.html":
+                body = self._version_references(body.decode("utf-8"), files).encode("utf-8")
+            media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            assets[name] = self._build(body, media_type)
+        self.assets = assets
+        self.loaded = True
+
+    def get(self, name: str) -> Asset | None:
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    self.load()
+        return self.assets.get(name)
+
+    @property
+    def index(self) -> Asset | None:
+        return self.get("index.html")
+
+    @staticmethod
+    def negotiate(asset: Asset, accept_encoding: str | None) -> str:
+        weights = _encoding_weights(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in asset.variants and weights.get(encoding, weights.get("*", 0.0)) > 0:
+                return encoding
+        return "identity"
+
+    @staticmethod
+    def not_modified(asset: Asset, if_none_match: str | None) -> bool:
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip().removeprefix("W/")
+            if tag == "*" or tag.strip('"').split("-")[0] == asset.digest:
+                return True
+        return False
+
+    @staticmethod
+    def headers(asset: Asset, encoding: str, version: str | None) -> dict[str, str]:
+        headers = {
+            "ETag": asset.etag if encoding == "identity" else f'"{asset.digest}-{encoding}"',
+            "Cache-Control": IMMUTABLE if version == asset.digest else REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return headers
@@ -0,0 +1,211 @@
+"""Named ICU units, each with its own census, model, snapshot and refresh cadence.
+
+Units come from the JSON file named by ICU_UNITS_CONFIG:
+
+    {"units": [
+        {"name": "micu", "data_root": "data/micu", "refresh_seconds": 20},
+        {"name": "sicu", "data_root": "data/sicu", "refresh_seconds": 60, "model_path": "models/risk_model_v2.pkl"}
+    ]}
+
+Relative paths are resolved against the file's folder; ``data_root`` holds the
+unit's census, alert episodes and (unless ``model_path`` is given) model, like
+ICU_DATA_ROOT. Without a config there is one unit, ICU_UNIT_NAME, over
+ICU_DATA_ROOT. The first unit is the default one that the unit-less API routes
+serve.
+
+Snapshots are built on a shared thread pool, so a slow unit does not hold up the
+others' refreshes; the cross-unit summary adds up the per-unit summaries.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .config import ALERTS_PATH, DATA_ROOT, FULL_DATA_PATH, MODEL_PATH, RISK_HISTORY_PATH
+from .repository import ICURepository, Snapshot
+
+
+UNIT_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+SUMMARY_COUNTS = ["patients_monitored", "critical_count", "high_count", "medium_count", "low_count"]
+
+
+@dataclass(frozen=True)
+class UnitConfig:
+    name: str
+    data_root: Path
+    refresh_seconds: float
+    model_path: Path
+
+    def repository(self) -> ICURepository:
+        return ICURepository(
+            full_data_path=self.data_root / FULL_DATA_PATH.name,
+            alerts_path=self.data_root / ALERTS_PATH.name,
+            model_path=self.model_path,
+            risk_history_path=self.data_root / RISK_HISTORY_PATH.name,
+        )
+
+
+def load_unit_configs(path: Path | None, default_refresh_seconds: float) -> list[UnitConfig]:
+    """Units from a JSON config, or the single ICU_DATA_ROOT unit when ``path`` is None."""
+    if path is None:
+        name = os.getenv("ICU_UNIT_NAME", "icu")
+        return [UnitConfig(name, DATA_ROOT, default_refresh_seconds, MODEL_PATH)]
+
+    entries = json.loads(path.read_text(encoding="utf-8")).get("units", [])
+    configs = []
+    for entry in entries:
+        name = str(entry.get("name", ""))
+        if not UNIT_NAME.match(name):
+            raise ValueError(f"Unit name {name!r} must be letters, digits, '-' or '_'")
+        if "data_root" not in entry:
+            raise ValueError(f"Unit {name!r} has no data_root")
+        data_root = path.parent / entry["data_root"]
+        model_path = path.parent / entry["model_path"] if "model_path" in entry else data_root / MODEL_PATH.name
+        refresh = float(entry.get("refresh_seconds", default_refresh_seconds))
+        configs.append(UnitConfig(name, data_root, refresh, model_path))
+    if not configs:
+        raise ValueError(f"{path} defines no units")
+    names = [c.name for c in configs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{path} defines unit names more than once: {names}")
+    return configs
+
+
+@dataclass
+class UnitState:
+    last_started: float | None = None
+    build_seconds: float | None = None
+    builds: int = 0
+    last_error: str | None = None
+    pending: Future | None = None
+
+
+class UnitRegistry:
+    def __init__(self, configs: list[UnitConfig], workers: int | None = None) -> None:
+        self.configs = {c.name: c for c in configs}
+        self.default = configs[0].name
+        self.repositories = {c.name: c.repository() for c in configs}
+        self.states = {c.name: UnitState() for c in configs}
+        workers = workers or min(len(configs), os.cpu_count() or 1)
+        self.pool = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="unit-build")
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> ICURepository | None:
+        return self.repositories.get(name)
+
+    @property
+    def default_repository(self) -> ICURepository:
+        return self.repositories[self.default]
+
+    def _build(self, name: str) -> Snapshot:
+        state = self.states[name]
+        started = time.perf_counter()
+        try:
+            snap = self.repositories[name].get_snapshot(force=True)
+        except Exception as exc:
+            state.last_error = f"{type(exc).__name__}: {exc}"
+            raise
+        state.build_seconds = round(time.perf_counter() - started, 4)
+        state.builds += 1
+        state.last_error = None
+        return snap
+
+    def _submit(self, name: str) -> Future:
+        state = self.states[name]
+        state.last_started = time.monotonic()
+        state.pending = self.pool.submit(self._build, name)
+        return state.pending
+
+    def load_models(self, watch_interval_seconds: float) -> None:
+        """Load every unit's model concurrently and start its watcher."""
+        for name, future in [(n, self.pool.submit(r.ensure_model)) for n, r in self.repositories.items()]:
+            future.result()
+            self.repositories[name].start_model_watcher(watch_interval_seconds)
+
+    def build_all(self) -> dict[str, Snapshot]:
+        """Build every unit's snapshot concurrently; raises if any unit failed."""
+        with self._lock:
+            futures = {name: self._submit(name) for name in self.repositories}
+        wait(futures.values())
+        failed = [f"{name}: {self.states[name].last_error}" for name, f in futures.items() if f.exception()]
+        if failed:
+            raise RuntimeError("Snapshot build failed for " + "; ".join(failed))
+        return {name: f.result() for name, f in futures.items()}
+
+    def poll(self) -> list[Snapshot]:
+        """Snapshots of builds finished since the last poll; starts builds for units that are due."""
+        finished = []
+        now = time.monotonic()
+        with self._lock:
+            for name, state in self.states.items():
+                if state.pending is not None:
+                    if not state.pending.done():
+                        continue
+                    if state.pending.exception() is None:
+                        finished.append(state.pending.result())
+                    state.pending = None
+                due = state.last_started is None or now - state.last_started >= self.configs[name].refresh_seconds
+                if due:
+                    self._submit(name)
+        return finished
+
+    def ready(self) -> bool:
+        return all(r.snapshot is not None for r in self.repositories.values())
+
+    def summary(self) -> dict[str, Any]:
+        """Totals over the units' latest snapshots, from their summaries rather than their rows."""
+        totals = dict.fromkeys(SUMMARY_COUNTS, 0)
+        risk_sum = 0.0
+        units = 0
+        for repository in self.repositories.values():
+            snap = repository.snapshot
+            if snap is None:
+                continue
+            units += 1
+            for key in SUMMARY_COUNTS:
+                totals[key] += snap.summary[key]
+            risk_sum += snap.summary["average_risk"] * snap.summary["patients_monitored"]
+        patients = totals["patients_monitored"]
+        return {
+            **totals,
+            "average_risk": round(risk_sum / patients, 4) if patients else 0.0,
+            "units_reporting": units,
+            "units_total": len(self.repositories),
+        }
+
+    def info(self) -> list[dict[str, Any]]:
+        units = []
+        for name, repository in self.repositories.items():
+            snap = repository.snapshot
+            state = self.states[name]
+            units.append(
+                {
+                    "name": name,
+                    "default": name == self.default,
+                    "data_root": str(self.configs[name].data_root),
+                    "refresh_seconds": self.configs[name].refresh_seconds,
+                    "last_refreshed": None if snap is None else snap.last_refreshed,
+                    "model_version": None if snap is None else snap.model_version,
+                    "summary": None if snap is None else snap.summary,
+                    "building": state.pending is not None and not state.pending.done(),
+                    "builds": state.builds,
+                    "build_seconds": state.build_seconds,
+                    "last_error": state.last_error,
+                }
+            )
+        return units
+
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        for repository in self.repositories.values():
+            repository.stop_model_watcher()
+            repository.inference.stop()
+            repository.risk_history.flush(force=True)
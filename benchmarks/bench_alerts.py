@@ -0,0 +1,46 @@
+"""Alert output: one row per alerting observation (the old patient_alerts.csv) against alert episodes.
+
+Each benchmark builds its alert file from a synthetic census and writes it as
+CSV in memory; rows and CSV bytes, which the backend reads on every snapshot,
+are recorded in extra_info.
+"""
+
+import io
+
+import pytest
+
+from conftest import OBSERVATIONS, ROUNDS, SCALES
+
+
+@pytest.fixture(scope="module", params=SCALES, ids=lambda n: f"{n}p")
+def census_frame(request):
+    from synthetic_census import generate_census
+
+    return generate_census(request.param, OBSERVATIONS).sort_values(["subject_id", "charttime"], ignore_index=True)
+
+
+def alert_rows_csv(df) -> tuple[int, int]:
+    from clinical_rules import CLINICAL_RULES
+
+    columns = ["subject_id", "hadm_id", "charttime", "heart_rate", "bp_mean", "spo2", "temp"]
+    alerts = df[columns].assign(alert=CLINICAL_RULES.evaluate(df).alerts())
+    alerts = alerts[alerts["alert"] != ""]
+    buffer = io.StringIO()
+    alerts.to_csv(buffer, index=False)
+    return len(alerts), len(buffer.getvalue())
+
+
+def alert_episodes_csv(df) -> tuple[int, int]:
+    from alert_episodes import alert_episodes
+
+    episodes = alert_episodes(df)
+    buffer = io.StringIO()
+    episodes.to_csv(buffer, index=False)
+    return len(episodes), len(buffer.getvalue())
+
+
+@pytest.mark.parametrize("build", [alert_rows_csv, alert_episodes_csv], ids=["rows", "episodes"])
+def bench_alert_file(benchmark, census_frame, build):
+    rows, size = benchmark.pedantic(build, args=(census_frame,), rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["rows"] = rows
+    benchmark.extra_info["csv_mb"] = round(size / 1e6, 2)
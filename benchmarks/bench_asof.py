@@ -0,0 +1,89 @@
+"""As-of joins: six chained pd.merge_asof calls against one asof_join over two sources.
+
+The base frame is hourly heart-rate rows; vitals arrive at irregular times within
+the stay and labs a few times a day, like build_mimic4_compatible_dataset.py's inputs.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import OBSERVATIONS, ROUNDS, SCALES
+
+
+KEYS = ["subject_id", "hadm_id", "charttime"]
+VITALS = {"bp_mean": "2h", "spo2": "2h", "temp": "2h"}
+LABS = {"creatinine": "12h", "lactate": "12h", "wbc": "12h"}
+
+
+def _events(rng, n_patients: int, per_patient: int, columns, minutes: int) -> pd.DataFrame:
+    n = n_patients * per_patient
+    subject = np.repeat(np.arange(n_patients), per_patient)
+    frame = pd.DataFrame(
+        {
+            "subject_id": subject,
+            "hadm_id": subject * 10 + 1,
+            "charttime": pd.Timestamp("2150-01-01") + pd.to_timedelta(rng.integers(0, minutes, n), unit="min"),
+        }
+    )
+    for col in columns:
+        frame[col] = np.where(rng.random(n) < 0.2, np.nan, rng.normal(size=n))
+    return frame.drop_duplicates(KEYS).reset_index(drop=True)
+
+
+@pytest.fixture(scope="module", params=SCALES, ids=lambda n: f"{n}p")
+def frames(request):
+    rng = np.random.default_rng(11)
+    n_patients = request.param
+    span = OBSERVATIONS * 60
+    subject = np.repeat(np.arange(n_patients), OBSERVATIONS)
+    hours = np.tile(np.arange(OBSERVATIONS), n_patients)
+    base = pd.DataFrame(
+        {
+            "subject_id": subject,
+            "hadm_id": subject * 10 + 1,
+            "charttime": pd.Timestamp("2150-01-01") + pd.to_timedelta(hours, unit="h"),
+            "heart_rate": rng.normal(80, 10, len(subject)),
+        }
+    ).sort_values(KEYS, ignore_index=True)
+    vitals = _events(rng, n_patients, OBSERVATIONS, VITALS, span)
+    labs = _events(rng, n_patients, max(OBSERVATIONS // 8, 1), LABS, span)
+    return base, vitals, labs
+
+
+def chained_merge_asof(base, vitals, labs):
+    merged = base.sort_values("charttime", kind="stable")
+    for source, tolerances in ((vitals, VITALS), (labs, LABS)):
+        for col, tolerance in tolerances.items():
+            merged = pd.merge_asof(
+                merged,
+                source[KEYS + [col]].sort_values("charttime", kind="stable"),
+                on="charttime",
+                by=["subject_id", "hadm_id"],
+                direction="nearest",
+                tolerance=pd.Timedelta(tolerance),
+            )
+    return merged.sort_values(KEYS, ignore_index=True)
+
+
+def single_pass(base, vitals, labs):
+    from asof_join import AsofSource, asof_join
+
+    return asof_join(
+        base,
+        [
+            AsofSource(vitals, list(VITALS), "2h"),
+            AsofSource(labs, list(LABS), "12h"),
+        ],
+    )
+
+
+def bench_asof_chained(benchmark, frames):
+    merged = benchmark.pedantic(chained_merge_asof, args=frames, rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["rows"] = len(merged)
+
+
+def bench_asof_single_pass(benchmark, frames):
+    merged = benchmark.pedantic(single_pass, args=frames, rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["rows"] = len(merged)
+    pd.testing.assert_frame_equal(merged, chained_merge_asof(*frames))
@@ -0,0 +1,185 @@
+"""Backend benchmarks over synthetic censuses (see ml/synthetic_census.py).
+
+Run from the project root:
+
+    python -m pytest benchmarks
+    python -m pytest benchmarks --benchmark-compare   # against the last saved run
+
+Scales, rounds and subscriber counts are controlled by ICU_BENCH_* variables
+documented in benchmarks/README.md.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import ROUNDS, WS_SUBSCRIBERS
+
+
+def _run(benchmark, fn, *args, **kwargs):
+    return benchmark.pedantic(fn, args=args, kwargs=kwargs, rounds=ROUNDS, iterations=1, warmup_rounds=0)
+
+
+def bench_build_snapshot(benchmark, repository):
+    snap = _run(benchmark, repository.build_snapshot)
+    benchmark.extra_info["patients"] = snap.summary["patients_monitored"]
+
+
+def _latest(repository):
+    from features import latest_features
+
+    df = repository._prepare_frame().sort_values(["subject_id", "charttime"])
+    features = latest_features(df)
+    return df, features.reset_index(drop=True), df.loc[features.index]
+
+
+def bench_feature_extraction(benchmark, repository):
+    from features import latest_features
+
+    df, features, _ = _latest(repository)
+    _run(benchmark, latest_features, df)
+    benchmark.extra_info["patients"] = len(features)
+
+
+def bench_scoring(benchmark, repository):
+    from clinical_rules import CLINICAL_RULES
+
+    _, features, latest = _latest(repository)
+
+    def score():
+        repository.score_cache.clear()
+        return repository._hybrid_risk(features, CLINICAL_RULES.evaluate(latest), repository.model_state)
+
+    _run(benchmark, score)
+    benchmark.extra_info["patients"] = len(features)
+
+
+def bench_scoring_cached(benchmark, repository):
+    """Refresh where no patient has a new observation: every score comes from the cache."""
+    from clinical_rules import CLINICAL_RULES
+
+    _, features, latest = _latest(repository)
+    repository._hybrid_risk(features, CLINICAL_RULES.evaluate(latest), repository.model_state)
+
+    _run(benchmark, repository._hybrid_risk, features, CLINICAL_RULES.evaluate(latest), repository.model_state)
+    benchmark.extra_info["patients"] = len(features)
+
+
+def _midpoint(repository):
+    times = repository.get_snapshot().history.frame["charttime"]
+    return (times.min() + (times.max() - times.min()) / 2).to_pydatetime()
+
+
+def bench_snapshot_at(benchmark, repository):
+    """Historical view with nothing cached: as-of positions, features, model and rows for every patient."""
+    at = _midpoint(repository)
+
+    def build():
+        repository.as_of_cache.clear()
+        repository.score_cache.clear()
+        return repository.snapshot_at(at)
+
+    snap = _run(benchmark, build)
+    benchmark.extra_info["patients"] = snap.summary["patients_monitored"]
+
+
+def bench_api_snapshot_at(benchmark, client, repository):
+    """Repeated incident-review query: served from the as-of cache after the first request."""
+    at = _midpoint(repository).isoformat()
+    assert _run(benchmark, client.get, "/api/snapshot", params={"at": at}).status_code == 200
+
+
+def bench_risk_history_record(benchmark, repository):
+    """Appending one refresh's scores to every patient's ring and checking for fast escalations."""
+    rows = repository.get_snapshot().rows
+    _run(benchmark, repository._record_risk, rows)
+    benchmark.extra_info["patients"] = len(rows)
+
+
+def bench_risk_history_flush(benchmark, repository, tmp_path):
+    """Writing full rings for every patient to the memory-mapped file."""
+    import numpy as np
+    from app.risk_history import RiskHistory
+
+    history = RiskHistory(repository.risk_history.capacity, tmp_path / "risk_history.npy")
+    subject_ids = np.arange(repository.get_snapshot().summary["patients_monitored"])
+    probs = np.random.default_rng(5).random(len(subject_ids))
+    for step in range(history.capacity):
+        history.record(subject_ids, np.full(len(subject_ids), step), probs)
+
+    def touch():
+        # A new point makes the rings dirty again, so every round writes the file.
+        history.record(subject_ids, np.full(len(subject_ids), history.points_recorded), probs)
+        return (), {"force": True}
+
+    assert benchmark.pedantic(history.flush, setup=touch, rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["mb"] = round(history.path.stat().st_size / 1e6, 2)
+
+
+def bench_api_patient_risk_history(benchmark, client, repository):
+    subject_id = repository.get_snapshot().rows[0]["subject_id"]
+    assert _run(benchmark, client.get, f"/api/patients/{subject_id}/risk-history").status_code == 200
+
+
+def bench_api_health(benchmark, client):
+    assert _run(benchmark, client.get, "/api/health").status_code == 200
+
+
+def bench_api_summary(benchmark, client):
+    assert _run(benchmark, client.get, "/api/summary").status_code == 200
+
+
+def bench_api_patients(benchmark, client):
+    assert _run(benchmark, client.get, "/api/patients?limit=500").status_code == 200
+
+
+def bench_api_patients_filtered(benchmark, client):
+    assert _run(benchmark, client.get, "/api/patients?risk=high&search=lactate").status_code == 200
+
+
+def bench_api_patient_detail(benchmark, client, repository):
+    subject_id = repository.get_snapshot().rows[0]["subject_id"]
+    assert _run(benchmark, client.get, f"/api/patients/{subject_id}").status_code == 200
+
+
+def bench_api_alerts_live(benchmark, client):
+    assert _run(benchmark, client.get, "/api/alerts/live?limit=100").status_code == 200
+
+
+def bench_api_notifications_status(benchmark, client):
+    assert _run(benchmark, client.get, "/api/notifications/status").status_code == 200
+
+
+def bench_api_reload(benchmark, client):
+    assert _run(benchmark, client.post, "/api/reload").status_code == 200
+
+
+def bench_static_index(benchmark, static_client):
+    assert _run(benchmark, static_client.get, "/", headers={"Accept-Encoding": "gzip, br"}).status_code == 200
+
+
+def bench_static_asset(benchmark, static_client):
+    assert _run(benchmark, static_client.get, "/app.js", headers={"Accept-Encoding": "gzip, br"}).status_code == 200
+
+
+def bench_static_not_modified(benchmark, static_client):
+    etag = static_client.get("/app.js").headers["ETag"]
+    assert _run(benchmark, static_client.get, "/app.js", headers={"If-None-Match": etag}).status_code == 304
+
+
+def bench_spa_deep_link(benchmark, static_client):
+    assert _run(benchmark, static_client.get, "/patients/10001").status_code == 200
+
+
+def bench_ws_fanout(benchmark, client):
+    """Time for WS_SUBSCRIBERS concurrent dashboards to each receive their first frame."""
+
+    def subscriber(_: int) -> int:
+        with client.websocket_connect("/ws/alerts") as ws:
+            return len(ws.receive_json()["top_alerts"])
+
+    def fanout():
+        with ThreadPoolExecutor(max_workers=WS_SUBSCRIBERS) as pool:
+            return list(pool.map(subscriber, range(WS_SUBSCRIBERS)))
+
+    frames = _run(benchmark, fanout)
+    assert len(frames) == WS_SUBSCRIBERS
+    benchmark.extra_info["subscribers"] = WS_SUBSCRIBERS
@@ -0,0 +1,51 @@
+"""Batch scoring (ml/batch_score.py) against live_predictor.py's old per-patient filter and predict loop."""
+
+import joblib
+import numpy as np
+import pytest
+
+from conftest import ROUNDS
+
+
+# The loop filters the whole frame once per patient; it runs for this many patients of each census.
+LEGACY_PATIENTS = 200
+
+
+@pytest.fixture(scope="module")
+def census_scoring(census):
+    from batch_score import read_input
+
+    return read_input(census / "full_medical_data_clean.csv"), joblib.load(census / "risk_model_v2.pkl")
+
+
+def legacy_scores(df, model, patients):
+    """One boolean filter over every row and one predict_proba call per patient."""
+    from features import FEATURE_COLUMNS, latest_features
+
+    scores = {}
+    for pid in patients:
+        features = latest_features(df[df["subject_id"] == pid])
+        if len(features):
+            scores[pid] = model.predict_proba(features[FEATURE_COLUMNS])[0, 1]
+    return scores
+
+
+def bench_score_legacy(benchmark, census_scoring):
+    df, model = census_scoring
+    patients = df["subject_id"].unique()[:LEGACY_PATIENTS]
+    scores = benchmark.pedantic(legacy_scores, args=(df, model, patients), rounds=1, iterations=1)
+    benchmark.extra_info["patients"] = len(scores)
+    benchmark.extra_info["ms_per_patient"] = round(benchmark.stats.stats.median / max(len(scores), 1) * 1000, 3)
+
+
+def bench_score_batch(benchmark, census_scoring):
+    from batch_score import score_frame
+
+    df, model = census_scoring
+    scores = benchmark.pedantic(score_frame, args=(df, model), rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["patients"] = len(scores)
+    benchmark.extra_info["ms_per_patient"] = round(benchmark.stats.stats.median / max(len(scores), 1) * 1000, 4)
+
+    patients = scores["subject_id"].to_numpy()[:LEGACY_PATIENTS]
+    expected = legacy_scores(df, model, patients)
+    assert np.allclose(scores["risk_probability"].to_numpy()[: len(patients)], [expected[p] for p in patients])
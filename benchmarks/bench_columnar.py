@@ -0,0 +1,65 @@
+"""Stage hand-off formats: CSV plus to_datetime against .cols frames from ml/columnar_io.py.
+
+Uses each census's full_medical_data_clean.csv, the largest frame passed between
+pipeline stages.
+"""
+
+import pandas as pd
+import pytest
+
+from conftest import ROUNDS
+
+
+@pytest.fixture(scope="module")
+def frame_files(census, tmp_path_factory):
+    from columnar_io import compact_frame, write_frame
+
+    csv_path = census / "full_medical_data_clean.csv"
+    df = pd.read_csv(csv_path)
+    df["charttime"] = pd.to_datetime(df["charttime"])
+    cols_path = write_frame(compact_frame(df), tmp_path_factory.mktemp("columnar") / "full_medical_data_clean.cols")
+    return {"csv": csv_path, "cols": cols_path, "frame": df}
+
+
+def _read_csv(path):
+    df = pd.read_csv(path)
+    df["charttime"] = pd.to_datetime(df["charttime"])
+    return df
+
+
+def _record(benchmark, files, fmt):
+    benchmark.extra_info["rows"] = len(files["frame"])
+    benchmark.extra_info["file_mb"] = round(files[fmt].stat().st_size / 1e6, 2)
+
+
+def bench_read_csv(benchmark, frame_files):
+    df = benchmark.pedantic(_read_csv, args=(frame_files["csv"],), rounds=ROUNDS, iterations=1)
+    _record(benchmark, frame_files, "csv")
+    benchmark.extra_info["memory_mb"] = round(df.memory_usage(deep=True).sum() / 1e6, 2)
+
+
+@pytest.mark.parametrize("mmap", [False, True], ids=["read", "mmap"])
+def bench_read_cols(benchmark, frame_files, mmap):
+    from columnar_io import read_frame
+
+    df = benchmark.pedantic(read_frame, args=(frame_files["cols"],), kwargs={"mmap": mmap}, rounds=ROUNDS, iterations=1)
+    _record(benchmark, frame_files, "cols")
+    benchmark.extra_info["memory_mb"] = round(df.memory_usage(deep=True).sum() / 1e6, 2)
+    assert df["charttime"].dtype.kind == "M" and df["subject_id"].dtype == "int32"
+    pd.testing.assert_frame_equal(df.astype(frame_files["frame"].dtypes.to_dict()), frame_files["frame"], rtol=1e-5)
+
+
+def bench_write_csv(benchmark, frame_files, tmp_path):
+    df = frame_files["frame"]
+    benchmark.pedantic(df.to_csv, args=(tmp_path / "out.csv",), kwargs={"index": False}, rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["rows"] = len(df)
+
+
+def bench_write_cols(benchmark, frame_files, tmp_path):
+    from columnar_io import compact_frame, write_frame
+
+    df = frame_files["frame"]
+    benchmark.pedantic(
+        lambda: write_frame(compact_frame(df), tmp_path / "out.cols"), rounds=ROUNDS, iterations=1
+    )
+    benchmark.extra_info["rows"] = len(df)
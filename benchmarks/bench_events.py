@@ -0,0 +1,140 @@
+"""MIMIC-IV event extraction: single-process chunked reader, the parallel extractor,
+and a rebuild from the per-itemid event cache.
+
+Runs on a synthetic chartevents file (MIMIC-IV column layout, mostly unrelated
+itemids) written once to the benchmark cache as .csv and .csv.gz.
+"""
+
+import gzip
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import DATA_CACHE, ROUNDS
+
+
+EVENT_ROWS = int(os.getenv("ICU_BENCH_EVENT_ROWS", "2000000"))
+WORKERS = int(os.getenv("ICU_BENCH_WORKERS", str(os.cpu_count() or 1)))
+
+VITAL_FEATURES = {220045: "heart_rate", 220052: "bp_mean", 220181: "bp_mean", 220277: "spo2", 223762: "temp", 223761: "temp"}
+TEMP_F_ITEMIDS = {223761}
+OTHER_ITEMIDS = [220210, 220179, 220180, 224641, 223901, 220739, 223900, 227969, 224650, 220048]
+
+
+def write_chartevents(path, n_rows: int, seed: int = 3) -> None:
+    rng = np.random.default_rng(seed)
+    wanted = np.array(sorted(VITAL_FEATURES))
+    itemids = np.where(
+        rng.random(n_rows) < 0.3, rng.choice(wanted, n_rows), rng.choice(OTHER_ITEMIDS, n_rows)
+    )
+    subject = rng.integers(10_000_000, 10_000_000 + max(n_rows // 400, 1), n_rows)
+    charttime = pd.Timestamp("2150-01-01") + pd.to_timedelta(rng.integers(0, 24 * 60 * 30, n_rows), unit="min")
+    valuenum = np.round(rng.normal(80, 15, n_rows), 1)
+    valuenum[rng.random(n_rows) < 0.02] = np.nan
+    hadm = (subject * 3 + 1).astype(float)
+    hadm[rng.random(n_rows) < 0.01] = np.nan
+    # Caregiver ids that collide with wanted itemids exercise the exact check after the text prefilter.
+    caregiver = np.where(rng.random(n_rows) < 0.01, 220045, rng.integers(1, 99_999, n_rows))
+    frame = pd.DataFrame(
+        {
+            "subject_id": subject,
+            "hadm_id": pd.array(hadm).astype("Int64"),
+            "stay_id": subject * 7,
+            "caregiver_id": caregiver,
+            "charttime": charttime.strftime("%Y-%m-%d %H:%M:%S"),
+            "storetime": charttime.strftime("%Y-%m-%d %H:%M:%S"),
+            "itemid": itemids,
+            "value": valuenum,
+            "valuenum": valuenum,
+            "valueuom": "bpm",
+            "warning": 0,
+        }
+    ).sort_values(["subject_id", "charttime"])
+    frame.to_csv(path, index=False)
+
+
+@pytest.fixture(scope="module")
+def chartevents():
+    target = DATA_CACHE / f"chartevents-{EVENT_ROWS}.csv"
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        write_chartevents(target, EVENT_ROWS)
+    gz_target = target.with_suffix(".csv.gz")
+    if not gz_target.exists():
+        with open(target, "rb") as src, gzip.open(gz_target, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst)
+    return {"csv": target, "gz": gz_target}
+
+
+@pytest.fixture(scope="module")
+def exact_vitals(chartevents):
+    """Single-chunk run of the original reader: exact medians to compare against."""
+    from build_mimic4_compatible_dataset import read_filtered_events
+
+    return read_filtered_events(
+        chartevents["csv"], VITAL_FEATURES, VITAL_FEATURES, chunksize=EVENT_ROWS + 1, temp_f_itemids=TEMP_F_ITEMIDS
+    )
+
+
+def _record(benchmark, wide):
+    benchmark.extra_info["rows"] = EVENT_ROWS
+    benchmark.extra_info["rows_per_second"] = round(EVENT_ROWS / benchmark.stats.stats.median)
+    benchmark.extra_info["hourly_rows"] = len(wide)
+
+
+def bench_events_single_process(benchmark, chartevents):
+    from build_mimic4_compatible_dataset import read_filtered_events
+
+    wide = benchmark.pedantic(
+        read_filtered_events,
+        args=(chartevents["csv"], VITAL_FEATURES, VITAL_FEATURES),
+        kwargs={"chunksize": 1_500_000, "temp_f_itemids": TEMP_F_ITEMIDS},
+        rounds=ROUNDS,
+        iterations=1,
+    )
+    _record(benchmark, wide)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "gz"])
+def bench_events_parallel(benchmark, chartevents, exact_vitals, fmt):
+    from parallel_events import read_filtered_events_parallel
+
+    wide = benchmark.pedantic(
+        read_filtered_events_parallel,
+        args=(chartevents[fmt], VITAL_FEATURES, TEMP_F_ITEMIDS),
+        kwargs={"workers": WORKERS, "block_bytes": 16 << 20},
+        rounds=ROUNDS,
+        iterations=1,
+    )
+    _record(benchmark, wide)
+    benchmark.extra_info["workers"] = WORKERS
+    keys = ["subject_id", "hadm_id", "charttime"]
+    pd.testing.assert_frame_equal(
+        wide.sort_values(keys).reset_index(drop=True), exact_vitals.sort_values(keys).reset_index(drop=True)
+    )
+
+
+@pytest.fixture(scope="module")
+def event_cache(chartevents, tmp_path_factory):
+    from event_cache import EventCache
+
+    cache = EventCache(chartevents["csv"], tmp_path_factory.mktemp("event-cache"), workers=WORKERS)
+    cache.ensure(VITAL_FEATURES)
+    return cache
+
+
+def bench_events_from_cache(benchmark, event_cache, exact_vitals):
+    """Rebuild the wide vitals frame from the cache, as a rerun with a new mapping or tolerance does."""
+    wide = benchmark.pedantic(
+        event_cache.hourly_features, args=(VITAL_FEATURES, TEMP_F_ITEMIDS), rounds=ROUNDS, iterations=1
+    )
+    _record(benchmark, wide)
+    keys = ["subject_id", "hadm_id", "charttime"]
+    wide = wide.sort_values(keys).reset_index(drop=True)
+    exact = exact_vitals.sort_values(keys).reset_index(drop=True)
+    pd.testing.assert_frame_equal(wide[keys], exact[keys])
+    # bp_mean and temp pool two itemids each: medians of per-itemid medians there.
+    pd.testing.assert_frame_equal(wide[["heart_rate", "spo2"]], exact[["heart_rate", "spo2"]])
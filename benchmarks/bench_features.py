@@ -0,0 +1,116 @@
+"""Shared features (ml/features.py): batch and online modes against the old per-patient extraction."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import OBSERVATIONS, ROUNDS, SCALES
+
+
+# The per-patient extraction regroups every patient; it runs on a slice of each census.
+LEGACY_PATIENTS = 2000
+
+
+def legacy_feature_frame(g: pd.DataFrame) -> pd.DataFrame:
+    """ICURepository._feature_frame as it was before features.py."""
+    g = g.sort_values("charttime")
+    last = g.tail(3)
+    row = {
+        "hr_avg": float(last["heart_rate"].mean()),
+        "bp_avg": float(last["bp_mean"].mean()),
+        "spo2_avg": float(last["spo2"].mean()),
+        "temp_avg": float(last["temp"].mean()),
+        "hr_trend": float(last["heart_rate"].iloc[-1] - last["heart_rate"].iloc[-2]),
+        "creatinine": float(last["creatinine"].iloc[-1]),
+        "lactate": float(last["lactate"].iloc[-1]),
+        "wbc": float(last["wbc"].iloc[-1]),
+        "spo2_missing": int(pd.isna(last["spo2"].iloc[-1])),
+        "temp_missing": int(pd.isna(last["temp"].iloc[-1])),
+    }
+    return pd.DataFrame([row])
+
+
+def legacy_latest_features(df: pd.DataFrame) -> pd.DataFrame:
+    frames = {sid: legacy_feature_frame(g) for sid, g in df.groupby("subject_id") if len(g) >= 3}
+    return pd.concat(frames.values(), ignore_index=True).set_axis(list(frames), axis=0)
+
+
+def assert_same_features(left: pd.DataFrame, right: pd.DataFrame) -> None:
+    from features import FEATURE_COLUMNS
+
+    assert list(left.index) == list(right.index)
+    for col in FEATURE_COLUMNS:
+        np.testing.assert_array_equal(left[col].to_numpy(dtype=float), right[col].to_numpy(dtype=float), err_msg=col)
+
+
+@pytest.fixture(scope="module", params=SCALES, ids=lambda n: f"{n}p")
+def census_frame(request):
+    from synthetic_census import generate_census
+
+    df = generate_census(request.param, OBSERVATIONS)
+    # Gaps in vitals and uneven history lengths exercise the skip-missing averages.
+    rng = np.random.default_rng(11)
+    for col in ["heart_rate", "spo2", "temp"]:
+        df.loc[rng.random(len(df)) < 0.05, col] = np.nan
+    df = df[rng.random(len(df)) > 0.1]
+    return df.sort_values(["subject_id", "charttime"])
+
+
+def _by_subject(df, features):
+    return features.set_axis(df.loc[features.index, "subject_id"].tolist(), axis=0)
+
+
+def bench_features_legacy(benchmark, census_frame):
+    from features import latest_features
+
+    subset = census_frame[census_frame["subject_id"] < census_frame["subject_id"].min() + LEGACY_PATIENTS]
+    legacy = benchmark.pedantic(legacy_latest_features, args=(subset,), rounds=1, iterations=1)
+    benchmark.extra_info["patients"] = len(legacy)
+    assert_same_features(legacy, _by_subject(subset, latest_features(subset)))
+
+
+def bench_features_batch_latest(benchmark, census_frame):
+    from features import latest_features, rolling_features
+
+    latest = benchmark.pedantic(latest_features, args=(census_frame,), rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["patients"] = len(latest)
+    assert_same_features(latest, rolling_features(census_frame).loc[latest.index])
+
+
+def bench_features_batch_rolling(benchmark, census_frame):
+    from features import rolling_features
+
+    benchmark.pedantic(rolling_features, args=(census_frame,), rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["rows"] = len(census_frame)
+
+
+def bench_features_online_replay(benchmark, census_frame):
+    """Replay every observation through the online store, then read all patients."""
+    from features import OnlineFeatureStore, latest_features
+
+    def replay():
+        store = OnlineFeatureStore()
+        store.update_frame(census_frame)
+        return store.frame()
+
+    online = benchmark.pedantic(replay, rounds=1, iterations=1)
+    benchmark.extra_info["rows"] = len(census_frame)
+    assert_same_features(online, _by_subject(census_frame, latest_features(census_frame)))
+
+
+def bench_features_online_tick(benchmark, census_frame):
+    """One new observation for every patient on a warm store: the per-refresh cost of online mode."""
+    from features import OnlineFeatureStore
+
+    store = OnlineFeatureStore()
+    store.update_frame(census_frame)
+    latest = census_frame.groupby("subject_id").tail(1)
+    ticks = list(zip(latest["subject_id"].tolist(), latest["charttime"], latest.to_dict("records")))
+
+    def tick():
+        for subject_id, charttime, row in ticks:
+            store.update(subject_id, charttime + pd.Timedelta(hours=1), row)
+        return store.frame()
+
+    benchmark.pedantic(tick, rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["patients"] = len(ticks)
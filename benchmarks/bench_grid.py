@@ -0,0 +1,93 @@
+"""Hourly window features from the dense grid (ml/hourly_grid.py) against the same features from rows.
+
+Both paths compute, per patient hour: 3-hour means of the four vitals, the
+heart-rate change since the previous observed hour, and whether heart rate
+exceeds 120 within the next 6 hours. The row path groups the hourly rows by
+patient (time-based rolling, grouped forward fill and diff, future_labels.py);
+the grid path works on the memory-mapped tensor along its hour axis and
+flattens the result back to rows. The grid benchmark checks both agree.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import OBSERVATIONS, ROUNDS, SCALES
+
+
+VITALS = ["heart_rate", "bp_mean", "spo2", "temp"]
+WINDOW_HOURS = 3
+HORIZON_HOURS = 6
+
+
+@pytest.fixture(scope="module", params=SCALES, ids=lambda n: f"{n}p")
+def census_frame(request):
+    from synthetic_census import generate_census
+
+    return generate_census(request.param, OBSERVATIONS).sort_values(["subject_id", "charttime"])
+
+
+@pytest.fixture(scope="module")
+def grid(census_frame, tmp_path_factory):
+    from hourly_grid import build_grid
+
+    return build_grid(census_frame, tmp_path_factory.mktemp("grid"))
+
+
+def row_features(hourly: pd.DataFrame) -> pd.DataFrame:
+    from future_labels import future_window_labels
+
+    by_patient = hourly.set_index("charttime").groupby("subject_id", sort=False)[VITALS]
+    means = by_patient.rolling(f"{WINDOW_HOURS}h").mean().to_numpy()
+    result = hourly[["subject_id", "charttime"]].copy()
+    for i, col in enumerate(VITALS):
+        result[f"{col}_{WINDOW_HOURS}h"] = means[:, i]
+    filled = hourly.groupby("subject_id", sort=False)["heart_rate"].ffill()
+    result["hr_trend"] = filled.groupby(hourly["subject_id"], sort=False).diff()
+    danger = (hourly["heart_rate"] > 120).to_numpy()
+    horizon = pd.Timedelta(hours=HORIZON_HOURS)
+    result["tachycardia_6h"] = future_window_labels(hourly, {"t": danger}, horizon=horizon)["t"].to_numpy()
+    return result
+
+
+def grid_features(grid) -> pd.DataFrame:
+    from hourly_grid import change, forward_fill, future_any, rolling_mean
+
+    columns = {f"{col}_{WINDOW_HOURS}h": rolling_mean(grid.channel(col), WINDOW_HOURS) for col in VITALS}
+    heart_rate = grid.channel("heart_rate")
+    columns["hr_trend"] = change(forward_fill(heart_rate))
+    columns["tachycardia_6h"] = future_any(heart_rate > 120, HORIZON_HOURS)
+    return grid.frame(**columns)
+
+
+def bench_grid_build(benchmark, census_frame, tmp_path_factory):
+    from hourly_grid import build_grid
+
+    built = benchmark.pedantic(
+        build_grid, setup=lambda: ((census_frame, tmp_path_factory.mktemp("grid")), {}), rounds=ROUNDS, iterations=1
+    )
+    benchmark.extra_info["shape"] = list(built.shape)
+    benchmark.extra_info["grid_mb"] = round(built.values.nbytes / 1e6, 1)
+
+
+def bench_window_features_rows(benchmark, census_frame):
+    from hourly_grid import hourly_rows
+
+    hourly = hourly_rows(census_frame)
+    result = benchmark.pedantic(row_features, args=(hourly,), rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["rows"] = len(result)
+
+
+def bench_window_features_grid(benchmark, census_frame, grid):
+    from hourly_grid import hourly_rows
+
+    result = benchmark.pedantic(grid_features, args=(grid,), rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["rows"] = len(result)
+
+    # Hours without an observation exist only on the grid; compare at the observed ones.
+    # The grid subtracts in float32, the rows in float64.
+    expected = row_features(hourly_rows(census_frame))
+    merged = expected.merge(result, on=["subject_id", "charttime"], suffixes=("", "_grid"))
+    assert len(merged) == len(expected)
+    for col in expected.columns[2:]:
+        assert np.allclose(merged[col], merged[f"{col}_grid"], rtol=1e-5, atol=1e-4, equal_nan=True), col
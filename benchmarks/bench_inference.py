@@ -0,0 +1,52 @@
+"""Single-row scoring from concurrent callers: direct predict_proba vs the micro-batching service."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROUNDS, census_dir
+
+CALLERS = 32
+REQUESTS = 2_000
+
+
+@pytest.fixture(scope="module")
+def model_and_rows():
+    from features import FEATURE_COLUMNS
+
+    model = joblib.load(census_dir(1_000) / "risk_model_v2.pkl")
+    rng = np.random.default_rng(0)
+    rows = [
+        pd.DataFrame(rng.normal([90, 75, 96, 37, 0, 1.1, 1.6, 9, 0, 0], 5, (1, 10)), columns=FEATURE_COLUMNS)
+        for _ in range(REQUESTS)
+    ]
+    return model, rows
+
+
+def bench_direct_single_row(benchmark, model_and_rows):
+    model, rows = model_and_rows
+
+    def run():
+        with ThreadPoolExecutor(CALLERS) as pool:
+            return list(pool.map(lambda r: model.predict_proba(r)[0, 1], rows))
+
+    benchmark.pedantic(run, rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["requests"] = REQUESTS
+
+
+def bench_micro_batched(benchmark, model_and_rows):
+    from inference_service import InferenceService
+    from features import FEATURE_COLUMNS
+
+    model, rows = model_and_rows
+    with InferenceService(lambda: model, FEATURE_COLUMNS, max_batch_rows=256, max_wait_ms=2) as service:
+
+        def run():
+            with ThreadPoolExecutor(CALLERS) as pool:
+                return list(pool.map(lambda r: service.score(r)[0], rows))
+
+        benchmark.pedantic(run, rounds=ROUNDS, iterations=1)
+        benchmark.extra_info.update(requests=REQUESTS, inference=service.metrics())
@@ -0,0 +1,92 @@
+"""Vectorized forward-window labels (ml/future_labels.py) against the old per-row loop."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import DEMO_DATA, OBSERVATIONS, ROUNDS, SCALES
+
+
+# The loop is quadratic per patient; it runs on a slice of each census.
+LEGACY_PATIENTS = 200
+
+
+def legacy_future_risk(df: pd.DataFrame, label: str, horizon: pd.Timedelta) -> pd.Series:
+    """Per-row window scan as build_ml_dataset_v2.py did it before future_labels.py."""
+    from clinical_rules import CLINICAL_RULES
+
+    df = df.copy()
+    df["future_risk"] = 0
+    df["danger"] = CLINICAL_RULES.evaluate(df).label(label)
+
+    for pid in df["subject_id"].unique():
+        patient = df[df["subject_id"] == pid]
+        for i in range(len(patient)):
+            t = patient.iloc[i]["charttime"]
+            future = patient[(patient["charttime"] > t) & (patient["charttime"] <= t + horizon)]
+            if future["danger"].any():
+                df.loc[patient.index[i], "future_risk"] = 1
+    return df["future_risk"]
+
+
+def _irregular(df: pd.DataFrame, seed: int = 7) -> pd.DataFrame:
+    """Shift charttimes by whole half hours so windows see ties and uneven gaps."""
+    rng = np.random.default_rng(seed)
+    shifted = df["charttime"] + pd.to_timedelta(rng.integers(-2, 3, len(df)) * 30, unit="min")
+    return df.assign(charttime=shifted).sort_values(["subject_id", "charttime"])
+
+
+@pytest.fixture(scope="module", params=SCALES, ids=lambda n: f"{n}p")
+def census_frame(request):
+    from synthetic_census import generate_census
+
+    return _irregular(generate_census(request.param, OBSERVATIONS))
+
+
+@pytest.fixture(scope="module")
+def demo_frame():
+    if not DEMO_DATA.exists():
+        pytest.skip(f"Demo extract not found: {DEMO_DATA}")
+    df = pd.read_csv(DEMO_DATA)
+    df["charttime"] = pd.to_datetime(df["charttime"])
+    return df.sort_values(["subject_id", "charttime"])
+
+
+def _bench_legacy(benchmark, df):
+    from future_labels import DEFAULT_HORIZON, rule_future_labels
+
+    labels = benchmark.pedantic(
+        legacy_future_risk, args=(df, "future_risk", DEFAULT_HORIZON), rounds=1, iterations=1
+    )
+    benchmark.extra_info["rows"] = len(df)
+    assert (labels.to_numpy() == rule_future_labels(df)["future_risk"].to_numpy()).all()
+
+
+def _bench_vectorized(benchmark, df):
+    from future_labels import rule_future_labels
+
+    labels = benchmark.pedantic(
+        rule_future_labels,
+        args=(df, {"future_risk": "future_risk", "hemodynamic_risk": "hemodynamic"}),
+        rounds=ROUNDS,
+        iterations=1,
+    )
+    benchmark.extra_info["rows"] = len(df)
+    benchmark.extra_info["positive_rate"] = round(float(labels["future_risk"].mean()), 4)
+
+
+def bench_future_labels_legacy(benchmark, census_frame):
+    subset = census_frame[census_frame["subject_id"] < census_frame["subject_id"].min() + LEGACY_PATIENTS]
+    _bench_legacy(benchmark, subset)
+
+
+def bench_future_labels_vectorized(benchmark, census_frame):
+    _bench_vectorized(benchmark, census_frame)
+
+
+def bench_future_labels_demo_legacy(benchmark, demo_frame):
+    _bench_legacy(benchmark, demo_frame)
+
+
+def bench_future_labels_demo_vectorized(benchmark, demo_frame):
+    _bench_vectorized(benchmark, demo_frame)
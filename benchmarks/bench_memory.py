@@ -0,0 +1,88 @@
+"""Peak memory of loading frames: untyped pd.read_csv against ml/schema.py's read_typed_csv.
+
+Each round loads one file in a fresh interpreter and reports its peak RSS, so
+allocations from other benchmarks do not count. "legacy" is how the readers
+loaded frames before (every column, default dtypes, then to_datetime); "typed"
+reads only the columns the reader keeps, with the registry's compact dtypes.
+
+Files: each census's full_medical_data_clean.csv as the backend loads it, the
+synthetic chartevents file from bench_events.py as extract_vitals.py loads it,
+and the demo extract plus the CHARTEVENTS.csv next to it, when present.
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from app.repository import DEFAULT_COLUMNS
+from bench_events import chartevents  # noqa: F401  (fixture)
+from conftest import DEMO_DATA, PROJECT_ROOT, ROUNDS
+
+
+EVENT_COLUMNS = ["subject_id", "hadm_id", "charttime", "itemid", "valuenum", "valueuom"]
+PROBE = """
+import json, resource, sys, time
+sys.path.insert(0, sys.argv[4])
+import pandas as pd
+from schema import read_typed_csv
+
+path, loader, usecols = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+if loader == "legacy":
+    df = pd.read_csv(path, low_memory=False)
+    df["charttime"] = pd.to_datetime(df["charttime"])
+else:
+    df = read_typed_csv(path, usecols=usecols)
+seconds = time.perf_counter() - started
+unit = 1 << 20 if sys.platform == "darwin" else 1 << 10
+print(json.dumps({
+    "seconds": seconds,
+    "baseline_mb": baseline / unit,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit,
+    "frame_mb": df.memory_usage(deep=True).sum() / 1e6,
+    "rows": len(df),
+}))
+"""
+
+
+def _probe(path, loader: str, usecols: list[str]) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, str(path), loader, json.dumps(usecols), str(PROJECT_ROOT / "ml")],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def _measure(benchmark, path, loader: str, usecols: list[str]) -> None:
+    result = benchmark.pedantic(_probe, args=(path, loader, usecols), rounds=ROUNDS, iterations=1, warmup_rounds=0)
+    benchmark.extra_info["file_mb"] = round(path.stat().st_size / 1e6, 2)
+    for key in ("seconds", "baseline_mb", "peak_rss_mb", "frame_mb"):
+        benchmark.extra_info[key] = round(result[key], 3)
+    benchmark.extra_info["rows"] = result["rows"]
+
+
+@pytest.mark.parametrize("loader", ["legacy", "typed"])
+def bench_memory_census(benchmark, census, loader):
+    _measure(benchmark, census / "full_medical_data_clean.csv", loader, DEFAULT_COLUMNS)
+
+
+@pytest.mark.parametrize("loader", ["legacy", "typed"])
+def bench_memory_chartevents(benchmark, chartevents, loader):  # noqa: F811
+    _measure(benchmark, chartevents["csv"], loader, EVENT_COLUMNS)
+
+
+@pytest.mark.skipif(not DEMO_DATA.exists(), reason=f"demo extract not found at {DEMO_DATA}")
+@pytest.mark.parametrize("loader", ["legacy", "typed"])
+def bench_memory_demo(benchmark, loader):
+    _measure(benchmark, DEMO_DATA, loader, DEFAULT_COLUMNS)
+
+
+@pytest.mark.skipif(not (DEMO_DATA.parent / "CHARTEVENTS.csv").exists(), reason="demo CHARTEVENTS.csv not found")
+@pytest.mark.parametrize("loader", ["legacy", "typed"])
+def bench_memory_demo_chartevents(benchmark, loader):
+    _measure(benchmark, DEMO_DATA.parent / "CHARTEVENTS.csv", loader, EVENT_COLUMNS)
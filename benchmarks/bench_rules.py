@@ -0,0 +1,60 @@
+"""Vectorized clinical rules (ml/clinical_rules.py) against the old row-wise check_alert."""
+
+import pytest
+
+from conftest import OBSERVATIONS, ROUNDS, SCALES
+
+
+def check_alert(row):
+    """Row-wise rule evaluation as alert_engine.py did it before clinical_rules.py."""
+    alerts = []
+
+    hr = row["heart_rate"]
+    bp = row["bp_mean"]
+
+    if hr > 120:
+        alerts.append("High Heart Rate")
+
+    if hr < 50:
+        alerts.append("Low Heart Rate")
+
+    if bp < 60:
+        alerts.append("Low Blood Pressure (Shock Risk)")
+
+    if bp > 110:
+        alerts.append("High Blood Pressure")
+
+    return ", ".join(alerts)
+
+
+@pytest.fixture(scope="module", params=SCALES, ids=lambda n: f"{n}p")
+def census_frame(request):
+    from synthetic_census import generate_census
+
+    return generate_census(request.param, OBSERVATIONS)
+
+
+def bench_alerts_row_apply(benchmark, census_frame):
+    benchmark.pedantic(census_frame.apply, args=(check_alert,), kwargs={"axis": 1}, rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["rows"] = len(census_frame)
+
+
+def bench_alerts_rule_masks(benchmark, census_frame):
+    from clinical_rules import CLINICAL_RULES
+
+    alerts = benchmark.pedantic(
+        lambda: CLINICAL_RULES.evaluate(census_frame).alerts(), rounds=ROUNDS, iterations=1
+    )
+    benchmark.extra_info["rows"] = len(census_frame)
+    assert (alerts == census_frame.apply(check_alert, axis=1).to_numpy()).all()
+
+
+def bench_penalty_and_reasons(benchmark, census_frame):
+    from clinical_rules import CLINICAL_RULES
+
+    def score():
+        result = CLINICAL_RULES.evaluate(census_frame)
+        return result.penalty(), result.reasons()
+
+    benchmark.pedantic(score, rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["rows"] = len(census_frame)
@@ -0,0 +1,88 @@
+"""Cold-start benchmarks: API import time and time until /api/ready reports a snapshot.
+
+Each round starts a fresh interpreter, so nothing is shared with the in-process
+fixtures used by bench_backend.py.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from conftest import PROJECT_ROOT, ROUNDS
+from load_test import free_port
+
+
+BACKEND_ROOT = PROJECT_ROOT / "backend"
+IMPORT_PROBE = (
+    "import json, sys, time; t = time.perf_counter(); import app.main; "
+    "print(json.dumps({'seconds': time.perf_counter() - t, "
+    "'heavy_modules': sorted({'pandas', 'numpy', 'joblib', 'sklearn'} & set(sys.modules))}))"
+)
+
+
+def _server_env(census) -> dict[str, str]:
+    return {**os.environ, "ICU_DATA_ROOT": str(census), "ENABLE_EMAIL_ALERTS": "false"}
+
+
+def _run(benchmark, fn):
+    return benchmark.pedantic(fn, rounds=ROUNDS, iterations=1, warmup_rounds=0)
+
+
+def bench_import_main(benchmark, census):
+    def import_main() -> dict:
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE],
+            cwd=BACKEND_ROOT,
+            env=_server_env(census),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return json.loads(out.stdout)
+
+    result = _run(benchmark, import_main)
+    assert result["heavy_modules"] == [], f"import app.main loaded {result['heavy_modules']}"
+    benchmark.extra_info["import_seconds"] = round(result["seconds"], 4)
+
+
+def bench_time_to_ready(benchmark, census):
+    """Process spawn until /api/ready answers 200; also records when /api/health first answers."""
+
+    def start_until_ready() -> dict:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_ROOT,
+            env=_server_env(census),
+        )
+        healthy = None
+        try:
+            while process.poll() is None:
+                try:
+                    if healthy is None and httpx.get(f"{base_url}/api/health", timeout=5).status_code == 200:
+                        healthy = time.perf_counter() - started
+                    response = httpx.get(f"{base_url}/api/ready", timeout=5)
+                    if response.status_code == 200:
+                        return {
+                            "health_seconds": healthy,
+                            "ready_seconds": time.perf_counter() - started,
+                            "startup": response.json()["startup"],
+                        }
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.02)
+            raise RuntimeError(f"Backend exited with code {process.returncode} before becoming ready")
+        finally:
+            process.terminate()
+            process.wait(10)
+
+    result = _run(benchmark, start_until_ready)
+    benchmark.extra_info["health_seconds"] = round(result["health_seconds"], 4)
+    benchmark.extra_info["ready_seconds"] = round(result["ready_seconds"], 4)
+    benchmark.extra_info["phase_seconds"] = result["startup"]["phase_seconds"]
@@ -0,0 +1,77 @@
+"""Risk model training: full refit against an incremental (warm_start) update of the last version.
+
+"Yesterday" is the first two thirds of every patient's stay in a synthetic census
+and "today" the whole stay. Version 1 is a full refit on yesterday; each round
+then either refits on today or updates version 1 with today's newly labelled
+rows. Holdout metrics (the same hashed-patient holdout for both) are recorded
+in extra_info.
+"""
+
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from conftest import OBSERVATIONS, ROUNDS
+
+
+TRAIN_PATIENTS = int(os.getenv("ICU_BENCH_TRAIN_PATIENTS", "5000"))
+
+
+def _training_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """build_ml_dataset_v2.py's output for ``df``."""
+    from columnar_io import compact_frame
+    from features import FEATURE_COLUMNS, rolling_features
+    from future_labels import rule_future_labels
+
+    df = df.copy()
+    df[FEATURE_COLUMNS] = rolling_features(df)
+    df["future_risk"] = rule_future_labels(df, {"future_risk": "future_risk"})["future_risk"]
+    df = df.dropna(subset=FEATURE_COLUMNS)
+    return compact_frame(df[["subject_id", "charttime"] + FEATURE_COLUMNS + ["future_risk"]])
+
+
+@pytest.fixture(scope="module")
+def training_days(tmp_path_factory):
+    from model_registry import ModelRegistry
+    from synthetic_census import generate_census
+    from train_risk_model_v2 import train
+
+    df = generate_census(TRAIN_PATIENTS, OBSERVATIONS).sort_values(["subject_id", "charttime"])
+    start = df.groupby("subject_id")["charttime"].transform("min")
+    yesterday = _training_rows(df[df["charttime"] < start + pd.Timedelta(hours=OBSERVATIONS * 2 // 3)])
+    today = _training_rows(df)
+    base = ModelRegistry(tmp_path_factory.mktemp("registry"))
+    train(yesterday, base, None, mode="full")
+    return {"today": today, "base": base}
+
+
+def _fresh_registry(base, tmp_path_factory) -> tuple[tuple, dict]:
+    """A registry holding only version 1, so every round updates the same parent."""
+    from model_registry import ModelRegistry
+
+    root = tmp_path_factory.mktemp("registry")
+    shutil.copytree(base.root, root, dirs_exist_ok=True)
+    return (ModelRegistry(root),), {}
+
+
+def _record(benchmark, version) -> None:
+    benchmark.extra_info["fit_seconds"] = version.train_seconds
+    benchmark.extra_info["train_rows"] = version.train_rows
+    benchmark.extra_info["trees"] = version.n_estimators
+    benchmark.extra_info.update({f"holdout_{k}": v for k, v in version.metrics.items()})
+
+
+@pytest.mark.parametrize("mode", ["full", "incremental"])
+def bench_train(benchmark, training_days, tmp_path_factory, mode):
+    from train_risk_model_v2 import train
+
+    version = benchmark.pedantic(
+        lambda registry: train(training_days["today"], registry, None, mode=mode),
+        setup=lambda: _fresh_registry(training_days["base"], tmp_path_factory),
+        rounds=ROUNDS,
+        iterations=1,
+    )
+    _record(benchmark, version)
+    assert version.mode == mode and version.version == 2
@@ -0,0 +1,71 @@
+"""Several ICU units (backend/app/units.py): snapshot builds one after another against the shared
+worker pool, and the cross-unit summary from per-unit summaries against a rescan of every row.
+
+Every unit reads the same synthetic census, so the units are equal in size.
+"""
+
+import os
+
+import pytest
+
+from conftest import ROUNDS
+
+
+UNITS = int(os.getenv("ICU_BENCH_UNITS", "4"))
+
+
+@pytest.fixture(scope="module")
+def registry(census):
+    from app.units import UnitConfig, UnitRegistry
+
+    configs = [UnitConfig(f"unit{i}", census, 20.0, census / "risk_model_v2.pkl") for i in range(UNITS)]
+    with pytest.MonkeyPatch.context() as patch:
+        # Keep the risk history in memory: nothing is written into the census cache.
+        patch.setenv("RISK_HISTORY_FLUSH_SECONDS", "inf")
+        registry = UnitRegistry(configs, workers=UNITS)
+    registry.build_all()
+    yield registry
+    registry.pool.shutdown()
+
+
+def build_sequential(registry):
+    return [repository.get_snapshot(force=True) for repository in registry.repositories.values()]
+
+
+def rescan_summary(registry):
+    """Totals from every row of every unit, as a merged census would compute them."""
+    rows = [row for repository in registry.repositories.values() for row in repository.snapshot.rows]
+    tiers = [row["risk_tier"] for row in rows]
+    return {
+        "patients_monitored": len(rows),
+        "critical_count": tiers.count("critical"),
+        "high_count": tiers.count("high"),
+        "medium_count": tiers.count("medium"),
+        "low_count": tiers.count("low"),
+        "average_risk": round(sum(row["risk_probability"] for row in rows) / len(rows), 4) if rows else 0.0,
+    }
+
+
+def bench_units_build_sequential(benchmark, registry):
+    snaps = benchmark.pedantic(build_sequential, args=(registry,), rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["units"] = len(snaps)
+
+
+def bench_units_build_pool(benchmark, registry):
+    snaps = benchmark.pedantic(registry.build_all, rounds=ROUNDS, iterations=1)
+    benchmark.extra_info["units"] = len(snaps)
+    benchmark.extra_info["workers"] = UNITS
+
+
+def bench_units_summary_rescan(benchmark, registry):
+    benchmark.pedantic(rescan_summary, args=(registry,), rounds=ROUNDS, iterations=10)
+
+
+def bench_units_summary(benchmark, registry):
+    from app.units import SUMMARY_COUNTS
+
+    totals = benchmark.pedantic(registry.summary, rounds=ROUNDS, iterations=10)
+    expected = rescan_summary(registry)
+    assert all(totals[key] == expected[key] for key in SUMMARY_COUNTS)
+    # Per-unit averages are rounded to four places before they are weighted.
+    assert totals["average_risk"] == pytest.approx(expected["average_risk"], abs=1e-3)
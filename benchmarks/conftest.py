@@ -0,0 +1,77 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+sys.path.insert(0, str(PROJECT_ROOT / "ml"))
+
+DATA_CACHE = Path(os.getenv("ICU_BENCH_DATA", PROJECT_ROOT / "benchmarks" / ".data"))
+SCALES = [int(x) for x in os.getenv("ICU_BENCH_SCALES", "1000,10000,100000").split(",") if x.strip()]
+OBSERVATIONS = int(os.getenv("ICU_BENCH_OBSERVATIONS", "24"))
+ROUNDS = int(os.getenv("ICU_BENCH_ROUNDS", "3"))
+WS_SUBSCRIBERS = int(os.getenv("ICU_BENCH_WS_SUBSCRIBERS", "25"))
+DEMO_DATA = Path(
+    os.getenv(
+        "ICU_BENCH_DEMO_DATA",
+        PROJECT_ROOT / "data" / "mimic-iii-clinical-database-demo-1.4" / "full_medical_data_clean.csv",
+    )
+)
+
+
+def census_dir(n_patients: int, n_observations: int = OBSERVATIONS) -> Path:
+    """Return a cached synthetic census folder, generating it on first use."""
+    from synthetic_census import write_census
+
+    target = DATA_CACHE / f"census-{n_patients}x{n_observations}"
+    expected = ["full_medical_data_clean.csv", "alert_episodes.csv", "risk_model_v2.pkl"]
+    if not all((target / name).exists() for name in expected):
+        write_census(target, n_patients, n_observations)
+    return target
+
+
+@pytest.fixture(scope="session", params=SCALES, ids=lambda n: f"{n}p")
+def census(request: pytest.FixtureRequest) -> Path:
+    return census_dir(request.param)
+
+
+@pytest.fixture(scope="session")
+def backend():
+    from app import main
+
+    return main
+
+
+@pytest.fixture(scope="session")
+def repository(census: Path):
+    from app.repository import ICURepository
+
+    repo = ICURepository(
+        full_data_path=census / "full_medical_data_clean.csv",
+        alerts_path=census / "alert_episodes.csv",
+        model_path=census / "risk_model_v2.pkl",
+        # Benchmarks keep the risk history in memory; bench_risk_history_flush measures writing it.
+        risk_history_path=None,
+    )
+    repo.get_snapshot(force=True)
+    return repo
+
+
+@pytest.fixture
+def client(backend, repository, monkeypatch: pytest.MonkeyPatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(backend, "repo", repository)
+    # No context manager: startup hooks (monitor loop, email) stay off during benchmarks.
+    return TestClient(backend.app)
+
+
+@pytest.fixture(scope="session")
+def static_client(backend):
+    """Client for frontend routes, which need no census."""
+    from fastapi.testclient import TestClient
+
+    return TestClient(backend.app)
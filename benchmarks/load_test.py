@@ -0,0 +1,363 @@
+"""End-to-end load test for the ICU backend.
+
+Starts uvicorn against a fresh synthetic census plus a local SMTP sink, then
+drives REST pollers, /ws/alerts subscribers and observation ingests (rows
+appended to full_medical_data_clean.csv, the backend's ingest path) for a fixed
+duration. Results are written as JSON.
+
+    python benchmarks/load_test.py --patients 5000 --pollers 20 --ws-subscribers 50 \
+        --ingest-per-second 2 --duration 120 --output load_result.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import websockets
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "ml"))
+
+from synthetic_census import CLEAN_COLUMNS, write_census  # noqa: E402
+
+
+WS_INTERVAL_SECONDS = 5.0
+SUBJECT_PATTERN = re.compile(rb"Patient #(\d+)")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentiles(values: list[float]) -> dict[str, float | int | None]:
+    if not values:
+        return {"count": 0, "p50": None, "p90": None, "p99": None, "max": None}
+    arr = np.asarray(values, dtype=float) * 1000
+    return {
+        "count": len(values),
+        "p50": round(float(np.percentile(arr, 50)), 2),
+        "p90": round(float(np.percentile(arr, 90)), 2),
+        "p99": round(float(np.percentile(arr, 99)), 2),
+        "max": round(float(arr.max()), 2),
+    }
+
+
+class SMTPSink:
+    """Minimal SMTP server that accepts every message and records arrival times per patient."""
+
+    def __init__(self) -> None:
+        self.port = free_port()
+        self.received: dict[int, float] = {}
+        self.messages = 0
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+        self._ready.wait(5)
+
+    def stop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", self.port))
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            server.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def reply(line: str) -> None:
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        await reply("220 icu-load-test sink")
+        try:
+            while line := await reader.readline():
+                verb = line.strip().split(b" ", 1)[0].upper()
+                if verb == b"EHLO":
+                    await reply("250-icu-load-test\r\n250 AUTH PLAIN LOGIN")
+                elif verb == b"AUTH":
+                    await reply("235 ok")
+                elif verb == b"DATA":
+                    await reply("354 end with <CRLF>.<CRLF>")
+                    data = b""
+                    while (chunk := await reader.readline()) not in (b".\r\n", b""):
+                        data += chunk
+                    arrived = time.time()
+                    self.messages += 1
+                    match = SUBJECT_PATTERN.search(data)
+                    if match:
+                        self.received.setdefault(int(match.group(1)), arrived)
+                    await reply("250 queued")
+                elif verb == b"QUIT":
+                    await reply("221 bye")
+                    break
+                else:
+                    await reply("250 ok")
+        finally:
+            writer.close()
+
+
+def read_rss_mb(pid: int) -> float | None:
+    status = Path(f"/proc/{pid}/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    try:
+        import psutil
+
+        return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace, data_root: Path, sink: SMTPSink) -> None:
+        self.args = args
+        self.data_root = data_root
+        self.sink = sink
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.rest_latency: dict[str, list[float]] = {}
+        self.rest_errors = 0
+        self.ws_frames = 0
+        self.ws_gaps: list[float] = []
+        self.ws_errors = 0
+        self.ingested: dict[int, float] = {}
+        self.memory: list[tuple[float, float]] = []
+        self.next_subject_id = 9_000_000
+        self.process: subprocess.Popen | None = None
+
+    def start_server(self) -> None:
+        env = {
+            **os.environ,
+            "ICU_DATA_ROOT": str(self.data_root),
+            "EMAIL_USER": "monitor@icu.test",
+            "EMAIL_PASS": "load-test",
+            "EMAIL_TO": "oncall@icu.test",
+            "ENABLE_EMAIL_ALERTS": "true",
+            "SMTP_HOST": "127.0.0.1",
+            "SMTP_PORT": str(self.sink.port),
+            "SMTP_STARTTLS": "false",
+            "ALERT_SCAN_INTERVAL_SECONDS": str(self.args.scan_interval),
+            "ALERT_MINIMUM_TIER": self.args.alert_tier,
+            "ALERT_MINIMUM_PROBABILITY": str(self.args.alert_probability),
+        }
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(self.port), "--log-level", "warning"],
+            cwd=PROJECT_ROOT / "backend",
+            env=env,
+        )
+        deadline = time.time() + self.args.startup_timeout
+        while time.time() < deadline:
+            try:
+                if httpx.get(f"{self.base_url}/api/ready", timeout=5).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.5)
+        raise RuntimeError("Backend did not become ready in time")
+
+    def stop_server(self) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(10)
+
+    async def poller(self, client: httpx.AsyncClient, stop_at: float, subject_ids: list[int]) -> None:
+        paths = ["/api/summary", "/api/patients", "/api/alerts/live", "/api/patients/{id}"]
+        i = 0
+        while time.time() < stop_at:
+            path = paths[i % len(paths)]
+            url = path.replace("{id}", str(subject_ids[i % len(subject_ids)])) if subject_ids else path
+            i += 1
+            started = time.perf_counter()
+            try:
+                res = await client.get(url)
+                if res.status_code >= 400:
+                    self.rest_errors += 1
+            except httpx.HTTPError:
+                self.rest_errors += 1
+                continue
+            self.rest_latency.setdefault(path, []).append(time.perf_counter() - started)
+            await asyncio.sleep(self.args.poll_interval)
+
+    async def subscriber(self, stop_at: float) -> None:
+        url = self.base_url.replace("http", "ws") + "/ws/alerts"
+        try:
+            async with websockets.connect(url, max_size=None) as ws:
+                last = None
+                while time.time() < stop_at:
+                    try:
+                        await asyncio.wait_for(ws.recv(), timeout=max(0.1, stop_at - time.time()))
+                    except asyncio.TimeoutError:
+                        break
+                    now = time.time()
+                    self.ws_frames += 1
+                    if last is not None:
+                        self.ws_gaps.append(now - last)
+                    last = now
+        except Exception:
+            self.ws_errors += 1
+
+    def _ingest_batch(self) -> None:
+        """Append three critical observations for a new patient so the next scan must alert."""
+        subject_id = self.next_subject_id
+        self.next_subject_id += 1
+        start = np.datetime64("2131-01-01T00:00:00") + np.timedelta64(subject_id % 10_000, "m")
+        rows = []
+        for k in range(3):
+            values = {
+                "subject_id": subject_id,
+                "hadm_id": subject_id * 10 + 1,
+                "charttime": str(start + np.timedelta64(k, "h")).replace("T", " "),
+                "heart_rate": 142.0,
+                "bp_mean": 52.0,
+                "spo2": 85.0,
+                "temp": 38.9,
+                "creatinine": 2.4,
+                "lactate": 5.1,
+                "wbc": 21.0,
+            }
+            rows.append(",".join(str(values.get(col, 0)) for col in CLEAN_COLUMNS))
+        with (self.data_root / "full_medical_data_clean.csv").open("a", encoding="utf-8") as fh:
+            fh.write("\n".join(rows) + "\n")
+        self.ingested[subject_id] = time.time()
+
+    async def ingester(self, stop_at: float) -> None:
+        if self.args.ingest_per_second <= 0:
+            return
+        interval = 1.0 / self.args.ingest_per_second
+        while time.time() < stop_at:
+            await asyncio.to_thread(self._ingest_batch)
+            await asyncio.sleep(interval)
+
+    async def memory_sampler(self, stop_at: float) -> None:
+        started = time.time()
+        while time.time() < stop_at:
+            rss = read_rss_mb(self.process.pid)
+            if rss is not None:
+                self.memory.append((round(time.time() - started, 2), round(rss, 1)))
+            await asyncio.sleep(1.0)
+
+    async def drive(self) -> float:
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=60) as client:
+            patients = (await client.get("/api/patients", params={"limit": 100})).json()["items"]
+            subject_ids = [p["subject_id"] for p in patients]
+            started = time.time()
+            stop_at = started + self.args.duration
+            tasks = [self.poller(client, stop_at, subject_ids) for _ in range(self.args.pollers)]
+            tasks += [self.subscriber(stop_at) for _ in range(self.args.ws_subscribers)]
+            tasks += [self.ingester(stop_at), self.memory_sampler(stop_at)]
+            await asyncio.gather(*tasks)
+        # Give the monitor loop time to notify patients ingested near the end.
+        await asyncio.sleep(self.args.drain_seconds)
+        return time.time() - started
+
+    def report(self, elapsed: float) -> dict:
+        all_latency = [v for values in self.rest_latency.values() for v in values]
+        delivered = [self.sink.received[sid] - t for sid, t in self.ingested.items() if sid in self.sink.received]
+        late_frames = sum(1 for gap in self.ws_gaps if gap > WS_INTERVAL_SECONDS * self.args.deadline_factor)
+        rss = [m for _, m in self.memory]
+        return {
+            "config": vars(self.args),
+            "elapsed_seconds": round(elapsed, 2),
+            "rest": {
+                "requests": len(all_latency),
+                "errors": self.rest_errors,
+                "throughput_rps": round(len(all_latency) / self.args.duration, 2),
+                "latency_ms": percentiles(all_latency),
+                "by_endpoint_ms": {path: percentiles(v) for path, v in sorted(self.rest_latency.items())},
+            },
+            "websocket": {
+                "subscribers": self.args.ws_subscribers,
+                "frames": self.ws_frames,
+                "errors": self.ws_errors,
+                "frame_gap_ms": percentiles(self.ws_gaps),
+                "late_frames": late_frames,
+            },
+            "ingest": {"patients": len(self.ingested), "rows": 3 * len(self.ingested)},
+            "notifications": {
+                "emails_received": self.sink.messages,
+                "ingested_delivered": len(delivered),
+                "ingested_missed": len(self.ingested) - len(delivered),
+                "delivery_latency_ms": percentiles(delivered),
+            },
+            "memory_mb": {
+                "start": rss[0] if rss else None,
+                "end": rss[-1] if rss else None,
+                "peak": max(rss) if rss else None,
+                "growth": round(rss[-1] - rss[0], 1) if rss else None,
+                "samples": self.memory,
+            },
+        }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the ICU backend with a local SMTP sink.")
+    parser.add_argument("--patients", type=int, default=2_000, help="Synthetic census size.")
+    parser.add_argument("--observations", type=int, default=24, help="Observations per patient.")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of load.")
+    parser.add_argument("--pollers", type=int, default=10, help="Concurrent REST polling clients.")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Seconds between polls per client.")
+    parser.add_argument("--ws-subscribers", type=int, default=25, help="Concurrent /ws/alerts subscribers.")
+    parser.add_argument("--ingest-per-second", type=float, default=1.0, help="New critical patients per second.")
+    parser.add_argument("--scan-interval", type=int, default=5, help="ALERT_SCAN_INTERVAL_SECONDS for the backend.")
+    parser.add_argument("--alert-tier", default="high", help="ALERT_MINIMUM_TIER for the backend.")
+    parser.add_argument("--alert-probability", type=float, default=0.7, help="ALERT_MINIMUM_PROBABILITY.")
+    parser.add_argument(
+        "--deadline-factor",
+        type=float,
+        default=1.5,
+        help="A WebSocket frame is late when its gap exceeds this multiple of the 5 s push interval.",
+    )
+    parser.add_argument("--drain-seconds", type=float, default=15, help="Wait for trailing notifications.")
+    parser.add_argument("--startup-timeout", type=float, default=300, help="Seconds to wait for the backend.")
+    parser.add_argument("--output", default="-", help="JSON result path, '-' for stdout.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="icu-load-") as tmp:
+        data_root = Path(tmp)
+        write_census(data_root, args.patients, args.observations)
+        sink = SMTPSink()
+        sink.start()
+        test = LoadTest(args, data_root, sink)
+        try:
+            test.start_server()
+            elapsed = asyncio.run(test.drive())
+        finally:
+            test.stop_server()
+            sink.stop()
+        result = test.report(elapsed)
+
+    payload = json.dumps(result, indent=2)
+    if args.output == "-":
+        print(payload)
+    else:
+        Path(args.output).write_text(payload, encoding="utf-8")
+        print(f"Saved load test result: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -88,7 +88,9 @@ function renderAlerts(items, searchTerm = "") {
         <strong>Patient #${a.subject_id}</strong>
         <div>${a.alert}</div>
         <small>At alert: HR ${fmt(a.alert_heart_rate)} bpm, MAP ${fmt(a.alert_bp_mean)} mmHg</small><br>
-        <small>${a.charttime || "time unavailable"}</small>
+        <small>${a.charttime || "time unavailable"}${
+          a.observations > 1 ? ` (${a.observations} readings since ${a.started})` : ""
+        }${a.ongoing ? " · ongoing" : ""}</small>
       </div>`
     )
     .join("");
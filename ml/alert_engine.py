@@ -1,46 +1,63 @@
-import pandas as pd
-import os
+"""Batch alerts: collapse alerting observations into episodes (alert_episodes.py) for the backend.
+
+    python ml/alert_engine.py             # every observation of alert_ready_data.cols
+    python ml/alert_engine.py --append    # only observations after the last run's watermark
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+The watermark (last processed charttime per patient) is kept next to the
+episodes in alert_watermark.cols; append mode continues episodes still open at
+the watermark. A run without an episode file or watermark processes everything.
+"""
 
-# Load prepared data
-df = pd.read_csv(os.path.join(BASE_PATH, "alert_ready_data.csv"))
+import argparse
+import os
+from pathlib import Path
+
+import pandas as pd
 
-# Convert time
-df["charttime"] = pd.to_datetime(df["charttime"])
+from alert_episodes import alert_episodes, append_episodes, read_episodes
+from columnar_io import read_frame, write_frame
+from model_registry import KEY_COLUMNS, make_watermark, unseen_rows
+from paths import DATA_ROOT
 
-# Alert rules
-def check_alert(row):
-    alerts = []
+BASE_PATH = str(DATA_ROOT)
+OUTPUT = os.path.join(BASE_PATH, "alert_episodes.csv")
+WATERMARK = os.path.join(BASE_PATH, "alert_watermark.cols")
 
-    hr = row["heart_rate"]
-    bp = row["bp_mean"]
 
-    if hr > 120:
-        alerts.append("High Heart Rate")
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Write alert episodes for the backend.")
+    parser.add_argument("--append", action="store_true", help="Process only observations newer than the last run.")
+    return parser.parse_args()
 
-    if hr < 50:
-        alerts.append("Low Heart Rate")
 
-    if bp < 60:
-        alerts.append("Low Blood Pressure (Shock Risk)")
+def main() -> None:
+    args = parse_args()
 
-    if bp > 110:
-        alerts.append("High Blood Pressure")
+    # Load prepared data
+    df = read_frame(os.path.join(BASE_PATH, "alert_ready_data.cols"))
+    df = df.sort_values(["subject_id", "charttime"], kind="stable", ignore_index=True)
 
-    return ", ".join(alerts)
+    if args.append and os.path.exists(OUTPUT) and os.path.exists(WATERMARK):
+        watermark = read_frame(WATERMARK)
+        new_rows = df[unseen_rows(df, watermark)]
+        episodes = append_episodes(read_episodes(Path(OUTPUT)), alert_episodes(new_rows), new_rows)
+        watermark = make_watermark(pd.concat([watermark, new_rows[KEY_COLUMNS]], ignore_index=True))
+        print(f"Processed {len(new_rows)} new of {len(df)} observations")
+    else:
+        episodes = alert_episodes(df)
+        watermark = make_watermark(df)
+        print(f"Processed {len(df)} observations")
 
-# Apply rules
-df["alert"] = df.apply(check_alert, axis=1)
+    print(f"ALERT EPISODES: {len(episodes)} ({int(episodes['open'].sum())} open)")
+    print(episodes.tail(10))
 
-# Filter only danger rows
-alerts_df = df[df["alert"] != ""]
+    tmp = OUTPUT + ".tmp"
+    episodes.to_csv(tmp, index=False)
+    os.replace(tmp, OUTPUT)
+    write_frame(watermark[KEY_COLUMNS].reset_index(drop=True), WATERMARK)
 
-print("ALERTS FOUND:")
-print(alerts_df.head(10))
+    print("Saved alert episodes to:", OUTPUT)
 
-# Save alerts
-OUTPUT = os.path.join(BASE_PATH, "patient_alerts.csv")
-alerts_df.to_csv(OUTPUT, index=False)
 
-print("Saved alerts to:", OUTPUT)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Alert episodes: a patient's consecutive alerting observations of one rule, collapsed into one row.
+
+Every rule of the clinical rule table with an alert text (clinical_rules.py) is
+evaluated for the whole frame at once. Within each patient's observations, in
+charttime order, a run of observations on which the rule fires is one episode:
+
+    subject_id, hadm_id   the patient
+    alert, rule           the rule's alert text and name
+    start, end            charttimes of the first and last firing observation
+    count                 firing observations in the run
+    peak_value, peak_time most extreme value of the rule's column (highest for
+                          ">" rules, lowest for "<" rules) and when it was seen
+    heart_rate, bp_mean   vitals at the episode's last observation
+    open                  the rule still fired on the patient's last observation
+
+A patient tachycardic for a day is one row instead of one per observation.
+``append_episodes`` continues open episodes with the observations of a later
+run, so an episode file can grow with only the new rows.
+
+    episodes = alert_episodes(df)                                   # df sorted by (subject_id, charttime)
+    episodes = append_episodes(episodes, alert_episodes(new_rows), new_rows)
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from clinical_rules import CLINICAL_RULES, RuleSet
+from schema import read_typed_csv
+
+
+EPISODE_COLUMNS = [
+    "subject_id",
+    "hadm_id",
+    "alert",
+    "rule",
+    "start",
+    "end",
+    "count",
+    "peak_value",
+    "peak_time",
+    "heart_rate",
+    "bp_mean",
+    "open",
+]
+END_VALUES = ["heart_rate", "bp_mean"]
+
+
+def _column(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.full(len(df), np.nan, dtype=np.float32)
+    values = df[col]
+    dtype = np.float32 if values.dtype == np.float32 else float
+    return values.to_numpy(dtype=dtype, na_value=np.nan)
+
+
+def _peak_sign(rules: RuleSet, names: pd.Series) -> np.ndarray:
+    """+1 where a rule's peak is its highest value (">" rules), -1 where it is its lowest."""
+    signs = {r.name: (1.0 if r.op.startswith(">") else -1.0) for r in rules.rules}
+    return names.map(signs).to_numpy(dtype=float)
+
+
+def alert_episodes(df: pd.DataFrame, rules: RuleSet = CLINICAL_RULES) -> pd.DataFrame:
+    """Episodes of ``df``, which must be sorted by (subject_id, charttime); ordered by end time."""
+    subject = df["subject_id"].to_numpy()
+    n = len(df)
+    new_patient = np.ones(n, dtype=bool)
+    new_patient[1:] = subject[1:] != subject[:-1]
+    patient_last = np.append(new_patient[1:], True) if n else new_patient
+    charttime = df["charttime"].to_numpy()
+    hadm = df["hadm_id"].to_numpy() if "hadm_id" in df.columns else np.full(n, np.nan)
+    end_values = {col: _column(df, col) for col in END_VALUES}
+    result = rules.evaluate(df)
+
+    episodes = []
+    for i in rules.alert_rows:
+        rule = rules.rules[i]
+        fired = result.masks[i]
+        rows = np.flatnonzero(fired)
+        if not len(rows):
+            continue
+        continues = np.zeros(n, dtype=bool)
+        continues[1:] = fired[:-1]
+        begins = fired & (new_patient | ~continues)
+        run = np.cumsum(begins)[rows]
+        first = np.flatnonzero(np.r_[True, run[1:] != run[:-1]])
+        last = np.append(first[1:], len(rows)) - 1
+
+        # The peak of each run is its first row once rows are ordered by run, then by signed value.
+        column = _column(df, rule.column)
+        sign = 1.0 if rule.op.startswith(">") else -1.0
+        peak = rows[np.lexsort((-sign * column[rows].astype(float), run))[first]]
+        start, end = rows[first], rows[last]
+        episodes.append(
+            pd.DataFrame(
+                {
+                    "subject_id": subject[start],
+                    "hadm_id": hadm[start],
+                    "alert": rule.alert,
+                    "rule": rule.name,
+                    "start": charttime[start],
+                    "end": charttime[end],
+                    "count": last - first + 1,
+                    "peak_value": column[peak],
+                    "peak_time": charttime[peak],
+                    **{col: values[end] for col, values in end_values.items()},
+                    "open": patient_last[end],
+                }
+            )
+        )
+    if not episodes:
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+    return _ordered(pd.concat(episodes, ignore_index=True))
+
+
+def _ordered(episodes: pd.DataFrame) -> pd.DataFrame:
+    return episodes.sort_values(["end", "subject_id", "rule"], kind="stable", ignore_index=True)[EPISODE_COLUMNS]
+
+
+def append_episodes(
+    previous: pd.DataFrame, new: pd.DataFrame, new_rows: pd.DataFrame, rules: RuleSet = CLINICAL_RULES
+) -> pd.DataFrame:
+    """Join ``new`` episodes (of ``new_rows``, observations after the ones ``previous`` covers) onto ``previous``.
+
+    An open previous episode continues into the new episode of the same patient
+    and rule that starts at the patient's first new observation; open episodes
+    of patients whose first new observation does not fire are closed.
+    """
+    if new_rows.empty:
+        return previous
+    first_new = new_rows.groupby("subject_id")["charttime"].min()
+    key = ["subject_id", "rule"]
+    starts_first = np.zeros(len(new), dtype=bool)
+    if len(new):
+        starts_first = new["start"].to_numpy() == new["subject_id"].map(first_new).to_numpy()
+    new = new.assign(_starts_first=starts_first)
+    continued = previous[previous["open"]].merge(
+        new[new["_starts_first"]], on=key, suffixes=("", "_new"), how="inner"
+    )
+
+    if len(continued):
+        sign = _peak_sign(rules, continued["rule"])
+        peak, newer = continued["peak_value"].to_numpy(float), continued["peak_value_new"].to_numpy(float)
+        newer_peak = sign * newer > sign * peak
+        joined = continued[EPISODE_COLUMNS].copy()
+        joined["count"] = continued["count"].to_numpy() + continued["count_new"].to_numpy()
+        for col in ["peak_value", "peak_time"]:
+            joined[col] = np.where(newer_peak, continued[f"{col}_new"], continued[col])
+        for col in ["end", "open", *END_VALUES]:
+            joined[col] = continued[f"{col}_new"].to_numpy()
+    else:
+        joined = pd.DataFrame(columns=EPISODE_COLUMNS)
+
+    joined_keys = pd.MultiIndex.from_frame(joined[key]) if len(joined) else pd.MultiIndex.from_tuples([], names=key)
+    previous_keys = pd.MultiIndex.from_frame(previous[key])
+    kept = previous[~(previous["open"].to_numpy() & previous_keys.isin(joined_keys))].copy()
+    # Patients with new observations closed every episode not continued above.
+    kept.loc[kept["subject_id"].isin(first_new.index), "open"] = False
+    fresh = new[~(new["_starts_first"] & pd.MultiIndex.from_frame(new[key]).isin(joined_keys))]
+    parts = [part for part in (kept, joined, fresh[EPISODE_COLUMNS]) if len(part)]
+    if not parts:
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+    return _ordered(pd.concat(parts, ignore_index=True))
+
+
+def read_episodes(path: Path) -> pd.DataFrame:
+    return read_typed_csv(path)
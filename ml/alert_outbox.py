@@ -0,0 +1,56 @@
+"""Notification outbox: scoring queues alerts in a JSON-lines file, a separate step sends them.
+
+    queue_alerts(DATA_ROOT / "alert_outbox.jsonl", records)    # batch_score.py, never blocks on SMTP
+    python ml/send_alert_email.py                              # sends what was queued since the last run
+
+The sender keeps the byte offset of the last alert it delivered in
+``<outbox>.offset`` and stops at the first failure, so an alert that could not
+be sent is retried by the next run and a crash resends at most one alert.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+
+def offset_path(outbox: Path) -> Path:
+    return outbox.with_name(outbox.name + ".offset")
+
+
+def queue_alerts(outbox: Path, records: Iterable[dict[str, Any]]) -> int:
+    """Append one JSON line per record; returns how many were queued."""
+    lines = [json.dumps(record, default=str) + "\n" for record in records]
+    if lines:
+        with open(outbox, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+    return len(lines)
+
+
+def pending(outbox: Path) -> Iterator[tuple[int, dict[str, Any]]]:
+    """Queued records after the sender's offset, each with the offset just past it."""
+    if not outbox.exists():
+        return
+    marker = offset_path(outbox)
+    start = int(marker.read_text(encoding="utf-8")) if marker.exists() else 0
+    with open(outbox, "rb") as f:
+        f.seek(start)
+        for line in iter(f.readline, b""):
+            if not line.endswith(b"\n"):
+                break  # a record still being written
+            yield f.tell(), json.loads(line)
+
+
+def drain(outbox: Path, send: Callable[[dict[str, Any]], bool]) -> tuple[int, int]:
+    """Send pending records in order until one fails; returns (sent, still pending)."""
+    marker = offset_path(outbox)
+    records = list(pending(outbox))
+    sent = 0
+    for end, record in records:
+        if not send(record):
+            break
+        tmp = marker.with_name(marker.name + ".tmp")
+        tmp.write_text(str(end), encoding="utf-8")
+        os.replace(tmp, marker)
+        sent += 1
+    return sent, len(records) - sent
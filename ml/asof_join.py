@@ -0,0 +1,111 @@
+"""Nearest-in-time joins of several feature frames onto one base frame.
+
+Equivalent to chaining ``pd.merge_asof(direction="nearest", by=..., tolerance=...)``
+once per feature frame, but every frame is sorted once by (group keys, time) and
+all matches are resolved with ``searchsorted``; ``on`` does not need to be sorted
+globally, and the base frame keeps its row order.
+
+For each base row and source, the candidates are the last source row of the same
+group at or before the base time and the first one after it; the later one wins
+only when strictly closer, and a match farther than the source's tolerance is
+dropped. All columns of a source come from the same matched row, as with
+``merge_asof``. Rows with a missing group key or time never match.
+
+    merged = asof_join(
+        base,
+        [
+            AsofSource(vitals, ["bp_mean", "spo2", "temp"], "2h"),
+            AsofSource(labs, ["creatinine", "lactate", "wbc"], "12h"),
+        ],
+    )
+"""
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import take
+
+
+DEFAULT_BY = ("subject_id", "hadm_id")
+
+
+@dataclass(frozen=True)
+class AsofSource:
+    frame: pd.DataFrame
+    columns: Sequence[str]
+    tolerance: pd.Timedelta | str | None = None
+
+
+def _group_codes(frames: list[pd.DataFrame], by: Sequence[str]) -> list[np.ndarray]:
+    """Shared integer codes for the ``by`` columns of every frame; -1 where a key is missing."""
+    sizes = [len(frame) for frame in frames]
+    combined = np.zeros(sum(sizes), dtype=np.int64)
+    missing = np.zeros(sum(sizes), dtype=bool)
+    for col in by:
+        codes, uniques = pd.factorize(pd.concat([frame[col] for frame in frames], ignore_index=True))
+        missing |= codes < 0
+        combined = combined * max(len(uniques), 1) + codes
+    combined[missing] = -1
+    return np.split(combined, np.cumsum(sizes)[:-1])
+
+
+def _times(frame: pd.DataFrame, on: str) -> np.ndarray:
+    return pd.to_datetime(frame[on]).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def asof_join(
+    left: pd.DataFrame,
+    sources: Sequence[AsofSource],
+    by: Sequence[str] = DEFAULT_BY,
+    on: str = "charttime",
+) -> pd.DataFrame:
+    """Return ``left`` with each source's columns taken from its nearest row within tolerance."""
+    by = list(by)
+    new_columns = [col for source in sources for col in source.columns]
+    clashes = sorted(set(new_columns) & set(left.columns) | {c for c in new_columns if new_columns.count(c) > 1})
+    if clashes:
+        raise ValueError(f"asof_join would overwrite columns: {clashes}")
+
+    frames = [left] + [source.frame for source in sources]
+    codes = _group_codes(frames, by)
+    times = [_times(frame, on) for frame in frames]
+    nat = np.iinfo(np.int64).min
+
+    # Dense ranks of all distinct times make (group, time) a single sortable int64 key.
+    all_times = np.concatenate(times)
+    distinct, ranks = np.unique(all_times, return_inverse=True)
+    ranks = np.split(ranks.astype(np.int64), np.cumsum([len(t) for t in times])[:-1])
+    keys = [code * len(distinct) + rank for code, rank in zip(codes, ranks)]
+
+    left_valid = (codes[0] >= 0) & (times[0] != nat)
+    left_key, left_time, left_code = keys[0], times[0], codes[0]
+
+    result = left.copy()
+    for source, code, time, key in zip(sources, codes[1:], times[1:], keys[1:]):
+        rows = np.flatnonzero((code >= 0) & (time != nat))
+        rows = rows[np.argsort(key[rows], kind="stable")]
+        sorted_key, sorted_code, sorted_time = key[rows], code[rows], time[rows]
+        if len(rows) == 0:
+            indexer = np.full(len(left), -1)
+        else:
+            last = len(rows) - 1
+            before = np.searchsorted(sorted_key, left_key, side="right") - 1
+            after = before + 1
+            has_before = left_valid & (before >= 0) & (sorted_code[np.maximum(before, 0)] == left_code)
+            has_after = left_valid & (after <= last) & (sorted_code[np.minimum(after, last)] == left_code)
+            gap_before = left_time - sorted_time[np.maximum(before, 0)]
+            gap_after = sorted_time[np.minimum(after, last)] - left_time
+
+            use_after = has_after & (~has_before | (gap_after < gap_before))
+            match = np.where(use_after, after, np.where(has_before, before, -1))
+            if source.tolerance is not None:
+                gap = np.where(use_after, gap_after, gap_before)
+                match[gap > pd.Timedelta(source.tolerance).value] = -1
+            indexer = np.where(match >= 0, rows[np.maximum(match, 0)], -1)
+
+        for col in source.columns:
+            values = source.frame[col].array
+            result[col] = take(values, indexer, allow_fill=True)
+    return result
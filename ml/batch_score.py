@@ -0,0 +1,164 @@
+"""Score every patient's latest observation in batches, for one or more inputs and as-of times.
+
+    python ml/batch_score.py                                          # latest state of the cleaned census
+    python ml/batch_score.py --at "2150-01-02 03:00" --at "2150-01-02 06:00" --format cols
+    python ml/batch_score.py --input unit_a.csv --input unit_b.cols --jobs 4 --output-dir scores/
+
+Each input file x ``--at`` time is one task, and tasks run in parallel worker
+processes (``--jobs``), each loading the model once. A task keeps the rows at
+or before its as-of time, builds all patients' latest features in one pass
+over the frame sorted by (subject_id, charttime) (features.latest_features),
+and scores them ``--batch-rows`` at a time. Results go to
+``<output dir>/<input stem>_scores[_<as-of>].csv`` or ``.cols`` (columnar_io).
+
+Critical patients (risk >= CRITICAL_RISK) are queued in the alert outbox
+(alert_outbox.py) instead of being emailed from the scoring loop;
+``python ml/send_alert_email.py`` sends them.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from alert_outbox import queue_alerts
+from columnar_io import compact_frame, read_frame, write_frame
+from features import FEATURE_COLUMNS, SOURCE_COLUMNS, latest_features
+from paths import DATA_ROOT
+from schema import read_typed_csv
+
+
+INPUT_COLUMNS = ["subject_id", "charttime", *SOURCE_COLUMNS]
+HIGH_RISK = 0.7
+CRITICAL_RISK = 0.85
+BATCH_ROWS = 1024
+
+# Per worker process: the model, and the last input read (tasks for several as-of times reuse it).
+_worker: dict[str, Any] = {}
+
+
+def read_input(path: Path) -> pd.DataFrame:
+    if path.suffix == ".cols":
+        df = read_frame(path, columns=INPUT_COLUMNS)
+    else:
+        df = read_typed_csv(path, usecols=INPUT_COLUMNS)
+    return df.sort_values(["subject_id", "charttime"], kind="stable", ignore_index=True)
+
+
+def status(probability: np.ndarray) -> np.ndarray:
+    return np.select([probability >= CRITICAL_RISK, probability >= HIGH_RISK], ["critical", "high"], "stable")
+
+
+def score_frame(
+    df: pd.DataFrame, model: Any, at: pd.Timestamp | None = None, batch_rows: int = BATCH_ROWS
+) -> pd.DataFrame:
+    """Latest features and risk per patient of ``df`` (sorted by subject_id, charttime) as of ``at``."""
+    if at is not None:
+        df = df[df["charttime"] <= at]
+    features = latest_features(df)
+    probability = np.empty(len(features))
+    for start in range(0, len(features), batch_rows):
+        batch = features.iloc[start : start + batch_rows]
+        probability[start : start + batch_rows] = model.predict_proba(batch[FEATURE_COLUMNS])[:, 1]
+
+    scores = df.loc[features.index, ["subject_id", "charttime"]].reset_index(drop=True)
+    scores["as_of"] = pd.NaT if at is None else at
+    scores[FEATURE_COLUMNS] = features.to_numpy()
+    scores["risk_probability"] = probability
+    scores["status"] = status(probability)
+    return scores
+
+
+def _load_model(model_path: str) -> None:
+    _worker["model"] = joblib.load(model_path)
+
+
+def score_task(path: str, at: str | None, output: str, batch_rows: int) -> dict[str, Any]:
+    """One input x as-of time; runs in a worker process."""
+    started = time.perf_counter()
+    if _worker.get("path") != path:
+        _worker["frame"], _worker["path"] = read_input(Path(path)), path
+    scores = score_frame(_worker["frame"], _worker["model"], pd.Timestamp(at) if at else None, batch_rows)
+    if output.endswith(".cols"):
+        write_frame(compact_frame(scores), Path(output))
+    else:
+        scores.to_csv(output, index=False)
+    notify = scores[scores["status"] == "critical"]
+    return {
+        "input": path,
+        "as_of": at,
+        "output": output,
+        "patients": len(scores),
+        "seconds": round(time.perf_counter() - started, 3),
+        "critical": notify[["subject_id", "charttime", "risk_probability", "hr_avg", "bp_avg"]].to_dict("records"),
+    }
+
+
+def output_path(output_dir: Path, path: Path, at: str | None, fmt: str) -> Path:
+    suffix = f"_{pd.Timestamp(at):%Y%m%dT%H%M}" if at else ""
+    return output_dir / f"{path.stem}_scores{suffix}.{fmt}"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Batch risk scoring of patients' latest observations.")
+    parser.add_argument(
+        "--input",
+        type=Path,
+        action="append",
+        help="Census file (.csv or .cols); repeatable. Default: full_medical_data_clean.csv.",
+    )
+    parser.add_argument("--at", action="append", help="Score as of this time; repeatable. Default: latest data.")
+    parser.add_argument("--model", type=Path, default=DATA_ROOT / "risk_model_v2.pkl")
+    parser.add_argument("--output-dir", type=Path, default=DATA_ROOT / "scores")
+    parser.add_argument("--format", choices=["csv", "cols"], default="csv")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS, help="Rows per predict_proba call.")
+    parser.add_argument("--outbox", type=Path, default=DATA_ROOT / "alert_outbox.jsonl")
+    parser.add_argument("--no-notify", action="store_true", help="Do not queue critical patients for email.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    inputs = args.input or [DATA_ROOT / "full_medical_data_clean.csv"]
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    tasks = [
+        (str(path), at, str(output_path(args.output_dir, path, at, args.format)), args.batch_rows)
+        for path in inputs
+        for at in (args.at or [None])
+    ]
+
+    started = time.perf_counter()
+    jobs = max(1, min(args.jobs, len(tasks)))
+    if jobs == 1:
+        _load_model(str(args.model))
+        results = [score_task(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_load_model, initargs=(str(args.model),)) as pool:
+            results = list(pool.map(score_task, *zip(*tasks)))
+
+    queued = 0
+    queued_at = datetime.now(UTC).isoformat(timespec="seconds")
+    for result in results:
+        as_of = result["as_of"] or "latest"
+        print(
+            f"{result['input']} @ {as_of}: {result['patients']} patients in {result['seconds']:.2f}s "
+            f"-> {result['output']} ({len(result['critical'])} critical)"
+        )
+        if not args.no_notify:
+            context = {"source": result["input"], "as_of": as_of, "queued_at": queued_at}
+            queued += queue_alerts(args.outbox, [{**record, **context} for record in result["critical"]])
+    print(f"Scored {len(tasks)} task(s) with {jobs} worker(s) in {time.perf_counter() - started:.2f}s")
+    if queued:
+        print(f"Queued {queued} alert(s) in {args.outbox}; send them with python ml/send_alert_email.py")
+
+
+if __name__ == "__main__":
+    main()
@@ -61,11 +61,14 @@ def build_icu_stay_summary() -> pd.DataFrame:
 
 
 def build_alert_summary() -> pd.DataFrame:
-    alerts_file = BASE_PATH / "patient_alerts.csv"
+    alerts_file = BASE_PATH / "alert_episodes.csv"
     if not alerts_file.exists():
-        return pd.DataFrame(columns=["hadm_id", "alert_event_count", "has_shock_alert", "has_tachy_alert"])
+        return pd.DataFrame(
+            columns=["hadm_id", "alert_event_count", "alert_episode_count", "has_shock_alert", "has_tachy_alert"]
+        )
 
-    alerts = pd.read_csv(alerts_file)
+    # One row per alert episode (alert_engine.py); count is the episode's alerting observations.
+    alerts = pd.read_csv(alerts_file, usecols=["hadm_id", "alert", "count"])
     alerts["alert"] = alerts["alert"].fillna("").astype(str)
     alerts["has_shock_alert"] = alerts["alert"].str.contains("Shock Risk", case=False)
     alerts["has_tachy_alert"] = alerts["alert"].str.contains("High Heart Rate", case=False)
@@ -73,7 +76,8 @@ def build_alert_summary() -> pd.DataFrame:
     summary = (
         alerts.groupby("hadm_id", as_index=False)
         .agg(
-            alert_event_count=("alert", "count"),
+            alert_event_count=("count", "sum"),
+            alert_episode_count=("alert", "count"),
             has_shock_alert=("has_shock_alert", "max"),
             has_tachy_alert=("has_tachy_alert", "max"),
         )
@@ -138,7 +142,7 @@ def main() -> None:
     ).fillna(False)
     df["has_multiple_icu_stays"] = (pd.to_numeric(df["icu_stay_count"], errors="coerce").fillna(0) > 1)
 
-    for col in ["alert_event_count", "diagnosis_count", "icu_stay_count"]:
+    for col in ["alert_event_count", "alert_episode_count", "diagnosis_count", "icu_stay_count"]:
         df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
     for col in ["has_shock_alert", "has_tachy_alert", "died_within_30d", "has_multiple_icu_stays"]:
         df[col] = df[col].astype("boolean").fillna(False).astype(bool)
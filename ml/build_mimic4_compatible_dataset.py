@@ -1,10 +1,15 @@
 import argparse
 import json
+import os
 from pathlib import Path
 from typing import Dict, Iterable, List
 
 import pandas as pd
 
+from asof_join import AsofSource, asof_join
+from event_cache import EventCache
+from parallel_events import DEFAULT_BLOCK_BYTES, hourly_wide, read_filtered_events_parallel
+
 
 EXPECTED_COLUMNS = [
     "subject_id",
@@ -92,36 +97,35 @@ def read_filtered_events(
         frames.append(grouped)
 
     if not frames:
-        return pd.DataFrame(columns=["subject_id", "hadm_id", "charttime"])
+        return hourly_wide(pd.DataFrame())
 
     long_df = pd.concat(frames, ignore_index=True)
     long_df = (
         long_df.groupby(["subject_id", "hadm_id", "charttime", "feature"], as_index=False)["valuenum"]
         .median()
     )
-    wide = (
-        long_df.pivot_table(
-            index=["subject_id", "hadm_id", "charttime"], columns="feature", values="valuenum", aggfunc="median"
-        )
-        .reset_index()
-        .rename_axis(None, axis=1)
-    )
-    return wide
+    return hourly_wide(long_df)
 
 
-def merge_asof_feature(base: pd.DataFrame, feature_df: pd.DataFrame, feature_col: str, tolerance: str) -> pd.DataFrame:
-    if feature_col not in feature_df.columns:
-        feature_df = feature_df.assign(**{feature_col: pd.NA})
-    part = feature_df[["subject_id", "hadm_id", "charttime", feature_col]].sort_values(
-        ["subject_id", "hadm_id", "charttime"]
-    )
-    return pd.merge_asof(
-        base.sort_values(["subject_id", "hadm_id", "charttime"]),
-        part,
-        on="charttime",
-        by=["subject_id", "hadm_id"],
-        direction="nearest",
-        tolerance=pd.Timedelta(tolerance),
+def read_events(
+    path: Path,
+    feature_map: Dict[int, str],
+    args: argparse.Namespace,
+    temp_f_itemids: set[int] | None = None,
+) -> pd.DataFrame:
+    if args.cache_dir:
+        cache = EventCache(path, Path(args.cache_dir), workers=args.workers, block_bytes=args.block_mb << 20)
+        return cache.hourly_features(feature_map, temp_f_itemids or ())
+    if args.workers > 1:
+        return read_filtered_events_parallel(
+            path,
+            feature_map,
+            temp_f_itemids or (),
+            workers=args.workers,
+            block_bytes=args.block_mb << 20,
+        )
+    return read_filtered_events(
+        path, sorted(feature_map), feature_map, chunksize=args.chunksize, temp_f_itemids=temp_f_itemids
     )
 
 
@@ -144,7 +148,25 @@ def parse_args() -> argparse.Namespace:
         default="data/mimic-iii-clinical-database-demo-1.4/full_medical_data_clean.csv",
         help="Output file path for compatible dataset.",
     )
-    parser.add_argument("--chunksize", type=int, default=1_500_000, help="CSV chunk size.")
+    parser.add_argument("--chunksize", type=int, default=1_500_000, help="CSV chunk size (single worker).")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Extraction processes; 1 keeps the single-process chunked reader.",
+    )
+    parser.add_argument(
+        "--block-mb",
+        type=int,
+        default=DEFAULT_BLOCK_BYTES >> 20,
+        help="Bytes per worker block in MiB (byte ranges for .csv, decompressed blocks for .gz).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default="data/mimic4_event_cache",
+        help="Hourly per-itemid medians cached per source file; reruns with a new mapping or tolerance skip the scan.",
+    )
+    parser.add_argument("--no-cache", dest="cache_dir", action="store_const", const=None, help="Always rescan sources.")
     return parser.parse_args()
 
 
@@ -178,36 +200,25 @@ def main() -> None:
     chartevents_path = resolve_table_path(root, "icu/chartevents.csv")
     labevents_path = resolve_table_path(root, "hosp/labevents.csv")
 
-    vital_itemids = sorted(vital_feature_map.keys())
-    lab_itemids = sorted(lab_feature_map.keys())
-
     print(f"Reading vitals from: {chartevents_path}")
-    vitals_wide = read_filtered_events(
-        chartevents_path,
-        vital_itemids,
-        vital_feature_map,
-        chunksize=args.chunksize,
-        temp_f_itemids=temp_f_ids,
-    )
+    vitals_wide = read_events(chartevents_path, vital_feature_map, args, temp_f_itemids=temp_f_ids)
     if "heart_rate" not in vitals_wide.columns:
         raise RuntimeError("No heart_rate extracted. Check --mapping-json for correct MIMIC-IV itemids.")
 
     print(f"Reading labs from: {labevents_path}")
-    labs_wide = read_filtered_events(
-        labevents_path,
-        lab_itemids,
-        lab_feature_map,
-        chunksize=args.chunksize,
+    labs_wide = read_events(labevents_path, lab_feature_map, args)
+
+    keys = ["subject_id", "hadm_id", "charttime"]
+    vital_cols, lab_cols = ["bp_mean", "spo2", "temp"], ["creatinine", "lactate", "wbc"]
+    base = vitals_wide[keys + ["heart_rate"]].sort_values(keys).reset_index(drop=True)
+    base = asof_join(
+        base,
+        [
+            AsofSource(vitals_wide.reindex(columns=keys + vital_cols), vital_cols, pd.Timedelta(hours=vital_tol)),
+            AsofSource(labs_wide.reindex(columns=keys + lab_cols), lab_cols, pd.Timedelta(hours=lab_tol)),
+        ],
     )
 
-    base = vitals_wide[["subject_id", "hadm_id", "charttime", "heart_rate"]].copy()
-    for col in ["bp_mean", "spo2", "temp"]:
-        base = merge_asof_feature(base, vitals_wide, col, f"{vital_tol}h")
-    for col in ["creatinine", "lactate", "wbc"]:
-        base = merge_asof_feature(base, labs_wide, col, f"{lab_tol}h")
-
-    base = base.sort_values(["subject_id", "hadm_id", "charttime"]).reset_index(drop=True)
-
     for col in ["spo2", "temp", "creatinine", "lactate", "wbc"]:
         base[f"{col}_missing"] = base[col].isna().astype(int)
 
@@ -1,13 +1,14 @@
 import pandas as pd
 import os
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+from columnar_io import compact_frame, read_frame, write_frame
+from future_labels import rule_future_labels
+from paths import DATA_ROOT
 
-# Load alert-ready data
-df = pd.read_csv(os.path.join(BASE_PATH, "alert_ready_data.csv"))
+BASE_PATH = str(DATA_ROOT)
 
-# Convert time
-df["charttime"] = pd.to_datetime(df["charttime"])
+# Load alert-ready data
+df = read_frame(os.path.join(BASE_PATH, "alert_ready_data.cols"))
 
 # Sort
 df = df.sort_values(["subject_id", "charttime"])
@@ -19,25 +20,7 @@ df["bp_avg"] = df.groupby("subject_id")["bp_mean"].rolling(3).mean().reset_index
 df["hr_trend"] = df.groupby("subject_id")["heart_rate"].diff()
 
 # Create risk label (future danger in next 6 hours)
-df["future_risk"] = 0
-
-for pid in df["subject_id"].unique():
-
-    patient = df[df["subject_id"] == pid]
-
-    for i in range(len(patient)):
-
-        current_time = patient.iloc[i]["charttime"]
-
-        future = patient[
-            (patient["charttime"] > current_time) &
-            (patient["charttime"] <= current_time + pd.Timedelta(hours=6))
-        ]
-
-        if ((future["heart_rate"] > 120).any() or
-            (future["bp_mean"] < 60).any()):
-
-            df.loc[patient.index[i], "future_risk"] = 1
+df["future_risk"] = rule_future_labels(df, {"future_risk": "hemodynamic"}, horizon=pd.Timedelta(hours=6))["future_risk"]
 
 
 # Clean NaNs
@@ -54,7 +37,7 @@ ml_data = df[[
 print("ML Dataset Shape:", ml_data.shape)
 
 # Save
-OUTPUT = os.path.join(BASE_PATH, "ml_training_data.csv")
-ml_data.to_csv(OUTPUT, index=False)
+OUTPUT = os.path.join(BASE_PATH, "ml_training_data.cols")
+write_frame(compact_frame(ml_data), OUTPUT)
 
 print("Saved:", OUTPUT)
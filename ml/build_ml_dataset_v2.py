@@ -1,76 +1,46 @@
 import pandas as pd
 import os
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+from features import FEATURE_COLUMNS, rolling_features
+from columnar_io import compact_frame, read_frame, write_frame
+from future_labels import rule_future_labels
+from paths import DATA_ROOT
 
-# Load cleaned full data
-df = pd.read_csv(
-    os.path.join(BASE_PATH, "full_medical_data_clean.csv")
-)
+BASE_PATH = str(DATA_ROOT)
 
-df["charttime"] = pd.to_datetime(df["charttime"])
+# Load cleaned full data
+df = read_frame(os.path.join(BASE_PATH, "full_medical_data_clean.cols"))
 
 # Sort
 df = df.sort_values(["subject_id", "charttime"])
 
 # -----------------------------
-# Missing flags (IMPORTANT)
-# -----------------------------
-df["spo2_missing"] = df["spo2"].isna().astype(int)
-df["temp_missing"] = df["temp"].isna().astype(int)
-
-# Fill vitals with median (after flag)
-df["spo2"] = df["spo2"].fillna(df["spo2"].median())
-df["temp"] = df["temp"].fillna(df["temp"].median())
-
-# -----------------------------
-# Rolling features (3 hours)
+# Features (same definitions the backend serves)
 # -----------------------------
-group = df.groupby("subject_id")
-
-df["hr_avg"] = group["heart_rate"].rolling(3).mean().reset_index(0, drop=True)
-df["bp_avg"] = group["bp_mean"].rolling(3).mean().reset_index(0, drop=True)
-df["spo2_avg"] = group["spo2"].rolling(3).mean().reset_index(0, drop=True)
-df["temp_avg"] = group["temp"].rolling(3).mean().reset_index(0, drop=True)
-
-df["hr_trend"] = group["heart_rate"].diff()
+# Missing flags come from the raw values; window averages skip missing vitals.
+df[FEATURE_COLUMNS] = rolling_features(df)
 
 # -----------------------------
 # Create target (future risk)
 # -----------------------------
-df["future_risk"] = 0
-
-for pid in df["subject_id"].unique():
-
-    patient = df[df["subject_id"] == pid]
-
-    for i in range(len(patient)):
-
-        t = patient.iloc[i]["charttime"]
-
-        future = patient[
-            (patient["charttime"] > t) &
-            (patient["charttime"] <= t + pd.Timedelta(hours=6))
-        ]
-
-        if (
-            (future["heart_rate"] > 120).any() or
-            (future["bp_mean"] < 60).any() or
-            (future["spo2"] < 90).any() or
-            (future["lactate"] > 2).any()
-        ):
-            df.loc[patient.index[i], "future_risk"] = 1
+# Danger (future_risk rules) in any observation within the next 6 hours.
+df["future_risk"] = rule_future_labels(df, {"future_risk": "future_risk"}, horizon=pd.Timedelta(hours=6))["future_risk"]
 
 
 # -----------------------------
 # Remove incomplete rows
 # -----------------------------
-df = df.dropna()
+df = df.dropna(subset=FEATURE_COLUMNS)
 
 # -----------------------------
 # Final ML dataset
 # -----------------------------
+# subject_id and charttime identify rows for the model registry's watermarks
+# (incremental training); they are not model inputs.
 ml_data = df[[
+    "subject_id",
+    "charttime",
+
     "hr_avg",
     "bp_avg",
     "spo2_avg",
@@ -90,7 +60,7 @@ ml_data = df[[
 print("ML Dataset Shape:", ml_data.shape)
 
 # Save
-OUTPUT = os.path.join(BASE_PATH, "ml_training_data_v2.csv")
-ml_data.to_csv(OUTPUT, index=False)
+OUTPUT = os.path.join(BASE_PATH, "ml_training_data_v2.cols")
+write_frame(compact_frame(ml_data), OUTPUT)
 
 print("Saved:", OUTPUT)
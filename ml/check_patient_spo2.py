@@ -1,9 +1,11 @@
-import pandas as pd
 import os
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+from columnar_io import read_frame
+from paths import DATA_ROOT
 
-df = pd.read_csv(os.path.join(BASE_PATH, "clean_vitals.csv"))
+BASE_PATH = str(DATA_ROOT)
+
+df = read_frame(os.path.join(BASE_PATH, "clean_vitals.cols"))
 
 result = df[
     (df["subject_id"] == 10006) &
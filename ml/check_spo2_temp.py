@@ -1,11 +1,13 @@
-import pandas as pd
 import os
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+from paths import DATA_ROOT
+from schema import read_typed_csv
 
-chartevents = pd.read_csv(
+BASE_PATH = str(DATA_ROOT)
+
+chartevents = read_typed_csv(
     os.path.join(BASE_PATH, "CHARTEVENTS.csv"),
-    low_memory=False
+    usecols=["itemid"]
 )
 
 # Check counts
@@ -1,12 +1,12 @@
-import pandas as pd
 import os
 import numpy as np
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+from columnar_io import compact_frame, export_csv, read_frame, write_frame
+from paths import DATA_ROOT
 
-df = pd.read_csv(os.path.join(BASE_PATH, "full_medical_data.csv"))
+BASE_PATH = str(DATA_ROOT)
 
-df["charttime"] = pd.to_datetime(df["charttime"])
+df = read_frame(os.path.join(BASE_PATH, "full_medical_data.cols"))
 
 # Sort
 df = df.sort_values(["subject_id", "charttime"])
@@ -39,7 +39,10 @@ print("Missing after cleaning:")
 print(df[cols].isna().sum())
 
 # Save
-OUTPUT = os.path.join(BASE_PATH, "full_medical_data_clean.csv")
-df.to_csv(OUTPUT, index=False)
-
+OUTPUT = os.path.join(BASE_PATH, "full_medical_data_clean.cols")
+write_frame(compact_frame(df), OUTPUT)
 print("Saved:", OUTPUT)
+
+# CSV copy for the backend and live_predictor.py, which read full_medical_data_clean.csv.
+CSV_OUTPUT = export_csv(OUTPUT, os.path.join(BASE_PATH, "full_medical_data_clean.csv"))
+print("Saved:", CSV_OUTPUT)
@@ -0,0 +1,161 @@
+"""Declarative clinical threshold rules evaluated as NumPy masks.
+
+One rule table drives the backend rule penalty and risk reasons, the batch
+alert labels written by alert_engine.py and the danger flags behind the
+future_risk training labels. Rules are compiled once into comparison ufuncs
+and evaluated column-wise for whole frames; NaN values never trigger a rule.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+
+
+OPERATORS = {">": np.greater, ">=": np.greater_equal, "<": np.less, "<=": np.less_equal}
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    column: str
+    op: str
+    threshold: float
+    penalty: float = 0.0
+    reason: str | None = None
+    alert: str | None = None
+    labels: tuple[str, ...] = ()
+
+
+CLINICAL_RULE_TABLE: tuple[Rule, ...] = (
+    Rule(
+        "tachycardia",
+        "heart_rate",
+        ">",
+        120,
+        penalty=0.2,
+        reason="tachycardia",
+        alert="High Heart Rate",
+        labels=("future_risk", "hemodynamic"),
+    ),
+    Rule("bradycardia", "heart_rate", "<", 50, penalty=0.15, alert="Low Heart Rate"),
+    Rule(
+        "hypotension",
+        "bp_mean",
+        "<",
+        60,
+        penalty=0.25,
+        reason="hypotension",
+        alert="Low Blood Pressure (Shock Risk)",
+        labels=("future_risk", "hemodynamic"),
+    ),
+    Rule("hypertension", "bp_mean", ">", 110, penalty=0.1, alert="High Blood Pressure"),
+    Rule("hypoxemia", "spo2", "<", 90, penalty=0.2, reason="hypoxemia", labels=("future_risk",)),
+    Rule("elevated_lactate", "lactate", ">", 2.2, penalty=0.15, reason="elevated lactate"),
+    # Training labels have always used a lower lactate cut-off than the live rule penalty.
+    Rule("lactate_label", "lactate", ">", 2.0, labels=("future_risk",)),
+)
+
+
+def _float_dtype(values: Any) -> np.dtype:
+    """float32 columns stay float32 so thresholds compare at their precision; anything else is float64."""
+    dtype = getattr(values, "dtype", None)
+    return np.dtype(np.float32) if dtype == np.float32 else np.dtype(np.float64)
+
+
+class RuleResult:
+    """Masks for one evaluation; masks[i, j] is True when rule i fires on row j."""
+
+    def __init__(self, rule_set: "RuleSet", masks: np.ndarray) -> None:
+        self.rule_set = rule_set
+        self.masks = masks
+
+    def __len__(self) -> int:
+        return self.masks.shape[1]
+
+    def mask(self, name: str) -> np.ndarray:
+        return self.masks[self.rule_set.index[name]]
+
+    def penalty(self) -> np.ndarray:
+        return self.rule_set.penalties @ self.masks
+
+    def label(self, name: str) -> np.ndarray:
+        rows = self.rule_set.label_rows.get(name)
+        if rows is None:
+            raise KeyError(f"Unknown label: {name}")
+        return self.masks[rows].any(axis=0)
+
+    def _pattern_codes(self, rows: np.ndarray) -> np.ndarray:
+        # Pack the fired rules into one integer per row so that text is built once per
+        # distinct combination instead of once per row.
+        weights = np.left_shift(1, np.arange(len(rows), dtype=np.int64))
+        return weights @ self.masks[rows].astype(np.int64)
+
+    def reasons(self, default: str | None = "monitoring") -> list[list[str]]:
+        rows = self.rule_set.reason_rows
+        codes = self._pattern_codes(rows)
+        texts = [self.rule_set.rules[i].reason for i in rows]
+        lookup = {}
+        for code in np.unique(codes).tolist():
+            fired = [text for bit, text in enumerate(texts) if code >> bit & 1]
+            lookup[code] = fired or ([default] if default else [])
+        return [list(lookup[code]) for code in codes.tolist()]
+
+    def alerts(self, separator: str = ", ") -> np.ndarray:
+        rows = self.rule_set.alert_rows
+        codes = self._pattern_codes(rows)
+        texts = [self.rule_set.rules[i].alert for i in rows]
+        unique, inverse = np.unique(codes, return_inverse=True)
+        labels = np.array(
+            [separator.join(text for bit, text in enumerate(texts) if code >> bit & 1) for code in unique.tolist()],
+            dtype=object,
+        )
+        return labels[inverse]
+
+
+class RuleSet:
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        unknown = {r.op for r in rules} - OPERATORS.keys()
+        if unknown:
+            raise ValueError(f"Unsupported rule operators: {sorted(unknown)}")
+        self.rules = tuple(rules)
+        self.index = {r.name: i for i, r in enumerate(self.rules)}
+        self.penalties = np.array([r.penalty for r in self.rules], dtype=float)
+        self.reason_rows = np.array([i for i, r in enumerate(self.rules) if r.reason], dtype=int)
+        self.alert_rows = np.array([i for i, r in enumerate(self.rules) if r.alert], dtype=int)
+        label_members: dict[str, list[int]] = {}
+        for i, r in enumerate(self.rules):
+            for label in r.labels:
+                label_members.setdefault(label, []).append(i)
+        self.label_rows = {k: np.array(v, dtype=int) for k, v in label_members.items()}
+        self._compiled = [(r.column, OPERATORS[r.op], r.threshold) for r in self.rules]
+
+    @property
+    def columns(self) -> list[str]:
+        return sorted({r.column for r in self.rules})
+
+    def evaluate(self, frame: Mapping[str, Any]) -> RuleResult:
+        """Evaluate every rule over a DataFrame or a mapping of equal-length arrays."""
+        arrays: dict[str, np.ndarray] = {}
+        n_rows = None
+        for col in self.columns:
+            if col in frame:
+                values = frame[col]
+                if hasattr(values, "to_numpy"):
+                    values = values.to_numpy(dtype=_float_dtype(values), na_value=np.nan)
+                values = np.asarray(values, dtype=_float_dtype(values))
+                arrays[col] = values
+                n_rows = len(values)
+        if n_rows is None:
+            n_rows = len(frame) if hasattr(frame, "index") else 0
+
+        masks = np.zeros((len(self.rules), n_rows), dtype=bool)
+        for i, (col, op, threshold) in enumerate(self._compiled):
+            values = arrays.get(col)
+            if values is not None:
+                # Compare in the column's precision: float32 2.2 must not count as above 2.2.
+                op(values, values.dtype.type(threshold), out=masks[i])
+        return RuleResult(self, masks)
+
+
+CLINICAL_RULES = RuleSet(CLINICAL_RULE_TABLE)
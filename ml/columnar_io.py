@@ -0,0 +1,157 @@
+"""Typed binary columnar frames handed between ml/ pipeline stages.
+
+A ``.cols`` file holds one DataFrame: a small JSON header (row count, and each
+column's dtype and byte offset) followed by the raw column buffers, aligned to
+64 bytes. Reading parses nothing, keeps datetime64, int32 and float32 dtypes,
+and with ``mmap=True`` maps numeric columns straight from the file. Text columns
+are stored as categoricals (codes plus the category list), nullable integer,
+float and boolean columns as values plus a missing mask. The index is not kept.
+
+    write_frame(compact_frame(df), DATA_ROOT / "clean_vitals.cols")
+    df = read_frame(DATA_ROOT / "clean_vitals.cols", columns=["subject_id", "charttime", "valuenum"])
+
+CSV is written only for consumers outside the pipeline (the backend, people):
+``export_csv`` or ``python ml/columnar_io.py frame.cols frame.csv``.
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from schema import COLUMN_TYPES, ColumnType, apply_schema
+
+
+MAGIC = b"ICUCOLS1"
+FORMAT_VERSION = 1
+ALIGN = 64
+
+
+def _aligned(n: int) -> int:
+    return -(-n // ALIGN) * ALIGN
+
+
+def compact_frame(df: pd.DataFrame, types: dict[str, ColumnType] = COLUMN_TYPES) -> pd.DataFrame:
+    """Registry dtypes from ``schema`` for known columns, float32 for other float columns."""
+    df = apply_schema(df, types)
+    floats = [col for col in df.columns if col not in types and getattr(df[col].dtype, "kind", "") == "f"]
+    return df.astype({col: np.float32 for col in floats})
+
+
+def _encode(series: pd.Series) -> tuple[dict, list[np.ndarray]]:
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype) or dtype == object:
+        categorical = series.astype("category").array
+        meta = {"kind": "categorical", "categories": categorical.categories.tolist()}
+        return meta, [np.asarray(categorical.codes)]
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        numpy_dtype = getattr(dtype, "numpy_dtype", None)
+        if numpy_dtype is None:
+            raise TypeError(f"Column {series.name!r} has unsupported dtype {dtype}")
+        values = series.to_numpy(dtype=numpy_dtype, na_value=numpy_dtype.type(0))
+        return {"kind": "masked", "extension": str(dtype)}, [values, series.isna().to_numpy()]
+    if dtype.kind not in "biufmM":
+        raise TypeError(f"Column {series.name!r} has unsupported dtype {dtype}")
+    return {"kind": "array"}, [series.to_numpy()]
+
+
+def write_frame(df: pd.DataFrame, path: Path) -> Path:
+    """Write ``df`` (index dropped) to ``path`` atomically."""
+    path = Path(path)
+    metas, buffers, offset = [], [], 0
+    for col in df.columns:
+        if not isinstance(col, str):
+            raise TypeError(f"Column names must be strings, got {col!r}")
+        meta, arrays = _encode(df[col])
+        meta["name"] = col
+        meta["buffers"] = []
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            meta["buffers"].append({"dtype": array.dtype.str, "offset": offset})
+            buffers.append((offset, array))
+            offset = _aligned(offset + array.nbytes)
+        metas.append(meta)
+
+    header = json.dumps({"version": FORMAT_VERSION, "rows": len(df), "columns": metas}).encode("utf-8")
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for buffer_offset, array in buffers:
+            f.seek(data_start + buffer_offset)
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+    return path
+
+
+def read_header(path: Path) -> tuple[dict, int]:
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a columnar frame file")
+        size = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(size))
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path} has unsupported format version {header.get('version')}")
+    return header, _aligned(len(MAGIC) + 8 + size)
+
+
+def read_frame(path: Path, columns: Sequence[str] | None = None, mmap: bool = False) -> pd.DataFrame:
+    """Read a frame written by ``write_frame``; ``mmap=True`` maps numeric columns read-only."""
+    path = Path(path)
+    header, data_start = read_header(path)
+    rows = header["rows"]
+    metas = {meta["name"]: meta for meta in header["columns"]}
+    names = list(metas) if columns is None else list(columns)
+    missing = [name for name in names if name not in metas]
+    if missing:
+        raise KeyError(f"{path} has no columns {missing}")
+
+    def load(buffer: dict) -> np.ndarray:
+        dtype = np.dtype(buffer["dtype"])
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        if mmap:
+            return np.memmap(path, dtype=dtype, mode="r", offset=data_start + buffer["offset"], shape=(rows,))
+        with open(path, "rb") as f:
+            f.seek(data_start + buffer["offset"])
+            return np.fromfile(f, dtype=dtype, count=rows)
+
+    data = {}
+    for name in names:
+        meta = metas[name]
+        arrays = [load(buffer) for buffer in meta["buffers"]]
+        if meta["kind"] == "categorical":
+            data[name] = pd.Categorical.from_codes(arrays[0], categories=meta["categories"])
+        elif meta["kind"] == "masked":
+            array_type = pd.api.types.pandas_dtype(meta["extension"]).construct_array_type()
+            data[name] = array_type(np.asarray(arrays[0]), np.asarray(arrays[1]))
+        else:
+            data[name] = arrays[0]
+    return pd.DataFrame(data, columns=names, copy=False)
+
+
+def export_csv(path: Path, csv_path: Path, **to_csv_kwargs) -> Path:
+    """Compatibility export for readers that expect CSV."""
+    csv_path = Path(csv_path)
+    read_frame(path).to_csv(csv_path, index=False, **to_csv_kwargs)
+    return csv_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export a .cols frame to CSV.")
+    parser.add_argument("frame", type=Path)
+    parser.add_argument("csv", type=Path)
+    args = parser.parse_args()
+    export_csv(args.frame, args.csv)
+    print(f"Saved: {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Risk model candidates smaller than the deployed forest, and the measurements used to choose one.
+
+Candidates (``build_candidates``):
+
+    forest        the reference forest (registry's latest, or a FOREST_PARAMS refit)
+    pruned_forest fewer, shallower trees with large leaves
+    hist_gb       HistGradientBoostingClassifier
+    distilled     one shallow regression tree fitted to the reference forest's probabilities
+
+Every candidate is trained with balanced class weights (or from a teacher that
+was), so probabilities stay on the scale the backend's risk tiers expect.
+``measure`` scores a candidate on the holdout (AUROC, Brier score, expected
+calibration error) and times what serving pays for: pickled size, time to load
+that pickle, and ``predict_proba`` latency on batches of ``batch_rows`` rows.
+"""
+
+import io
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.metrics import brier_score_loss, roc_auc_score
+from sklearn.tree import DecisionTreeRegressor
+
+from features import FEATURE_COLUMNS
+
+
+TARGET = "future_risk"
+PRUNED_PARAMS = {"n_estimators": 50, "max_depth": 8, "min_samples_leaf": 20}
+HIST_GB_PARAMS = {"max_iter": 200, "learning_rate": 0.1, "max_leaf_nodes": 31, "class_weight": "balanced"}
+DISTILLED_DEPTH = 8
+
+
+class DistilledClassifier(ClassifierMixin, BaseEstimator):
+    """A regression tree fitted to a teacher's P(risk); predict_proba returns [1 - p, p]."""
+
+    def __init__(self, max_depth: int = DISTILLED_DEPTH, min_samples_leaf: int = 20) -> None:
+        self.max_depth = max_depth
+        self.min_samples_leaf = min_samples_leaf
+
+    def fit(self, X: pd.DataFrame, y: Any = None, teacher: Any = None) -> "DistilledClassifier":
+        if teacher is None:
+            raise ValueError("DistilledClassifier needs a fitted teacher model")
+        target = teacher.predict_proba(X)[:, 1]
+        self.tree_ = DecisionTreeRegressor(max_depth=self.max_depth, min_samples_leaf=self.min_samples_leaf)
+        self.tree_.fit(X, target)
+        self.classes_ = np.array([0, 1])
+        return self
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        p = np.clip(self.tree_.predict(X), 0.0, 1.0)
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        return self.classes_[(self.predict_proba(X)[:, 1] >= 0.5).astype(int)]
+
+
+@dataclass
+class CandidateReport:
+    name: str
+    kind: str
+    fit_seconds: float
+    auroc: float
+    brier: float
+    ece: float
+    size_bytes: int
+    load_ms: float
+    batch_rows: int
+    latency_ms_p50: float
+    latency_ms_p95: float
+
+    def within(self, max_latency_ms: float, max_size_mb: float) -> bool:
+        return self.latency_ms_p95 <= max_latency_ms and self.size_bytes <= max_size_mb * 1e6
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def expected_calibration_error(y: np.ndarray, prob: np.ndarray, bins: int = 10) -> float:
+    """Row-weighted gap between mean predicted and observed risk over equal-width probability bins."""
+    which = np.minimum((prob * bins).astype(int), bins - 1)
+    predicted = np.bincount(which, weights=prob, minlength=bins)
+    observed = np.bincount(which, weights=y, minlength=bins)
+    return float(np.abs(predicted - observed).sum() / max(len(y), 1))
+
+
+def build_candidates(
+    train: pd.DataFrame, reference: Any, forest_params: dict[str, Any]
+) -> dict[str, tuple[Any, float]]:
+    """Fit the candidates on ``train``; values are (model, fit seconds). ``reference`` is already fitted."""
+    X, y = train[FEATURE_COLUMNS], train[TARGET]
+    builders = {
+        "pruned_forest": lambda: RandomForestClassifier(**{**forest_params, **PRUNED_PARAMS}).fit(X, y),
+        "hist_gb": lambda: HistGradientBoostingClassifier(**HIST_GB_PARAMS, random_state=42).fit(X, y),
+        "distilled": lambda: DistilledClassifier().fit(X, teacher=reference),
+    }
+    models = {"forest": (reference, 0.0)}
+    for name, build in builders.items():
+        started = time.perf_counter()
+        model = build()
+        models[name] = (model, time.perf_counter() - started)
+    return models
+
+
+def measure(
+    name: str, model: Any, fit_seconds: float, holdout: pd.DataFrame, batch_rows: int = 1024, repeats: int = 20
+) -> CandidateReport:
+    y = holdout[TARGET].to_numpy()
+    prob = model.predict_proba(holdout[FEATURE_COLUMNS])[:, 1]
+
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    payload = buffer.getvalue()
+    load_times = []
+    for _ in range(5):
+        started = time.perf_counter()
+        joblib.load(io.BytesIO(payload))
+        load_times.append(time.perf_counter() - started)
+
+    # Batches cycle through the holdout rows, as the backend scores one row per patient.
+    features = holdout[FEATURE_COLUMNS]
+    starts = np.arange(repeats) * batch_rows % max(len(features), 1)
+    latencies = []
+    for start in starts:
+        batch = features.iloc[np.arange(start, start + batch_rows) % len(features)]
+        started = time.perf_counter()
+        model.predict_proba(batch)
+        latencies.append(time.perf_counter() - started)
+
+    return CandidateReport(
+        name=name,
+        kind=type(model).__name__,
+        fit_seconds=round(fit_seconds, 3),
+        auroc=round(float(roc_auc_score(y, prob)), 4),
+        brier=round(float(brier_score_loss(y, prob)), 4),
+        ece=round(expected_calibration_error(y, prob), 4),
+        size_bytes=len(payload),
+        load_ms=round(float(np.median(load_times)) * 1000, 2),
+        batch_rows=batch_rows,
+        latency_ms_p50=round(float(np.percentile(latencies, 50)) * 1000, 2),
+        latency_ms_p95=round(float(np.percentile(latencies, 95)) * 1000, 2),
+    )
+
+
+def choose(reports: list[CandidateReport], max_latency_ms: float, max_size_mb: float) -> CandidateReport | None:
+    """Best holdout AUROC within the budget; the smaller model wins a tie. None when nothing fits."""
+    fitting = [r for r in reports if r.within(max_latency_ms, max_size_mb)]
+    if not fitting:
+        return None
+    return max(fitting, key=lambda r: (r.auroc, -r.size_bytes))
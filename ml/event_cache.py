@@ -0,0 +1,215 @@
+"""On-disk cache of hourly event medians per itemid, keyed by the source file.
+
+The first run over chartevents/labevents stores (subject_id, hadm_id, hour,
+itemid, valuenum) rows, where valuenum is the raw hourly median of that itemid,
+as one ``.npy`` file per column. Rows are sorted by (subject_id, hadm_id, hour,
+itemid) and split into partitions of whole subject_id ranges. Later runs with a
+different itemid mapping or merge tolerance read the columns back (memory
+mapped) instead of rescanning the source; itemids that are not cached yet are
+extracted on their own and added as a new segment.
+
+Units are converted and itemids mapped to features only when the wide frame is
+built, so the cache does not depend on the mapping. A feature fed by several
+itemids takes the median of their hourly medians, which can differ from the
+median over the pooled raw values when more than one of them was charted in the
+same hour.
+
+Layout::
+
+    <cache_dir>/<source name>-<fingerprint>/manifest.json
+    <cache_dir>/<source name>-<fingerprint>/seg-000/part-00000/<column>.npy
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from parallel_events import DEFAULT_BLOCK_BYTES, extract_hourly_medians, hourly_wide
+
+
+CACHE_VERSION = 1
+CACHE_COLUMNS = ["subject_id", "hadm_id", "hour", "itemid", "valuenum"]
+CACHE_DTYPES = {
+    "subject_id": np.int64,
+    "hadm_id": np.int64,
+    "hour": "datetime64[ns]",
+    "itemid": np.int64,
+    "valuenum": np.float64,
+}
+DEFAULT_PARTITION_ROWS = 4_000_000
+FINGERPRINT_SAMPLE_BYTES = 1 << 20
+
+
+def source_fingerprint(path: Path) -> str:
+    """Size, mtime and a hash of the first and last MiB: cheap enough for multi-GB sources."""
+    stat = path.stat()
+    digest = hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+        if stat.st_size > FINGERPRINT_SAMPLE_BYTES:
+            f.seek(max(stat.st_size - FINGERPRINT_SAMPLE_BYTES, FINGERPRINT_SAMPLE_BYTES))
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _empty_long() -> pd.DataFrame:
+    return pd.DataFrame({col: np.array([], dtype=dtype) for col, dtype in CACHE_DTYPES.items()})
+
+
+def _subject_partitions(subjects: np.ndarray, partition_rows: int) -> list[tuple[int, int]]:
+    """Row ranges of about ``partition_rows`` that never split a subject_id (``subjects`` sorted)."""
+    bounds = [0]
+    while bounds[-1] + partition_rows < len(subjects):
+        cut = bounds[-1] + partition_rows
+        cut = int(np.searchsorted(subjects, subjects[cut], side="left"))
+        if cut <= bounds[-1]:
+            cut = int(np.searchsorted(subjects, subjects[bounds[-1]], side="right"))
+        if cut >= len(subjects):
+            break
+        bounds.append(cut)
+    bounds.append(len(subjects))
+    return [(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+
+class EventCache:
+    """Hourly per-itemid medians of one events file, stored under ``cache_dir``."""
+
+    def __init__(
+        self,
+        source: Path,
+        cache_dir: Path,
+        workers: int | None = None,
+        block_bytes: int = DEFAULT_BLOCK_BYTES,
+        partition_rows: int = DEFAULT_PARTITION_ROWS,
+    ) -> None:
+        self.source = Path(source)
+        self.fingerprint = source_fingerprint(self.source)
+        self.root = Path(cache_dir) / f"{self.source.name}-{self.fingerprint}"
+        self.workers = workers
+        self.block_bytes = block_bytes
+        self.partition_rows = partition_rows
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / "manifest.json"
+
+    def manifest(self) -> dict:
+        if self.manifest_path.exists():
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            if manifest.get("version") == CACHE_VERSION and manifest.get("fingerprint") == self.fingerprint:
+                return manifest
+        return {
+            "version": CACHE_VERSION,
+            "source": str(self.source),
+            "fingerprint": self.fingerprint,
+            "segments": [],
+        }
+
+    def cached_itemids(self) -> set[int]:
+        return {itemid for segment in self.manifest()["segments"] for itemid in segment["itemids"]}
+
+    def prune_stale(self) -> None:
+        """Remove caches of earlier versions of the same source file."""
+        for path in self.root.parent.glob(f"{self.source.name}-*"):
+            if path != self.root and (path / "manifest.json").exists():
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _write_segment(self, manifest: dict, long_df: pd.DataFrame, itemids: list[int]) -> None:
+        name = f"seg-{len(manifest['segments']):03d}"
+        tmp = self.root / f".{name}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        long_df = long_df.sort_values(["subject_id", "hadm_id", "hour", "itemid"], ignore_index=True)
+        # Hours keep the resolution the extractor's pandas produced.
+        columns = {
+            col: long_df[col].to_numpy(dtype=None if col == "hour" else dtype) for col, dtype in CACHE_DTYPES.items()
+        }
+        partitions = []
+        for i, (lo, hi) in enumerate(_subject_partitions(columns["subject_id"], self.partition_rows)):
+            part = f"part-{i:05d}"
+            (tmp / part).mkdir()
+            for col, values in columns.items():
+                np.save(tmp / part / f"{col}.npy", values[lo:hi])
+            partitions.append(
+                {
+                    "path": f"{name}/{part}",
+                    "rows": hi - lo,
+                    "subject_min": int(columns["subject_id"][lo]),
+                    "subject_max": int(columns["subject_id"][hi - 1]),
+                }
+            )
+
+        # A segment folder the manifest does not list is left over from a run that died
+        # between these two replaces (or from an older cache version); os.replace cannot
+        # overwrite a non-empty folder.
+        shutil.rmtree(self.root / name, ignore_errors=True)
+        os.replace(tmp, self.root / name)
+        manifest["segments"].append({"itemids": itemids, "partitions": partitions})
+        manifest_tmp = self.manifest_path.with_suffix(".json.tmp")
+        manifest_tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.replace(manifest_tmp, self.manifest_path)
+
+    def ensure(self, itemids: Iterable[int]) -> dict:
+        """Extract and store any of ``itemids`` the cache does not hold yet; return the manifest."""
+        manifest = self.manifest()
+        cached = {itemid for segment in manifest["segments"] for itemid in segment["itemids"]}
+        missing = sorted({int(x) for x in itemids} - cached)
+        if not missing:
+            return manifest
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.prune_stale()
+        long_df = extract_hourly_medians(
+            self.source, {itemid: itemid for itemid in missing}, workers=self.workers, block_bytes=self.block_bytes
+        )
+        long_df = long_df.rename(columns={"charttime": "hour", "feature": "itemid"})
+        self._write_segment(manifest, long_df if not long_df.empty else _empty_long(), missing)
+        return manifest
+
+    def load(
+        self,
+        itemids: Iterable[int],
+        subject_range: tuple[int, int] | None = None,
+    ) -> pd.DataFrame:
+        """Cached rows for ``itemids`` (extracting missing ones first), optionally for a subject_id range."""
+        wanted = np.array(sorted({int(x) for x in itemids}), dtype=np.int64)
+        manifest = self.ensure(wanted.tolist())
+        frames = []
+        for segment in manifest["segments"]:
+            if not np.isin(wanted, segment["itemids"]).any():
+                continue
+            for part in segment["partitions"]:
+                if subject_range is not None and (
+                    part["subject_max"] < subject_range[0] or part["subject_min"] > subject_range[1]
+                ):
+                    continue
+                columns = {
+                    col: np.load(self.root / part["path"] / f"{col}.npy", mmap_mode="r") for col in CACHE_COLUMNS
+                }
+                mask = np.isin(columns["itemid"], wanted)
+                if subject_range is not None:
+                    mask &= (columns["subject_id"] >= subject_range[0]) & (columns["subject_id"] <= subject_range[1])
+                frames.append(pd.DataFrame({col: values[mask] for col, values in columns.items()}))
+        if not frames:
+            return _empty_long()
+        return pd.concat(frames, ignore_index=True)
+
+    def hourly_features(self, feature_map: dict[int, str], temp_f_itemids: Iterable[int] = ()) -> pd.DataFrame:
+        """Wide (subject_id, hadm_id, charttime, feature...) frame, like read_filtered_events."""
+        feature_map = {int(k): v for k, v in feature_map.items()}
+        long_df = self.load(feature_map)
+        f_mask = long_df["itemid"].isin({int(x) for x in temp_f_itemids})
+        long_df.loc[f_mask, "valuenum"] = (long_df.loc[f_mask, "valuenum"] - 32) * (5.0 / 9.0)
+        long_df = long_df.assign(feature=long_df["itemid"].map(feature_map)).rename(columns={"hour": "charttime"})
+        long_df = (
+            long_df.groupby(["subject_id", "hadm_id", "charttime", "feature"], as_index=False)["valuenum"]
+            .median()
+        )
+        return hourly_wide(long_df)
@@ -1,17 +1,17 @@
 import pandas as pd
 import os
 
+from paths import DATA_ROOT
+from schema import read_typed_csv
+
 # Base path to dataset folder
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+BASE_PATH = str(DATA_ROOT)
 
 # Load main files
 patients = pd.read_csv(os.path.join(BASE_PATH, "PATIENTS.csv"))
 admissions = pd.read_csv(os.path.join(BASE_PATH, "ADMISSIONS.csv"))
 icustays = pd.read_csv(os.path.join(BASE_PATH, "ICUSTAYS.csv"))
-chartevents = pd.read_csv(
-    os.path.join(BASE_PATH, "CHARTEVENTS.csv"),
-    low_memory=False
-)
+chartevents = read_typed_csv(os.path.join(BASE_PATH, "CHARTEVENTS.csv"))
 
 # Print basic info
 print("Patients:", patients.shape)
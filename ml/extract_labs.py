@@ -1,7 +1,10 @@
-import pandas as pd
 import os
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+from columnar_io import compact_frame, write_frame
+from paths import DATA_ROOT
+from schema import read_typed_csv
+
+BASE_PATH = str(DATA_ROOT)
 
 # UPDATE THESE AFTER STEP 1
 LAB_ITEMIDS = [
@@ -10,9 +13,9 @@ LAB_ITEMIDS = [
     50813    # Lactate
 ]
 
-labs = pd.read_csv(
+labs = read_typed_csv(
     os.path.join(BASE_PATH, "LABEVENTS.csv"),
-    low_memory=False
+    usecols=["subject_id", "hadm_id", "charttime", "itemid", "valuenum"]
 )
 
 # Filter labs
@@ -28,7 +31,7 @@ lab_data = lab_data.dropna(subset=["valuenum"])
 print("Lab rows:", lab_data.shape)
 
 # Save
-OUTPUT = os.path.join(BASE_PATH, "clean_labs.csv")
-lab_data.to_csv(OUTPUT, index=False)
+OUTPUT = os.path.join(BASE_PATH, "clean_labs.cols")
+write_frame(compact_frame(lab_data), OUTPUT)
 
 print("Saved:", OUTPUT)
@@ -1,12 +1,15 @@
-import pandas as pd
 import os
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+from columnar_io import compact_frame, write_frame
+from paths import DATA_ROOT
+from schema import read_typed_csv
 
-# Load chartevents
-chartevents = pd.read_csv(
+BASE_PATH = str(DATA_ROOT)
+
+# Load chartevents (only the columns kept below, with compact dtypes)
+chartevents = read_typed_csv(
     os.path.join(BASE_PATH, "CHARTEVENTS.csv"),
-    low_memory=False
+    usecols=["subject_id", "hadm_id", "charttime", "itemid", "valuenum", "valueuom"]
 )
 
 # Important itemids (from your output)
@@ -34,7 +37,7 @@ vitals = vitals.dropna(subset=["valuenum"])
 print("Clean vitals shape:", vitals.shape)
 
 # Save file
-OUTPUT_PATH = os.path.join(BASE_PATH, "clean_vitals.csv")
-vitals.to_csv(OUTPUT_PATH, index=False)
+OUTPUT_PATH = os.path.join(BASE_PATH, "clean_vitals.cols")
+write_frame(compact_frame(vitals), OUTPUT_PATH)
 
 print("Saved to:", OUTPUT_PATH)
@@ -0,0 +1,209 @@
+"""Risk model features, shared by training, the backend and live_predictor.py.
+
+Features at an observation use that patient's last ``WINDOW`` observations:
+vital averages skip missing values, ``hr_trend`` is the heart-rate change since the
+previous observation, labs and missing flags come from the observation itself.
+Patients with fewer than ``WINDOW`` observations have no features yet.
+
+Batch mode works on whole frames sorted by (subject_id, charttime):
+
+    train = rolling_features(df)          # one row per observation (training)
+    latest = latest_features(df)          # one row per patient (serving)
+    past = features_at(df, positions)     # one row per patient, at chosen rows (as-of views)
+
+Online mode keeps constant-size state per patient and is updated one observation
+at a time:
+
+    store = OnlineFeatureStore()
+    store.update(subject_id, charttime, row)
+    store.frame()
+
+Both modes produce identical values; benchmarks/bench_features.py checks it.
+"""
+
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from schema import widen
+
+
+WINDOW = 3
+
+FEATURE_COLUMNS = [
+    "hr_avg",
+    "bp_avg",
+    "spo2_avg",
+    "temp_avg",
+    "hr_trend",
+    "creatinine",
+    "lactate",
+    "wbc",
+    "spo2_missing",
+    "temp_missing",
+]
+
+WINDOW_AVERAGES = {"hr_avg": "heart_rate", "bp_avg": "bp_mean", "spo2_avg": "spo2", "temp_avg": "temp"}
+LATEST_VALUES = {"creatinine": "creatinine", "lactate": "lactate", "wbc": "wbc"}
+MISSING_FLAGS = {"spo2_missing": "spo2", "temp_missing": "temp"}
+SOURCE_COLUMNS = ["heart_rate", "bp_mean", "spo2", "temp", "creatinine", "lactate", "wbc"]
+
+
+def _values(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    values = pd.to_numeric(df[col], errors="coerce")
+    # float32 columns stay float32 here and are widened (see schema.widen) only at the rows read.
+    return values.to_numpy(dtype=np.float32 if values.dtype == np.float32 else float, na_value=np.nan)
+
+
+def _window_mean(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    # Oldest to newest, missing values skipped: the same arithmetic as Series.mean()
+    # over the window, so batch and online features match bit for bit.
+    total = np.zeros(len(positions))
+    count = np.zeros(len(positions))
+    for lag in range(WINDOW - 1, -1, -1):
+        window = widen(values[positions - lag])
+        present = ~np.isnan(window)
+        total += np.where(present, window, 0.0)
+        count += present
+    return np.divide(total, count, out=np.full(len(positions), np.nan), where=count > 0)
+
+
+def _features_at(df: pd.DataFrame, positions: np.ndarray) -> dict[str, np.ndarray]:
+    columns = {col: _values(df, col) for col in SOURCE_COLUMNS}
+    features: dict[str, np.ndarray] = {}
+    for name, col in WINDOW_AVERAGES.items():
+        features[name] = _window_mean(columns[col], positions)
+    heart_rate = columns["heart_rate"]
+    features["hr_trend"] = widen(heart_rate[positions]) - widen(heart_rate[positions - 1])
+    for name, col in LATEST_VALUES.items():
+        features[name] = widen(columns[col][positions])
+    for name, col in MISSING_FLAGS.items():
+        features[name] = np.isnan(columns[col][positions]).astype(int)
+    return features
+
+
+def _group_rank(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Position of each row within its patient, and the position of each patient's last row."""
+    subject = df["subject_id"].to_numpy()
+    n = len(subject)
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = subject[1:] != subject[:-1]
+    starts = np.flatnonzero(new_group)
+    rank = np.arange(n) - starts[np.cumsum(new_group) - 1]
+    last = np.append(starts[1:], n) - 1 if n else starts
+    return rank, last
+
+
+def rolling_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Features at every observation of a frame sorted by (subject_id, charttime).
+
+    Rows before a patient's ``WINDOW``-th observation are NaN.
+    """
+    rank, _ = _group_rank(df)
+    positions = np.flatnonzero(rank >= WINDOW - 1)
+    result = {}
+    for name, values in _features_at(df, positions).items():
+        column = np.full(len(df), np.nan)
+        column[positions] = values
+        result[name] = column
+    return pd.DataFrame(result, index=df.index, columns=FEATURE_COLUMNS)
+
+
+def latest_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Features at each patient's latest observation, indexed by that observation's row label.
+
+    ``df`` must be sorted by (subject_id, charttime); patients with fewer than
+    ``WINDOW`` observations are left out.
+    """
+    rank, last = _group_rank(df)
+    return features_at(df, last[rank[last] >= WINDOW - 1])
+
+
+def features_at(df: pd.DataFrame, positions: np.ndarray) -> pd.DataFrame:
+    """Features at the rows at ``positions``, indexed by their row labels.
+
+    ``df`` must be sorted by (subject_id, charttime) and each position must be at
+    least ``WINDOW - 1`` rows past its patient's first row (as-of views pick the
+    last row at or before a time instead of the last row).
+    """
+    return pd.DataFrame(_features_at(df, positions), index=df.index[positions], columns=FEATURE_COLUMNS)
+
+
+@dataclass
+class PatientWindow:
+    vitals: deque[tuple[float, float, float, float]] = field(default_factory=lambda: deque(maxlen=WINDOW))
+    latest: dict[str, float] = field(default_factory=dict)
+    charttime: pd.Timestamp | None = None
+    observations: int = 0
+
+
+def _as_float(value: Any) -> float:
+    if isinstance(value, np.float32):
+        return float(widen(value))
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return value
+
+
+class OnlineFeatureStore:
+    """Per-patient window state updated one observation at a time; O(1) per update and read."""
+
+    def __init__(self) -> None:
+        self.patients: dict[int, PatientWindow] = {}
+
+    def __len__(self) -> int:
+        return len(self.patients)
+
+    def update(self, subject_id: int, charttime: pd.Timestamp, values: Mapping[str, Any]) -> None:
+        """Add one observation; observations must arrive in charttime order per patient."""
+        state = self.patients.get(subject_id)
+        if state is None:
+            state = self.patients[subject_id] = PatientWindow()
+        if state.charttime is not None and charttime < state.charttime:
+            raise ValueError(f"Observation for patient {subject_id} at {charttime} is older than {state.charttime}")
+        row = {col: _as_float(values.get(col)) for col in SOURCE_COLUMNS}
+        state.vitals.append(tuple(row[col] for col in WINDOW_AVERAGES.values()))
+        state.latest = row
+        state.charttime = charttime
+        state.observations += 1
+
+    def update_frame(self, df: pd.DataFrame) -> None:
+        """Feed every row of a frame sorted by (subject_id, charttime)."""
+        columns = [col for col in SOURCE_COLUMNS if col in df.columns]
+        for subject_id, charttime, *values in zip(
+            df["subject_id"].tolist(), df["charttime"], *(df[col].tolist() for col in columns)
+        ):
+            self.update(subject_id, charttime, dict(zip(columns, values)))
+
+    def features(self, subject_id: int) -> dict[str, float] | None:
+        state = self.patients.get(subject_id)
+        if state is None or state.observations < WINDOW:
+            return None
+        features: dict[str, float] = {}
+        for i, name in enumerate(WINDOW_AVERAGES):
+            present = [v[i] for v in state.vitals if not math.isnan(v[i])]
+            total = 0.0
+            for value in present:
+                total += value
+            features[name] = total / len(present) if present else math.nan
+        features["hr_trend"] = state.vitals[-1][0] - state.vitals[-2][0]
+        for name, col in LATEST_VALUES.items():
+            features[name] = state.latest[col]
+        for name, col in MISSING_FLAGS.items():
+            features[name] = int(math.isnan(state.latest[col]))
+        return features
+
+    def frame(self, subject_ids: Iterable[int] | None = None) -> pd.DataFrame:
+        """Features for the given patients (default: all with a full window), indexed by subject_id."""
+        ids = self.patients if subject_ids is None else subject_ids
+        rows = {sid: f for sid in ids if (f := self.features(sid)) is not None}
+        index = pd.Index(list(rows), name="subject_id")
+        return pd.DataFrame(list(rows.values()), index=index, columns=FEATURE_COLUMNS)
@@ -1,7 +1,9 @@
 import pandas as pd
 import os
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+from paths import DATA_ROOT
+
+BASE_PATH = str(DATA_ROOT)
 
 labs = pd.read_csv(os.path.join(BASE_PATH, "D_LABITEMS.csv"))
 
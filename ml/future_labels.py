@@ -0,0 +1,82 @@
+"""Forward-window labels: did a danger flag fire for the same patient within the horizon?
+
+For every row at time t the label is 1 when any row of the same patient with
+charttime in (t, t + horizon] is flagged, which is what the per-row loops in the
+build_ml_dataset scripts computed. Rows are sorted once by (patient, time); the
+next flagged position is found with a reverse running minimum and compared against
+the first strictly later observation, so each label definition costs O(n).
+Rows without a patient id or a charttime are labelled 0 and never fall inside
+another row's window.
+
+    labels = rule_future_labels(df, {"future_risk": "future_risk", "shock_6h": "hemodynamic"})
+"""
+
+from typing import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from clinical_rules import CLINICAL_RULES, RuleSet
+
+
+DEFAULT_HORIZON = pd.Timedelta(hours=6)
+
+
+def future_window_labels(
+    frame: pd.DataFrame,
+    flags: Mapping[str, np.ndarray | pd.Series],
+    horizon: pd.Timedelta | str = DEFAULT_HORIZON,
+    group_col: str = "subject_id",
+    time_col: str = "charttime",
+) -> pd.DataFrame:
+    """Return one 0/1 column per entry of ``flags`` (row-aligned boolean danger masks)."""
+    horizon_ns = pd.Timedelta(horizon).value
+    groups = frame[group_col]
+    times = pd.to_datetime(frame[time_col])
+    rows = np.flatnonzero((groups.notna() & times.notna()).to_numpy())
+
+    codes = pd.factorize(groups.to_numpy()[rows])[0]
+    t = times.to_numpy(dtype="datetime64[ns]").view("int64")[rows]
+    order = np.lexsort((t, codes))
+    rows, codes, t = rows[order], codes[order], t[order]
+    n = len(rows)
+
+    # Equal timestamps form a run; a row's window starts at the run after its own.
+    new_group = np.r_[True, codes[1:] != codes[:-1]]
+    new_run = new_group | np.r_[True, t[1:] != t[:-1]]
+    run_starts = np.append(np.flatnonzero(new_run), n)
+    next_later = run_starts[1:][np.cumsum(new_run) - 1]
+    group_starts = np.append(np.flatnonzero(new_group), n)
+    group_end = group_starts[1:][np.cumsum(new_group) - 1]
+    positions = np.arange(n)
+
+    labels = {}
+    for name, flag in flags.items():
+        danger = np.asarray(flag, dtype=bool)[rows]
+        next_danger = np.where(danger, positions, n)
+        next_danger = np.append(np.minimum.accumulate(next_danger[::-1])[::-1], n)
+        first = next_danger[next_later]
+        hit = first < group_end
+        candidates = np.flatnonzero(hit)
+        hit[candidates] = t[first[candidates]] - t[candidates] <= horizon_ns
+
+        label = np.zeros(len(frame), dtype=int)
+        label[rows] = hit
+        labels[name] = label
+    return pd.DataFrame(labels, index=frame.index)
+
+
+def rule_future_labels(
+    frame: pd.DataFrame,
+    labels: Mapping[str, str] | Sequence[str] = ("future_risk",),
+    horizon: pd.Timedelta | str = DEFAULT_HORIZON,
+    rules: RuleSet = CLINICAL_RULES,
+    group_col: str = "subject_id",
+    time_col: str = "charttime",
+) -> pd.DataFrame:
+    """Forward-window labels for rule-table label sets, keyed ``{output column: rule label}``."""
+    if not isinstance(labels, Mapping):
+        labels = {name: name for name in labels}
+    result = rules.evaluate(frame)
+    flags = {column: result.label(label) for column, label in labels.items()}
+    return future_window_labels(frame, flags, horizon=horizon, group_col=group_col, time_col=time_col)
@@ -0,0 +1,230 @@
+"""Dense stays x hours x features tensor of the cleaned census, memory-mapped from disk.
+
+Observations are floored to the hour (as build_mimic4_compatible_dataset.py
+does) and each admission's hours, from its first observed hour to its last, fill
+one row of a float32 array of shape (stays, hours, features); hours without an
+observation, and the padding after a stay's last hour, are NaN. Values observed
+more than once within an hour are reduced to their median. Rows are keyed by
+(subject_id, hadm_id), so a readmission years later is a row of its own rather
+than years of padding; the hour axis is as long as the longest stay. A grid
+larger than ICU_GRID_MAX_MB (default 4096) is refused before anything is written.
+
+Three files under the data root hold a grid:
+
+    hourly_grid.npy          the tensor (.npy, opened with mmap_mode="r")
+    hourly_grid_index.cols   per stay: subject_id, hadm_id, start_hour, hours
+    hourly_grid.json         feature order and shape
+
+Windows, trends and forward labels then work on the whole cohort at once,
+along axis 1, instead of grouping and sorting rows per patient:
+
+    grid = load_grid(DATA_ROOT)
+    hr = grid.channel("heart_rate")
+    hr_3h = rolling_mean(hr, 3)                       # mean of the last 3 hours, NaNs skipped
+    hr_trend = change(forward_fill(hr))               # against the previous observed value
+    danger_6h = future_any(hr > 120, 6)               # any flag in the next 6 hours
+    features = grid.frame(hr_3h=hr_3h, danger_6h=danger_6h)
+
+    python ml/hourly_grid.py                          # pipeline stage: build from the cleaned census
+"""
+
+import json
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from columnar_io import read_frame, write_frame
+from features import SOURCE_COLUMNS
+from paths import DATA_ROOT
+
+
+GRID_FILE = "hourly_grid.npy"
+INDEX_FILE = "hourly_grid_index.cols"
+META_FILE = "hourly_grid.json"
+GRID_COLUMNS = SOURCE_COLUMNS
+HOUR = pd.Timedelta(hours=1)
+GRID_MAX_MB = float(os.getenv("ICU_GRID_MAX_MB", "4096"))
+# Size of the block of stays filled at a time, so only one block is in memory besides the hourly rows.
+BLOCK_MB = 256
+
+
+@dataclass
+class HourlyGrid:
+    values: np.ndarray  # (stays, hours, features) float32, NaN where nothing was observed
+    subject_ids: np.ndarray  # (stays,) int32, ascending
+    hadm_ids: np.ndarray  # (stays,) int32, ascending within a patient
+    start_hours: np.ndarray  # (stays,) datetime64 of each stay's first hour
+    hours: np.ndarray  # (stays,) int32, hours from the first to the last observed hour
+    features: list[str]
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        return self.values.shape
+
+    def channel(self, name: str) -> np.ndarray:
+        """The (stays, hours) view of one feature."""
+        return self.values[:, :, self.features.index(name)]
+
+    def valid(self) -> np.ndarray:
+        """(stays, hours) mask of the hours inside each stay."""
+        return np.arange(self.values.shape[1]) < self.hours[:, None]
+
+    def frame(self, **columns: np.ndarray) -> pd.DataFrame:
+        """One row per hour inside a stay: subject_id, hadm_id, charttime and each (stays, hours) array."""
+        valid = self.valid()
+        stay, hour = np.nonzero(valid)
+        charttime = self.start_hours[stay] + hour.astype("timedelta64[h]")
+        result = {"subject_id": self.subject_ids[stay], "hadm_id": self.hadm_ids[stay], "charttime": charttime}
+        result.update({name: np.asarray(values)[valid] for name, values in columns.items()})
+        return pd.DataFrame(result)
+
+
+def hourly_rows(df: pd.DataFrame, columns: Sequence[str] = GRID_COLUMNS) -> pd.DataFrame:
+    """Median of each column per (subject_id, hadm_id, hour), sorted by all three."""
+    keys = ["subject_id", "hadm_id", "charttime"]
+    hourly = df[[*keys, *columns]].dropna(subset=keys)
+    hourly = hourly.assign(charttime=hourly["charttime"].dt.floor("h"))
+    return hourly.groupby(keys, sort=True, observed=True).median().reset_index()
+
+
+def build_grid(
+    df: pd.DataFrame, root: Path, columns: Sequence[str] = GRID_COLUMNS, max_mb: float = GRID_MAX_MB
+) -> HourlyGrid:
+    """Write the grid of ``df`` (the cleaned census) under ``root`` and return it memory-mapped.
+
+    Raises ValueError, leaving any existing grid in place, when the tensor would exceed ``max_mb``.
+    """
+    root = Path(root)
+    columns = list(columns)
+    hourly = hourly_rows(df, columns)
+
+    subject = hourly["subject_id"].to_numpy()
+    hadm = hourly["hadm_id"].to_numpy()
+    if len(subject):
+        new_stay = np.r_[True, (subject[1:] != subject[:-1]) | (hadm[1:] != hadm[:-1])]
+    else:
+        new_stay = np.zeros(0, dtype=bool)
+    starts = np.flatnonzero(new_stay)
+    stay = np.cumsum(new_stay) - 1
+    charttime = hourly["charttime"].to_numpy()
+    start_hours = charttime[starts]
+    offset = ((charttime - start_hours[stay]) // HOUR).astype(np.int64)
+    ends = np.append(starts[1:], len(subject)) - 1
+    hours = (offset[ends] + 1).astype(np.int32) if len(subject) else np.zeros(0, dtype=np.int32)
+    shape = (len(starts), int(hours.max()) if len(hours) else 0, len(columns))
+
+    row_bytes = shape[1] * shape[2] * np.dtype(np.float32).itemsize
+    size_mb = shape[0] * row_bytes / 1e6
+    if size_mb > max_mb:
+        longest = int(np.argmax(hours))
+        raise ValueError(
+            f"Hourly grid of {shape[0]} stays x {shape[1]} hours x {shape[2]} features would take "
+            f"{size_mb:.1f} MB, over the {max_mb:g} MB budget (ICU_GRID_MAX_MB); the longest stay is "
+            f"subject_id {subject[starts[longest]]}, hadm_id {hadm[starts[longest]]}"
+        )
+
+    # Written under a temporary name and renamed, so readers never map a half-filled tensor.
+    tmp = root / (GRID_FILE + ".tmp")
+    grid = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=shape)
+    values = hourly[columns].to_numpy(dtype=np.float32, na_value=np.nan)
+    block_stays = max(int(BLOCK_MB * 1e6 // max(row_bytes, 1)), 1)
+    for first in range(0, shape[0], block_stays):
+        last = min(first + block_stays, shape[0])
+        block = np.full((last - first,) + shape[1:], np.nan, dtype=np.float32)
+        rows = slice(starts[first], ends[last - 1] + 1)
+        block[stay[rows] - first, offset[rows]] = values[rows]
+        grid[first:last] = block
+    grid.flush()
+    del grid
+    os.replace(tmp, root / GRID_FILE)
+
+    index = pd.DataFrame(
+        {
+            "subject_id": subject[starts].astype(np.int32),
+            "hadm_id": hadm[starts].astype(np.int32),
+            "start_hour": start_hours,
+            "hours": hours,
+        }
+    )
+    write_frame(index, root / INDEX_FILE)
+    meta = {"features": columns, "shape": list(shape), "hour_reduction": "median"}
+    (root / META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return load_grid(root)
+
+
+def load_grid(root: Path, mmap: bool = True) -> HourlyGrid:
+    root = Path(root)
+    meta = json.loads((root / META_FILE).read_text(encoding="utf-8"))
+    index = read_frame(root / INDEX_FILE)
+    values = np.load(root / GRID_FILE, mmap_mode="r" if mmap else None)
+    if list(values.shape) != meta["shape"] or values.shape[0] != len(index):
+        raise ValueError(f"{root / GRID_FILE} has shape {values.shape}, expected {tuple(meta['shape'])}")
+    return HourlyGrid(
+        values=values,
+        subject_ids=index["subject_id"].to_numpy(),
+        hadm_ids=index["hadm_id"].to_numpy(),
+        start_hours=index["start_hour"].to_numpy(),
+        hours=index["hours"].to_numpy(),
+        features=meta["features"],
+    )
+
+
+def _pad_hours(values: np.ndarray, before: int, after: int, fill) -> np.ndarray:
+    pad = [(0, 0)] * values.ndim
+    pad[1] = (before, after)
+    return np.pad(values, pad, constant_values=fill)
+
+
+def rolling_mean(values: np.ndarray, hours: int) -> np.ndarray:
+    """Mean over each hour and the ``hours - 1`` before it, skipping NaN; NaN when all are missing."""
+    window = sliding_window_view(_pad_hours(values, hours - 1, 0, np.nan), hours, axis=1)
+    present = ~np.isnan(window)
+    total = np.where(present, window, 0.0).sum(axis=-1, dtype=np.float64)
+    count = present.sum(axis=-1)
+    return np.divide(total, count, out=np.full(total.shape, np.nan), where=count > 0).astype(np.float32)
+
+
+def change(values: np.ndarray, hours: int = 1) -> np.ndarray:
+    """Difference from ``hours`` earlier; NaN for the first ``hours`` hours."""
+    result = np.full(values.shape, np.nan, dtype=np.float32)
+    result[:, hours:] = values[:, hours:] - values[:, :-hours]
+    return result
+
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """Carry each stay's last observed value forward along the hours."""
+    present = ~np.isnan(values)
+    shape = (1, values.shape[1]) + (1,) * (values.ndim - 2)
+    last = np.where(present, np.arange(values.shape[1]).reshape(shape), 0)
+    np.maximum.accumulate(last, axis=1, out=last)
+    return np.take_along_axis(values, last, axis=1)
+
+
+def future_any(flags: np.ndarray, horizon: int) -> np.ndarray:
+    """Whether any of the next ``horizon`` hours (not the hour itself) is flagged."""
+    later = _pad_hours(np.asarray(flags, dtype=bool)[:, 1:], 0, horizon, False)
+    return sliding_window_view(later, horizon, axis=1).any(axis=-1)
+
+
+def main() -> None:
+    columns = ["subject_id", "hadm_id", "charttime", *GRID_COLUMNS]
+    df = read_frame(DATA_ROOT / "full_medical_data_clean.cols", columns=columns)
+    try:
+        grid = build_grid(df, DATA_ROOT)
+    except ValueError as exc:
+        print(exc)
+        sys.exit(1)
+    stays, hours, features = grid.shape
+    size_mb = grid.values.nbytes / 1e6
+    print(f"Hourly grid: {stays} stays x {hours} hours x {features} features ({size_mb:.1f} MB)")
+    print("Saved:", DATA_ROOT / GRID_FILE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""In-process micro-batching inference for the risk model.
+
+Callers submit feature frames from any thread (or await them from asyncio);
+a single worker thread gathers queued requests until the batch reaches
+``max_batch_rows`` or the oldest request has waited ``max_wait_ms``, then runs
+one ``predict_proba`` call per model and hands each caller its slice.
+
+    service = InferenceService(lambda: model, FEATURE_COLUMNS)
+    probs = service.score(features)              # scripts
+    probs = await service.score_async(features)  # FastAPI handlers
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class _Request:
+    features: pd.DataFrame
+    model: Any | None
+    future: Future
+    enqueued: float = field(default_factory=time.perf_counter)
+
+
+class InferenceService:
+    def __init__(
+        self,
+        model_provider: Callable[[], Any | None],
+        feature_columns: Sequence[str],
+        max_batch_rows: int = 1024,
+        max_wait_ms: float = 5.0,
+        metrics_window: int = 1000,
+    ) -> None:
+        self.model_provider = model_provider
+        self.feature_columns = list(feature_columns)
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self._queue: queue.Queue[_Request | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self._batch_rows: deque[int] = deque(maxlen=metrics_window)
+        self._queue_wait: deque[float] = deque(maxlen=metrics_window)
+        self._inference_time: deque[float] = deque(maxlen=metrics_window)
+        self._finished: deque[tuple[float, int]] = deque(maxlen=metrics_window)
+
+    def __enter__(self) -> "InferenceService":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def submit(self, features: pd.DataFrame | np.ndarray, model: Any | None = None) -> Future:
+        """Queue rows for scoring. The future resolves to P(risk) per row, or None without a model.
+
+        The model is pinned at submit time so a hot swap never mixes versions inside one request.
+        """
+        if not isinstance(features, pd.DataFrame):
+            features = pd.DataFrame(np.atleast_2d(features), columns=self.feature_columns)
+        future: Future = Future()
+        if len(features) == 0:
+            future.set_result(np.empty(0, dtype=float))
+            return future
+        self.start()
+        self._queue.put(_Request(features, model if model is not None else self.model_provider(), future))
+        return future
+
+    def score(
+        self, features: pd.DataFrame | np.ndarray, model: Any | None = None, timeout: float | None = None
+    ) -> np.ndarray | None:
+        """Blocking score; raises concurrent.futures.TimeoutError after ``timeout`` seconds."""
+        return self.submit(features, model).result(timeout)
+
+    async def score_async(self, features: pd.DataFrame | np.ndarray, model: Any | None = None) -> np.ndarray | None:
+        return await asyncio.wrap_future(self.submit(features, model))
+
+    def _collect(self, first: _Request) -> tuple[list[_Request], bool]:
+        batch = [first]
+        rows = len(first.features)
+        deadline = first.enqueued + self.max_wait
+        while rows < self.max_batch_rows:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            rows += len(item.features)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stopping = self._collect(first)
+            # Requests whose caller cancelled them (e.g. an abandoned score_async) are dropped here;
+            # the rest can no longer be cancelled, so setting their results cannot fail.
+            batch = [req for req in batch if req.future.set_running_or_notify_cancel()]
+            if not batch:
+                if stopping:
+                    return
+                continue
+            started = time.perf_counter()
+            for req in batch:
+                self._queue_wait.append(started - req.enqueued)
+
+            by_model: dict[int, list[_Request]] = {}
+            for req in batch:
+                by_model.setdefault(id(req.model), []).append(req)
+            for group in by_model.values():
+                try:
+                    self._score_group(group)
+                except Exception as exc:
+                    # Whatever goes wrong stays with this group: the batcher must keep serving.
+                    self.errors += 1
+                    for req in group:
+                        if not req.future.done():
+                            req.future.set_exception(exc)
+
+            finished = time.perf_counter()
+            n_rows = sum(len(req.features) for req in batch)
+            self.batches += 1
+            self.requests += len(batch)
+            self.rows += n_rows
+            self._batch_rows.append(n_rows)
+            self._inference_time.append(finished - started)
+            self._finished.append((finished, n_rows))
+            if stopping:
+                return
+
+    def _score_group(self, group: list[_Request]) -> None:
+        model = group[0].model
+        if model is None:
+            for req in group:
+                req.future.set_result(None)
+            return
+        try:
+            frame = pd.concat([req.features for req in group], ignore_index=True)[self.feature_columns]
+            probs = np.asarray(model.predict_proba(frame)[:, 1], dtype=float)
+        except Exception as exc:
+            self.errors += 1
+            for req in group:
+                req.future.set_exception(exc)
+            return
+        offset = 0
+        for req in group:
+            n = len(req.features)
+            req.future.set_result(probs[offset : offset + n])
+            offset += n
+
+    def metrics(self) -> dict[str, Any]:
+        def pct(values: deque[float], q: float) -> float | None:
+            return round(float(np.percentile(values, q)) * 1000, 3) if values else None
+
+        throughput = None
+        if len(self._finished) >= 2:
+            span = self._finished[-1][0] - self._finished[0][0]
+            if span > 0:
+                throughput = round(sum(n for _, n in list(self._finished)[1:]) / span, 1)
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "batches": self.batches,
+            "errors": self.errors,
+            "queued": self._queue.qsize(),
+            "max_batch_rows": self.max_batch_rows,
+            "max_wait_ms": self.max_wait * 1000,
+            "batch_rows_mean": round(float(np.mean(self._batch_rows)), 2) if self._batch_rows else None,
+            "batch_rows_max": max(self._batch_rows) if self._batch_rows else None,
+            "queue_wait_ms_p50": pct(self._queue_wait, 50),
+            "queue_wait_ms_p95": pct(self._queue_wait, 95),
+            "inference_ms_p50": pct(self._inference_time, 50),
+            "inference_ms_p95": pct(self._inference_time, 95),
+            "rows_per_second": throughput,
+        }
@@ -1,98 +1,48 @@
-import pandas as pd
 import os
 import joblib
-from send_alert_email import send_alert
+from alert_outbox import queue_alerts
+from batch_score import read_input, score_frame
+from paths import DATA_ROOT
+from pathlib import Path
 
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+BASE_PATH = str(DATA_ROOT)
 
 MODEL_PATH = os.path.join(BASE_PATH, "risk_model_v2.pkl")
 DATA_PATH = os.path.join(BASE_PATH, "full_medical_data_clean.csv")
+OUTBOX_PATH = os.path.join(BASE_PATH, "alert_outbox.jsonl")
 
 
 # Load model
 model = joblib.load(MODEL_PATH)
 
-# Load data
-df = pd.read_csv(DATA_PATH)
-df["charttime"] = pd.to_datetime(df["charttime"])
-
-# Sort
-df = df.sort_values(["subject_id", "charttime"])
-
-
-# ----------------------------
-# Build latest features
-# ----------------------------
-def build_latest_features(patient_df):
-
-    patient_df = patient_df.sort_values("charttime")
-
-    # Last 3 records
-    last = patient_df.tail(3)
-
-    if len(last) < 3:
-        return None
-
-    features = {}
-
-    # Rolling averages
-    features["hr_avg"] = last["heart_rate"].mean()
-    features["bp_avg"] = last["bp_mean"].mean()
-    features["spo2_avg"] = last["spo2"].mean()
-    features["temp_avg"] = last["temp"].mean()
-
-    # Trend
-    features["hr_trend"] = (
-        last["heart_rate"].iloc[-1] - last["heart_rate"].iloc[-2]
-    )
-
-    # Labs (latest)
-    features["creatinine"] = last["creatinine"].iloc[-1]
-    features["lactate"] = last["lactate"].iloc[-1]
-    features["wbc"] = last["wbc"].iloc[-1]
-
-    # Missing flags
-    features["spo2_missing"] = last["spo2_missing"].iloc[-1]
-    features["temp_missing"] = last["temp_missing"].iloc[-1]
-
-    return pd.DataFrame([features])
+# Load data, sorted by (subject_id, charttime)
+df = read_input(Path(DATA_PATH))
 
 
 # ----------------------------
 # Predict for all patients
 # ----------------------------
+# Latest features for every patient in one pass, scored in batches (batch_score.py;
+# use it directly for several files, as-of times or CSV/binary output).
 print("🔍 Running Live ICU Monitor...\n")
 
+scores = score_frame(df, model)
 
-for pid in df["subject_id"].unique():
-
-    patient_data = df[df["subject_id"] == pid]
-
-    features = build_latest_features(patient_data)
-
-    if features is None:
-        continue
-
-    # Predict probability
-    prob = model.predict_proba(features)[0][1]
-
-    status = "STABLE"
-
-    if prob >= 0.7:
-        status = "⚠️ HIGH RISK"
-
-    if prob >= 0.85:
-        status = "🚨 CRITICAL"
-
-        # Use averages for alert info
-        hr = features["hr_avg"].values[0]
-        bp = features["bp_avg"].values[0]
-
-        send_alert(pid, prob * 100, hr, bp)
-
+labels = {"stable": "STABLE", "high": "⚠️ HIGH RISK", "critical": "🚨 CRITICAL"}
 
+for pid, prob, status in zip(scores["subject_id"], scores["risk_probability"], scores["status"]):
     print(f"Patient {pid}")
     print(f"Risk Score: {prob*100:.1f}%")
-    print(f"Status: {status}")
+    print(f"Status: {labels[status]}")
     print("-" * 40)
+
+
+# Critical patients are queued for email (averages for alert info);
+# python ml/send_alert_email.py sends them without holding up scoring.
+critical = scores[scores["status"] == "critical"]
+queued = queue_alerts(
+    Path(OUTBOX_PATH),
+    critical[["subject_id", "charttime", "risk_probability", "hr_avg", "bp_avg"]].to_dict("records"),
+)
+print(f"Queued {queued} critical alert(s) in {OUTBOX_PATH}")
@@ -1,10 +1,13 @@
-import pandas as pd
 import os
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+from asof_join import AsofSource, asof_join
+from columnar_io import compact_frame, read_frame, write_frame
+from paths import DATA_ROOT
 
-vitals = pd.read_csv(os.path.join(BASE_PATH, "alert_ready_data.csv"))
-labs = pd.read_csv(os.path.join(BASE_PATH, "lab_ready_data.csv"))
+BASE_PATH = str(DATA_ROOT)
+
+vitals = read_frame(os.path.join(BASE_PATH, "alert_ready_data.cols"))
+labs = read_frame(os.path.join(BASE_PATH, "lab_ready_data.cols"))
 
 # FIX: Make IDs same type (int)
 vitals["subject_id"] = vitals["subject_id"].astype(int)
@@ -13,28 +16,15 @@ vitals["hadm_id"] = vitals["hadm_id"].astype(int)
 labs["subject_id"] = labs["subject_id"].astype(int)
 labs["hadm_id"] = labs["hadm_id"].astype(int)
 
-# Convert time
-vitals["charttime"] = pd.to_datetime(vitals["charttime"])
-labs["charttime"] = pd.to_datetime(labs["charttime"])
-
-# Sort (required for merge_asof)
-vitals = vitals.sort_values("charttime")
-labs = labs.sort_values("charttime")
-
 # Merge by nearest time (within 6 hours)
-merged = pd.merge_asof(
-    vitals,
-    labs,
-    on="charttime",
-    by=["subject_id", "hadm_id"],
-    direction="nearest",
-    tolerance=pd.Timedelta("6h")
-)
+vitals = vitals.sort_values("charttime")
+lab_cols = [c for c in labs.columns if c not in ("subject_id", "hadm_id", "charttime")]
+merged = asof_join(vitals, [AsofSource(labs, lab_cols, "6h")])
 
 print(merged.head())
 
 # Save
-OUTPUT = os.path.join(BASE_PATH, "full_medical_data.csv")
-merged.to_csv(OUTPUT, index=False)
+OUTPUT = os.path.join(BASE_PATH, "full_medical_data.cols")
+write_frame(compact_frame(merged), OUTPUT)
 
 print("Saved:", OUTPUT)
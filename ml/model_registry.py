@@ -0,0 +1,186 @@
+"""Versioned risk models, each with a watermark of the training rows it has seen.
+
+A registry folder (``<data root>/model_registry`` by default) holds one folder
+per version with ``model.pkl`` and ``watermark.cols``, plus ``registry.json``
+listing every version with how it was trained (full refit or incremental update
+of a parent), its train time and holdout metrics. Publishing a version with a
+``serving_path`` also replaces the serving model (``risk_model_v2.pkl``) and its
+metadata (``risk_model_v2.json``, read by the backend) atomically, so the
+backend's model watcher picks it up; in the pipeline that is left to
+select_risk_model.py.
+
+The watermark is the last trained charttime per patient. A training row counts
+as labelled once its patient has observations ``horizon`` past it, since its
+``future_risk`` label can still change until then; rows after a patient's
+watermark that are labelled are the ones an incremental update trains on.
+
+    registry = ModelRegistry(DATA_ROOT / "model_registry")
+    latest = registry.latest()
+    new = unseen_rows(frame, registry.watermark(latest))
+"""
+
+import hashlib
+import io
+import json
+import os
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from columnar_io import read_frame, write_frame
+from features import FEATURE_COLUMNS
+from future_labels import DEFAULT_HORIZON
+
+
+REGISTRY_FILE = "registry.json"
+KEY_COLUMNS = ["subject_id", "charttime"]
+HOLDOUT_FRACTION = 0.2
+
+
+@dataclass
+class ModelVersion:
+    version: int
+    mode: str  # "full" or "incremental"
+    parent: int | None
+    created_at: str
+    feature_columns: list[str]
+    n_estimators: int
+    train_rows: int  # rows fitted by this run
+    seen_rows: int  # labelled training rows up to the watermark
+    train_seconds: float
+    metrics: dict[str, float]
+    # Same data refit from scratch, recorded when requested: {"train_seconds", "metrics"}.
+    comparison: dict[str, Any] | None = None
+    # RandomForestClassifier arguments of the last full refit in this version's lineage.
+    params: dict[str, Any] | None = None
+
+    @property
+    def name(self) -> str:
+        return f"v{self.version:04d}"
+
+
+def holdout_mask(subject_ids: pd.Series | np.ndarray, fraction: float = HOLDOUT_FRACTION) -> np.ndarray:
+    """Patients held out of training, chosen by a hash of subject_id so the split is stable as data grows."""
+    ids = np.asarray(subject_ids, dtype=np.uint64)
+    # Knuth multiplicative hash; the top 32 bits are close to uniform for consecutive ids.
+    hashed = (ids * np.uint64(2654435761)) % np.uint64(1 << 32)
+    return hashed < np.uint64(fraction * (1 << 32))
+
+
+def labelled_mask(frame: pd.DataFrame, horizon: pd.Timedelta | str = DEFAULT_HORIZON) -> np.ndarray:
+    """Rows whose future window is fully observed: charttime <= the patient's last charttime - horizon."""
+    last = frame.groupby("subject_id", sort=False)["charttime"].transform("max")
+    return (frame["charttime"] <= last - pd.Timedelta(horizon)).to_numpy()
+
+
+def make_watermark(frame: pd.DataFrame) -> pd.DataFrame:
+    """Last charttime per patient in ``frame``."""
+    return frame.groupby("subject_id", as_index=False, sort=True)["charttime"].max()
+
+
+def unseen_rows(frame: pd.DataFrame, watermark: pd.DataFrame | None) -> np.ndarray:
+    """Rows of ``frame`` after their patient's watermark (every row when there is none)."""
+    if watermark is None or watermark.empty:
+        return np.ones(len(frame), dtype=bool)
+    last = frame["subject_id"].map(pd.Series(watermark["charttime"].to_numpy(), index=watermark["subject_id"]))
+    return (last.isna() | (frame["charttime"] > last)).to_numpy()
+
+
+def metadata_path(serving_path: Path) -> Path:
+    """Where the serving model's metadata lives: risk_model_v2.pkl -> risk_model_v2.json."""
+    return Path(serving_path).with_suffix(".json")
+
+
+def publish_serving(model: Any, serving_path: Path, metadata: dict[str, Any]) -> dict[str, Any]:
+    """Replace the serving model atomically, metadata first.
+
+    The metadata records the sha256 of the pickled model, so a reader can tell
+    when it describes a different file (a model copied in by hand, or the
+    moment between the two replaces).
+    """
+    serving_path = Path(serving_path)
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    payload = buffer.getvalue()
+    metadata = {
+        **metadata,
+        "sha256": hashlib.sha256(payload).hexdigest(),
+        "size_bytes": len(payload),
+        "kind": type(model).__name__,
+        "feature_columns": list(FEATURE_COLUMNS),
+        "exported_at": datetime.now(UTC).isoformat(timespec="seconds"),
+    }
+    meta_path = metadata_path(serving_path)
+    tmp = meta_path.with_name(meta_path.name + ".tmp")
+    tmp.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    os.replace(tmp, meta_path)
+    tmp = serving_path.with_name(serving_path.name + ".tmp")
+    tmp.write_bytes(payload)
+    os.replace(tmp, serving_path)
+    return metadata
+
+
+class ModelRegistry:
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / REGISTRY_FILE
+
+    def versions(self) -> list[ModelVersion]:
+        if not self.index_path.exists():
+            return []
+        entries = json.loads(self.index_path.read_text(encoding="utf-8"))
+        return [ModelVersion(**entry) for entry in entries]
+
+    def latest(self) -> ModelVersion | None:
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def model(self, version: ModelVersion) -> Any:
+        return joblib.load(self.root / version.name / "model.pkl")
+
+    def watermark(self, version: ModelVersion | None) -> pd.DataFrame | None:
+        if version is None:
+            return None
+        return read_frame(self.root / version.name / "watermark.cols")
+
+    def incremental_streak(self) -> int:
+        """Incremental updates since the last full refit."""
+        streak = 0
+        for version in reversed(self.versions()):
+            if version.mode != "incremental":
+                break
+            streak += 1
+        return streak
+
+    def publish(self, model: Any, watermark: pd.DataFrame, serving_path: Path | None = None, **entry) -> ModelVersion:
+        """Store ``model`` as the next version and, when given, make it the serving model."""
+        versions = self.versions()
+        version = ModelVersion(
+            version=versions[-1].version + 1 if versions else 1,
+            created_at=datetime.now(UTC).isoformat(timespec="seconds"),
+            **entry,
+        )
+        folder = self.root / version.name
+        folder.mkdir(parents=True, exist_ok=True)
+        joblib.dump(model, folder / "model.pkl")
+        write_frame(watermark[KEY_COLUMNS].reset_index(drop=True), folder / "watermark.cols")
+
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps([asdict(v) for v in versions + [version]], indent=2), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+        if serving_path is not None:
+            publish_serving(
+                model,
+                serving_path,
+                {"source": f"model_registry/{version.name}", "mode": version.mode, "holdout": version.metrics},
+            )
+        return version
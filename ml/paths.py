@@ -0,0 +1,7 @@
+import os
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# Same variable and default as backend/app/config.py.
+DATA_ROOT = Path(os.getenv("ICU_DATA_ROOT", PROJECT_ROOT / "data" / "mimic-iii-clinical-database-demo-1.4"))
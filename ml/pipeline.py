@@ -0,0 +1,287 @@
+"""Run the ml/ pipeline scripts in dependency order, skipping stages that are up to date.
+
+Each stage is one script in this folder with declared input and output files
+under the data root (``--data-root``, default ``ICU_DATA_ROOT`` or the demo
+folder). A stage is skipped when its outputs exist and the content hashes of its
+inputs, its script and the local modules it imports match the last successful
+run, recorded in ``<data root>/.pipeline_state.json``. Stages whose inputs are
+ready run in parallel processes (vitals and labs branches), up to ``--jobs``.
+
+    python ml/pipeline.py                          # everything out of date
+    python ml/pipeline.py train_risk_model_v2      # one target and what it needs
+    python ml/pipeline.py --force clean_full_data --jobs 2 --report pipeline_run.json
+
+Every run prints wall time and peak RSS per stage.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable
+
+from paths import DATA_ROOT
+
+
+ML_ROOT = Path(__file__).resolve().parent
+STATE_FILE = ".pipeline_state.json"
+HASH_BLOCK_BYTES = 1 << 20
+# Imported by every stage script (directly or through columnar_io).
+SHARED_CODE = ("paths", "columnar_io", "schema")
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    inputs: tuple[str, ...]
+    outputs: tuple[str, ...]
+    code: tuple[str, ...] = ()
+
+    @property
+    def script(self) -> Path:
+        return ML_ROOT / f"{self.name}.py"
+
+    @property
+    def code_paths(self) -> list[Path]:
+        return [self.script] + [ML_ROOT / f"{module}.py" for module in SHARED_CODE + self.code]
+
+
+STAGES = (
+    Stage("extract_vitals", ("CHARTEVENTS.csv",), ("clean_vitals.cols",)),
+    Stage("prepare_alert_data", ("clean_vitals.cols",), ("alert_ready_data.cols",), ("asof_join",)),
+    Stage("extract_labs", ("LABEVENTS.csv",), ("clean_labs.cols",)),
+    Stage("prepare_lab_data", ("clean_labs.cols",), ("lab_ready_data.cols",)),
+    Stage(
+        "merge_vitals_labs",
+        ("alert_ready_data.cols", "lab_ready_data.cols"),
+        ("full_medical_data.cols",),
+        ("asof_join",),
+    ),
+    Stage(
+        "clean_full_data",
+        ("full_medical_data.cols",),
+        ("full_medical_data_clean.cols", "full_medical_data_clean.csv"),
+    ),
+    Stage(
+        "build_ml_dataset_v2",
+        ("full_medical_data_clean.cols",),
+        ("ml_training_data_v2.cols",),
+        ("features", "future_labels", "clinical_rules"),
+    ),
+    Stage(
+        "train_risk_model_v2",
+        ("ml_training_data_v2.cols",),
+        ("model_registry/registry.json",),
+        ("features", "model_registry", "future_labels"),
+    ),
+    Stage(
+        "select_risk_model",
+        ("ml_training_data_v2.cols", "model_registry/registry.json"),
+        ("risk_model_v2.pkl", "risk_model_v2.json"),
+        ("features", "model_registry", "compact_models", "train_risk_model_v2", "future_labels"),
+    ),
+    Stage(
+        "hourly_grid",
+        ("full_medical_data_clean.cols",),
+        ("hourly_grid.npy", "hourly_grid_index.cols", "hourly_grid.json"),
+        ("features",),
+    ),
+    Stage(
+        "alert_engine",
+        ("alert_ready_data.cols",),
+        ("alert_episodes.csv", "alert_watermark.cols"),
+        ("clinical_rules", "alert_episodes", "model_registry", "features", "future_labels"),
+    ),
+)
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # "ran", "skipped", "failed" or "blocked"
+    seconds: float = 0.0
+    peak_rss_mb: float | None = None
+    returncode: int | None = None
+
+
+class PipelineState:
+    """Stage fingerprints of the last successful runs, plus file digests keyed by size and mtime."""
+
+    def __init__(self, data_root: Path) -> None:
+        self.path = data_root / STATE_FILE
+        self._lock = threading.Lock()
+        data = json.loads(self.path.read_text(encoding="utf-8")) if self.path.exists() else {}
+        self.files: dict[str, list] = data.get("files", {})
+        self.stages: dict[str, str] = data.get("stages", {})
+
+    def file_digest(self, path: Path) -> str:
+        stat = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            cached = self.files.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while block := f.read(HASH_BLOCK_BYTES):
+                digest.update(block)
+        with self._lock:
+            self.files[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def fingerprint(self, stage: Stage, data_root: Path) -> str:
+        digest = hashlib.sha256(stage.name.encode())
+        for path in stage.code_paths + [data_root / name for name in stage.inputs]:
+            digest.update(path.name.encode())
+            digest.update(self.file_digest(path).encode())
+        return digest.hexdigest()
+
+    def record(self, stage: Stage, fingerprint: str) -> None:
+        with self._lock:
+            self.stages[stage.name] = fingerprint
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"files": self.files, "stages": self.stages}, indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+def upstream(stages: Iterable[Stage], targets: Iterable[str]) -> list[Stage]:
+    """``targets`` and every stage they depend on, in declaration order."""
+    stages = list(stages)
+    producer = {output: stage for stage in stages for output in stage.outputs}
+    by_name = {stage.name: stage for stage in stages}
+    unknown = sorted(set(targets) - set(by_name))
+    if unknown:
+        raise ValueError(f"Unknown stages: {unknown}")
+    needed: set[str] = set()
+    todo = list(targets)
+    while todo:
+        name = todo.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        todo.extend(producer[i].name for i in by_name[name].inputs if i in producer)
+    return [stage for stage in stages if stage.name in needed]
+
+
+def run_script(stage: Stage, data_root: Path) -> StageResult:
+    """Run one stage script in a fresh interpreter; peak RSS is read from that child's rusage."""
+    env = {**os.environ, "ICU_DATA_ROOT": str(data_root)}
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, str(stage.script)], cwd=ML_ROOT, env=env)
+    peak_rss_mb = None
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(process.pid, 0)
+        returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is KiB on Linux, bytes on macOS.
+        peak_rss_mb = usage.ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+    else:
+        returncode = process.wait()
+    return StageResult(
+        stage.name,
+        "ran" if returncode == 0 else "failed",
+        seconds=time.perf_counter() - started,
+        peak_rss_mb=peak_rss_mb,
+        returncode=returncode,
+    )
+
+
+def run_pipeline(
+    data_root: Path = DATA_ROOT,
+    targets: Iterable[str] = (),
+    jobs: int = 2,
+    force: Iterable[str] = (),
+    stages: Iterable[Stage] = STAGES,
+) -> list[StageResult]:
+    data_root = Path(data_root).resolve()
+    stages = upstream(stages, targets) if targets else list(stages)
+    force = set(force)
+    state = PipelineState(data_root)
+    producer = {output: stage.name for stage in stages for output in stage.outputs}
+    deps = {stage.name: {producer[i] for i in stage.inputs if i in producer} for stage in stages}
+    pending = {stage.name: stage for stage in stages}
+    results: dict[str, StageResult] = {}
+
+    def start(stage: Stage) -> StageResult:
+        missing = [name for name in stage.inputs if not (data_root / name).exists()]
+        if missing:
+            print(f"[{stage.name}] missing inputs: {', '.join(missing)}")
+            return StageResult(stage.name, "failed")
+        fingerprint = state.fingerprint(stage, data_root)
+        outputs_exist = all((data_root / name).exists() for name in stage.outputs)
+        if stage.name not in force and outputs_exist and state.stages.get(stage.name) == fingerprint:
+            return StageResult(stage.name, "skipped")
+        print(f"[{stage.name}] running")
+        result = run_script(stage, data_root)
+        if result.status == "ran":
+            state.record(stage, fingerprint)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        running: dict[Future, str] = {}
+        while pending or running:
+            for name, stage in list(pending.items()):
+                states = [results[d].status for d in deps[name] if d in results]
+                if any(s in ("failed", "blocked") for s in states):
+                    results[name] = StageResult(name, "blocked")
+                    del pending[name]
+                elif len(states) == len(deps[name]):
+                    running[pool.submit(start, stage)] = name
+                    del pending[name]
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    return [results[stage.name] for stage in stages]
+
+
+def print_report(results: list[StageResult]) -> None:
+    print(f"{'stage':<22} {'status':<8} {'seconds':>9} {'peak MB':>9}")
+    for r in results:
+        peak = f"{r.peak_rss_mb:.0f}" if r.peak_rss_mb is not None else "-"
+        print(f"{r.name:<22} {r.status:<8} {r.seconds:>9.2f} {peak:>9}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the ML pipeline, skipping stages whose inputs and code are unchanged."
+    )
+    parser.add_argument("targets", nargs="*", help="Stages to bring up to date (default: all).")
+    parser.add_argument(
+        "--data-root", type=Path, default=DATA_ROOT, help="Folder with the MIMIC CSVs and stage outputs."
+    )
+    parser.add_argument("--jobs", type=int, default=2, help="Stages run in parallel when their inputs are ready.")
+    parser.add_argument(
+        "--force", action="append", default=[], metavar="STAGE", help="Rerun this stage even if up to date."
+    )
+    parser.add_argument("--report", type=Path, help="Write per-stage results as JSON.")
+    parser.add_argument("--list", action="store_true", help="Show stages with their inputs and outputs, then exit.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.list:
+        for stage in STAGES:
+            print(f"{stage.name}: {', '.join(stage.inputs)} -> {', '.join(stage.outputs)}")
+        return
+
+    # Stage scripts run with cwd=ml/, so a relative --data-root must be resolved here, once.
+    data_root = args.data_root.resolve()
+    results = run_pipeline(data_root, args.targets, jobs=args.jobs, force=args.force)
+    print_report(results)
+    if args.report:
+        args.report.write_text(json.dumps([asdict(r) for r in results], indent=2), encoding="utf-8")
+    if any(r.status in ("failed", "blocked") for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
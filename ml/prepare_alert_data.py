@@ -1,11 +1,12 @@
-import pandas as pd
 import os
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+from asof_join import AsofSource, asof_join
+from columnar_io import compact_frame, read_frame, write_frame
+from paths import DATA_ROOT
 
-df = pd.read_csv(os.path.join(BASE_PATH, "clean_vitals.csv"))
+BASE_PATH = str(DATA_ROOT)
 
-df["charttime"] = pd.to_datetime(df["charttime"])
+df = read_frame(os.path.join(BASE_PATH, "clean_vitals.cols"))
 
 # Separate each vital
 hr = df[df["itemid"] == 211][["subject_id","hadm_id","charttime","valuenum"]]
@@ -19,44 +20,15 @@ bp = bp.rename(columns={"valuenum":"bp_mean"})
 spo2 = spo2.rename(columns={"valuenum":"spo2"})
 temp = temp.rename(columns={"valuenum":"temp"})
 
-# Sort (required for merge_asof)
-for d in [hr, bp, spo2, temp]:
-    d.sort_values("charttime", inplace=True)
-
-# -----------------------
-# Merge HR + BP (2 hours)
-# -----------------------
-base = pd.merge_asof(
+# Nearest BP / SpO2 / Temp reading within 2 hours of each HR row
+hr = hr.sort_values("charttime")
+base = asof_join(
     hr,
-    bp,
-    on="charttime",
-    by=["subject_id","hadm_id"],
-    direction="nearest",
-    tolerance=pd.Timedelta("2h")
-)
-
-# -----------------------
-# Merge SpO2 (2 hours)
-# -----------------------
-base = pd.merge_asof(
-    base,
-    spo2,
-    on="charttime",
-    by=["subject_id","hadm_id"],
-    direction="nearest",
-    tolerance=pd.Timedelta("2h")
-)
-
-# -----------------------
-# Merge Temp (2 hours)
-# -----------------------
-base = pd.merge_asof(
-    base,
-    temp,
-    on="charttime",
-    by=["subject_id","hadm_id"],
-    direction="nearest",
-    tolerance=pd.Timedelta("2h")
+    [
+        AsofSource(bp, ["bp_mean"], "2h"),
+        AsofSource(spo2, ["spo2"], "2h"),
+        AsofSource(temp, ["temp"], "2h"),
+    ],
 )
 
 # -----------------------
@@ -73,7 +45,7 @@ base[cols] = base.groupby("subject_id")[cols].bfill()
 print(base.head())
 
 # Save
-OUTPUT = os.path.join(BASE_PATH, "alert_ready_data.csv")
-base.to_csv(OUTPUT, index=False)
+OUTPUT = os.path.join(BASE_PATH, "alert_ready_data.cols")
+write_frame(compact_frame(base), OUTPUT)
 
 print("Saved:", OUTPUT)
@@ -1,11 +1,11 @@
-import pandas as pd
 import os
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+from columnar_io import compact_frame, read_frame, write_frame
+from paths import DATA_ROOT
 
-df = pd.read_csv(os.path.join(BASE_PATH, "clean_labs.csv"))
+BASE_PATH = str(DATA_ROOT)
 
-df["charttime"] = pd.to_datetime(df["charttime"])
+df = read_frame(os.path.join(BASE_PATH, "clean_labs.cols"))
 
 LAB_MAP = {
     50811: "wbc",
@@ -13,7 +13,8 @@ LAB_MAP = {
     50813: "lactate"
 }
 
-df["lab"] = df["itemid"].map(LAB_MAP)
+# itemid is categorical in clean_labs.cols; map plain ints so the pivot orders labs by name
+df["lab"] = df["itemid"].astype(int).map(LAB_MAP)
 
 # Pivot
 lab_table = df.pivot_table(
@@ -25,7 +26,7 @@ lab_table = df.pivot_table(
 print(lab_table.head())
 
 # Save
-OUTPUT = os.path.join(BASE_PATH, "lab_ready_data.csv")
-lab_table.to_csv(OUTPUT, index=False)
+OUTPUT = os.path.join(BASE_PATH, "lab_ready_data.cols")
+write_frame(compact_frame(lab_table), OUTPUT)
 
 print("Saved:", OUTPUT)
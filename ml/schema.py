@@ -0,0 +1,156 @@
+"""Compact dtypes for every column the pipeline and backend know about.
+
+    ids              int32 (nullable Int32 when values are missing)
+    vitals, labs     float32
+    missing flags    uint8
+    itemid           categorical over int32 codes
+    units, careunits categorical strings
+    times            datetime64
+
+``read_typed_csv`` applies the registry while parsing (through ``usecols`` and
+``dtype``), so unused columns and per-row Python strings are never materialised. A file with
+values that do not parse as their declared type (a stray "n/a" in a vitals
+column) is read untyped and coerced instead, with bad values becoming missing,
+as the readers did before. ``apply_schema`` casts an existing frame.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class ColumnType:
+    dtype: str
+    # Parser dtype when it differs from ``dtype``. Integers are parsed as float64,
+    # which the C parser reads several times faster than nullable integers and
+    # which holds every int32 exactly, then narrowed.
+    parse: str | None = None
+    # Narrow integer type, used as is (nullable) when the column has gaps and as
+    # its NumPy counterpart otherwise.
+    nullable: str | None = None
+
+    @property
+    def kind(self) -> str:
+        if self.dtype == "datetime64":
+            return "datetime"
+        if self.dtype == "category":
+            return "category"
+        return np.dtype(self.dtype).kind
+
+
+ID = ColumnType("int32", parse="float64", nullable="Int32")
+VALUE = ColumnType("float32")
+FLAG = ColumnType("uint8", parse="float64", nullable="UInt8")
+TIME = ColumnType("datetime64")
+CODE = ColumnType("category", parse="float64", nullable="Int32")
+LABEL = ColumnType("category", parse="category")
+
+COLUMN_TYPES: dict[str, ColumnType] = {
+    **{col: ID for col in ["row_id", "subject_id", "hadm_id", "icustay_id", "stay_id", "cgid", "caregiver_id"]},
+    "itemid": CODE,
+    **{col: TIME for col in ["charttime", "storetime", "intime", "outtime", "updated_at"]},
+    **{col: VALUE for col in ["valuenum", "los"]},
+    **{col: VALUE for col in ["heart_rate", "bp_mean", "spo2", "temp", "creatinine", "lactate", "wbc"]},
+    **{col: VALUE for col in ["hr_avg", "bp_avg", "spo2_avg", "temp_avg", "hr_trend"]},
+    **{f"{col}_missing": FLAG for col in ["spo2", "temp", "creatinine", "lactate", "wbc"]},
+    "future_risk": FLAG,
+    **{col: LABEL for col in ["valueuom", "lab", "first_careunit", "last_careunit", "dbsource"]},
+    # Alert episodes (alert_episodes.py).
+    **{col: TIME for col in ["start", "end", "peak_time"]},
+    "peak_value": VALUE,
+    "count": ID,
+    **{col: LABEL for col in ["alert", "rule"]},
+}
+
+# Significant digits that always survive a decimal -> float32 -> decimal round trip
+# (FLT_DIG), and that always identify a float32 (FLT_DECIMAL_DIG).
+FLOAT32_DIGITS = (6, 9)
+
+
+def widen(values: np.ndarray) -> np.ndarray:
+    """float64 copy of float32 ``values``, each the shortest decimal that rounds to it.
+
+    float64(np.float32(74.05)) is 74.05000305; ``widen`` gives 74.05 back, so
+    features, thresholds and display rounding see the value as written in the
+    source file. Other dtypes are only cast to float64.
+    """
+    values = np.asarray(values)
+    out = values.astype(np.float64)
+    if values.dtype != np.float32:
+        return out
+    flat = out.reshape(-1)
+    todo = np.flatnonzero(np.isfinite(flat) & (flat != 0))
+    for digits in range(FLOAT32_DIGITS[0], FLOAT32_DIGITS[1] + 1):
+        x = flat[todo]
+        # Multiply or divide by an exact power of ten so the rounding step is exact.
+        shift = digits - 1 - np.floor(np.log10(np.abs(x)))
+        scale = 10.0 ** np.abs(shift)
+        candidate = np.where(shift >= 0, np.round(x * scale) / scale, np.round(x / scale) * scale)
+        exact = candidate.astype(np.float32) == x.astype(np.float32)
+        flat[todo[exact]] = candidate[exact]
+        todo = todo[~exact]
+    return out
+
+
+def widen_floats(df: pd.DataFrame) -> pd.DataFrame:
+    """``df`` with every float32 column widened to float64 (see ``widen``)."""
+    floats = [col for col in df.columns if df[col].dtype == np.float32]
+    return df.assign(**{col: widen(df[col].to_numpy()) for col in floats}) if floats else df
+
+
+def csv_columns(path: Path) -> list[str]:
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _finish(series: pd.Series, ctype: ColumnType) -> pd.Series:
+    """Final dtype for a numeric, datetime-like or text column parsed as ``ctype.parse``."""
+    if ctype.kind == "datetime":
+        return pd.to_datetime(series, errors="coerce")
+    if ctype.nullable is not None:
+        nullable = pd.api.types.pandas_dtype(ctype.nullable)
+        series = series.astype(nullable if series.isna().any() else nullable.numpy_dtype)
+        return series.astype("category") if ctype.kind == "category" else series
+    return series.astype(ctype.dtype)
+
+
+def _coerce(series: pd.Series, ctype: ColumnType) -> pd.Series:
+    """Like ``_finish`` for a column of any dtype; unparseable values become missing."""
+    if ctype.nullable is not None or ctype.kind in "fiu":
+        if isinstance(series.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(series.dtype):
+            series = pd.to_numeric(series.astype(object), errors="coerce")
+    return _finish(series, ctype)
+
+
+def apply_schema(df: pd.DataFrame, types: dict[str, ColumnType] = COLUMN_TYPES) -> pd.DataFrame:
+    """Cast the registry's columns of ``df`` to their compact dtypes; other columns are left alone."""
+    columns = {col: _coerce(df[col], types[col]) if col in types else df[col] for col in df.columns}
+    return pd.DataFrame(columns, index=df.index)
+
+
+def read_typed_csv(
+    path: Path,
+    usecols: Sequence[str] | None = None,
+    types: dict[str, ColumnType] = COLUMN_TYPES,
+    **kwargs,
+) -> pd.DataFrame:
+    """``pd.read_csv`` with registry dtypes; ``usecols`` columns missing from the file are skipped."""
+    header = csv_columns(path)
+    columns = header if usecols is None else [col for col in usecols if col in header]
+    dtype = {}
+    for col in columns:
+        ctype = types.get(col)
+        if ctype is not None and ctype.kind != "datetime":
+            dtype[col] = ctype.parse or ctype.dtype
+    try:
+        df = pd.read_csv(path, usecols=columns, dtype=dtype, **kwargs)
+        for col in columns:
+            if col in types:
+                df[col] = _finish(df[col], types[col])
+    except (ValueError, TypeError):
+        return apply_schema(pd.read_csv(path, usecols=columns, low_memory=False, **kwargs), types)
+    return df
+
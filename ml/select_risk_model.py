@@ -0,0 +1,109 @@
+"""Pick the most accurate risk model that fits a latency and size budget, and serve it.
+
+    python ml/select_risk_model.py                               # 20 ms per batch, 5 MB
+    python ml/select_risk_model.py --max-latency-ms 5 --max-size-mb 1 --report select_report.json
+    python ml/select_risk_model.py --dry-run
+
+Run after train_risk_model_v2.py; the pipeline runs it as the stage after
+training. The registry's latest version is the reference forest (a
+FOREST_PARAMS refit when the registry is empty); the smaller candidates of
+ml/compact_models.py are fitted on the same training patients and everything is
+scored on the hashed-patient holdout. The candidate with the best
+holdout AUROC whose p95 ``predict_proba`` latency (per ``--batch-rows`` batch)
+and pickled size fit the budget replaces risk_model_v2.pkl, with
+risk_model_v2.json describing it: candidate, holdout metrics, latency, load
+time and the budget it was chosen under. Exits with status 1, leaving the
+serving model alone, when no candidate fits.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from columnar_io import read_frame
+from compact_models import TARGET, build_candidates, choose, measure
+from features import FEATURE_COLUMNS
+from model_registry import KEY_COLUMNS, ModelRegistry, holdout_mask, publish_serving
+from paths import DATA_ROOT
+from train_risk_model_v2 import FOREST_PARAMS, full_refit
+
+# The backend scores at most this many rows per predict_proba call (InferenceService.max_batch_rows).
+BATCH_ROWS = 1024
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Choose and export a risk model within a latency and size budget.")
+    parser.add_argument("--max-latency-ms", type=float, default=20.0, help="p95 predict_proba time per batch.")
+    parser.add_argument("--max-size-mb", type=float, default=5.0, help="Largest pickled model.")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS, help="Rows per timed predict_proba call.")
+    parser.add_argument("--registry", type=Path, default=DATA_ROOT / "model_registry")
+    parser.add_argument("--report", type=Path, help="Write every candidate's measurements as JSON.")
+    parser.add_argument("--dry-run", action="store_true", help="Measure and choose, but leave the serving model.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    data = read_frame(DATA_ROOT / "ml_training_data_v2.cols", columns=KEY_COLUMNS + FEATURE_COLUMNS + [TARGET])
+    holdout_rows = holdout_mask(data["subject_id"])
+    train, holdout = data[~holdout_rows], data[holdout_rows]
+
+    registry = ModelRegistry(args.registry)
+    latest = registry.latest()
+    if latest is not None and latest.feature_columns == FEATURE_COLUMNS:
+        reference, params, source = registry.model(latest), latest.params or FOREST_PARAMS, latest.name
+    else:
+        params, source = FOREST_PARAMS, "refit"
+        reference = full_refit(train, params)
+    print(f"Reference forest: {source}; {len(train)} training rows, {len(holdout)} holdout rows")
+
+    models = build_candidates(train, reference, params)
+    reports = [
+        measure(name, model, fit_seconds, holdout, batch_rows=args.batch_rows)
+        for name, (model, fit_seconds) in models.items()
+    ]
+    header = ("auroc", "brier", "ece", "MB", "load ms", "p50 ms", "p95 ms")
+    print(f"{'candidate':<14} " + " ".join(f"{h:>7}" for h in header))
+    for r in reports:
+        print(
+            f"{r.name:<14} {r.auroc:>7.4f} {r.brier:>7.4f} {r.ece:>7.4f} {r.size_bytes / 1e6:>7.2f} "
+            f"{r.load_ms:>7.2f} {r.latency_ms_p50:>7.2f} {r.latency_ms_p95:>7.2f}"
+        )
+
+    budget = {"max_latency_ms": args.max_latency_ms, "max_size_mb": args.max_size_mb, "batch_rows": args.batch_rows}
+    chosen = choose(reports, args.max_latency_ms, args.max_size_mb)
+    if args.report:
+        report = {
+            "reference": source,
+            "budget": budget,
+            "chosen": chosen.name if chosen else None,
+            "candidates": [r.as_dict() for r in reports],
+        }
+        args.report.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if chosen is None:
+        print(f"No candidate fits {args.max_latency_ms} ms per {args.batch_rows} rows and {args.max_size_mb} MB")
+        sys.exit(1)
+
+    print(f"Chosen: {chosen.name} ({chosen.kind})")
+    if args.dry_run:
+        return
+    serving_path = DATA_ROOT / "risk_model_v2.pkl"
+    publish_serving(
+        models[chosen.name][0],
+        serving_path,
+        {
+            "source": f"select_risk_model/{chosen.name}",
+            "reference": source,
+            "candidate": chosen.name,
+            "holdout": {"auroc": chosen.auroc, "brier": chosen.brier, "ece": chosen.ece, "rows": int(len(holdout))},
+            "latency_ms": {"p50": chosen.latency_ms_p50, "p95": chosen.latency_ms_p95},
+            "load_ms": chosen.load_ms,
+            "budget": budget,
+        },
+    )
+    print(f"Saved {chosen.name} to: {serving_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,13 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
+import argparse
+from pathlib import Path
 from dotenv import load_dotenv
 
+from alert_outbox import drain
+from paths import DATA_ROOT
+
 # Load environment variables
 load_dotenv()
 
@@ -71,6 +76,26 @@ Generated by AI Monitoring System
         server.quit()
 
         print(f"✅ Alert email sent for Patient {patient_id}")
+        return True
 
     except Exception as e:
         print("❌ Email sending failed:", e)
+        return False
+
+
+def send_queued(record):
+    """Send one alert queued by batch_score.py (see alert_outbox.py)."""
+    return send_alert(record["subject_id"], record["risk_probability"] * 100, record["hr_avg"], record["bp_avg"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send the alerts queued in the outbox since the last run.")
+    parser.add_argument("--outbox", type=Path, default=DATA_ROOT / "alert_outbox.jsonl")
+    args = parser.parse_args()
+
+    sent, remaining = drain(args.outbox, send_queued)
+    print(f"Sent {sent} alert(s); {remaining} still queued")
+
+
+if __name__ == "__main__":
+    main()
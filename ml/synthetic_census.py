@@ -0,0 +1,198 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from alert_episodes import alert_episodes
+from features import FEATURE_COLUMNS, rolling_features
+from future_labels import rule_future_labels
+
+
+CLEAN_COLUMNS = [
+    "subject_id",
+    "hadm_id",
+    "charttime",
+    "heart_rate",
+    "bp_mean",
+    "spo2",
+    "temp",
+    "creatinine",
+    "lactate",
+    "wbc",
+    "spo2_missing",
+    "temp_missing",
+    "creatinine_missing",
+    "lactate_missing",
+    "wbc_missing",
+]
+
+# Fraction of observations where the raw measurement is absent before cleaning.
+# Labs are drawn every few hours and temperature is charted less often than vitals,
+# which mirrors the gaps seen in the MIMIC-III demo extract.
+MISSING_RATES = {
+    "bp_mean": 0.03,
+    "spo2": 0.08,
+    "temp": 0.35,
+    "creatinine": 0.80,
+    "lactate": 0.85,
+    "wbc": 0.80,
+}
+
+CLEAN_DEFAULTS = {"spo2": 97.0, "temp": 36.8, "creatinine": 1.0, "lactate": 1.4, "wbc": 9.0}
+
+
+def _fill_per_patient(values: np.ndarray, default: float) -> np.ndarray:
+    """Forward then backward fill along the observation axis, like clean_full_data.py."""
+    n_patients, n_obs = values.shape
+    valid = ~np.isnan(values)
+
+    idx = np.where(valid, np.arange(n_obs), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    filled = values[np.arange(n_patients)[:, None], idx]
+
+    rev_idx = np.where(valid, np.arange(n_obs), n_obs - 1)[:, ::-1]
+    rev_idx = np.minimum.accumulate(rev_idx, axis=1)[:, ::-1]
+    back = values[np.arange(n_patients)[:, None], rev_idx]
+
+    filled = np.where(np.isnan(filled), back, filled)
+    return np.where(np.isnan(filled), default, filled)
+
+
+def generate_census(
+    n_patients: int,
+    n_observations: int,
+    seed: int = 7,
+    deteriorating_fraction: float = 0.15,
+) -> pd.DataFrame:
+    """Build a cleaned census frame with the full_medical_data_clean.csv schema.
+
+    Each patient gets an hourly series around an individual baseline; a subset
+    deteriorates and then recovers during the stay so that alerts and high-risk
+    tiers show up with future observations behind them.
+    """
+    rng = np.random.default_rng(seed)
+    shape = (n_patients, n_observations)
+    progress = np.sin(np.pi * np.linspace(0.0, 1.0, n_observations))[None, :]
+    declining = (rng.random(n_patients) < deteriorating_fraction)[:, None] * progress
+
+    def walk(base: np.ndarray, scale: float) -> np.ndarray:
+        return base[:, None] + np.cumsum(rng.normal(0.0, scale, shape), axis=1)
+
+    raw = {
+        "heart_rate": walk(rng.normal(86, 12, n_patients), 2.5) + 45 * declining,
+        "bp_mean": walk(rng.normal(80, 10, n_patients), 2.0) - 30 * declining,
+        "spo2": np.minimum(walk(rng.normal(96.5, 1.5, n_patients), 0.4) - 9 * declining, 100.0),
+        "temp": walk(rng.normal(36.9, 0.4, n_patients), 0.08) + 1.5 * declining,
+        "creatinine": np.abs(walk(rng.lognormal(0.0, 0.4, n_patients), 0.04) + 1.2 * declining),
+        "lactate": np.abs(walk(rng.lognormal(0.3, 0.35, n_patients), 0.05) + 2.5 * declining),
+        "wbc": np.abs(walk(rng.normal(9.5, 3.0, n_patients), 0.2) + 6 * declining),
+    }
+
+    frame: dict[str, np.ndarray] = {}
+    for col, values in raw.items():
+        rate = MISSING_RATES.get(col)
+        if rate:
+            values = np.where(rng.random(shape) < rate, np.nan, values)
+        if col in CLEAN_DEFAULTS:
+            frame[f"{col}_missing"] = np.isnan(values).astype(int)
+            values = _fill_per_patient(values, CLEAN_DEFAULTS[col])
+        frame[col] = np.round(values, 2)
+
+    subject_ids = np.arange(10_000, 10_000 + n_patients)
+    start = pd.Timestamp("2130-01-01") + pd.to_timedelta(rng.integers(0, 24 * 365, n_patients), unit="h")
+    hours = pd.to_timedelta(np.arange(n_observations), unit="h")
+    charttime = (start.values[:, None] + hours.values[None, :]).ravel()
+
+    df = pd.DataFrame(
+        {
+            "subject_id": np.repeat(subject_ids, n_observations),
+            "hadm_id": np.repeat(subject_ids * 10 + 1, n_observations),
+            "charttime": pd.to_datetime(charttime),
+            **{col: values.ravel() for col, values in frame.items()},
+        }
+    )
+    return df[CLEAN_COLUMNS]
+
+
+def build_alert_episodes(df: pd.DataFrame) -> pd.DataFrame:
+    """Reproduce alert_engine.py output (alert episodes)."""
+    return alert_episodes(df.sort_values(["subject_id", "charttime"], kind="stable", ignore_index=True))
+
+
+def build_dummy_model(df: pd.DataFrame, n_estimators: int = 20, sample_size: int = 50_000, seed: int = 7):
+    """Fit a small RandomForest on synthetic features so scoring cost resembles production."""
+    from sklearn.ensemble import RandomForestClassifier
+
+    df = df.sort_values(["subject_id", "charttime"])
+    features = rolling_features(df)
+    features["future_risk"] = rule_future_labels(df, ("future_risk",))["future_risk"]
+    features = features.dropna()
+    if len(features) > sample_size:
+        features = features.sample(sample_size, random_state=seed)
+
+    model = RandomForestClassifier(n_estimators=n_estimators, max_depth=8, random_state=seed, n_jobs=-1)
+    model.fit(features[FEATURE_COLUMNS], features["future_risk"])
+    return model
+
+
+def write_census(
+    output_dir: Path,
+    n_patients: int,
+    n_observations: int,
+    seed: int = 7,
+    with_model: bool = True,
+    model_trees: int = 20,
+) -> dict[str, Path]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    df = generate_census(n_patients, n_observations, seed=seed)
+
+    paths = {
+        "full_data": output_dir / "full_medical_data_clean.csv",
+        "alerts": output_dir / "alert_episodes.csv",
+    }
+    df.to_csv(paths["full_data"], index=False, float_format="%.2f")
+    build_alert_episodes(df).to_csv(paths["alerts"], index=False, float_format="%.2f")
+
+    if with_model:
+        import joblib
+
+        paths["model"] = output_dir / "risk_model_v2.pkl"
+        joblib.dump(build_dummy_model(df, n_estimators=model_trees, seed=seed), paths["model"])
+    return paths
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic ICU census with the full_medical_data_clean.csv schema."
+    )
+    parser.add_argument("--patients", type=int, default=1_000, help="Number of patients (N).")
+    parser.add_argument("--observations", type=int, default=24, help="Hourly observations per patient (M).")
+    parser.add_argument(
+        "--output-dir",
+        default="data/synthetic",
+        help="Folder receiving full_medical_data_clean.csv, alert_episodes.csv and risk_model_v2.pkl.",
+    )
+    parser.add_argument("--seed", type=int, default=7, help="Random seed.")
+    parser.add_argument("--model-trees", type=int, default=20, help="Trees in the dummy RandomForest.")
+    parser.add_argument("--no-model", action="store_true", help="Skip fitting the dummy model.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    paths = write_census(
+        Path(args.output_dir),
+        args.patients,
+        args.observations,
+        seed=args.seed,
+        with_model=not args.no_model,
+        model_trees=args.model_trees,
+    )
+    for name, path in paths.items():
+        print(f"Saved {name}: {path}")
+    print(f"Rows: {args.patients * args.observations} | Patients: {args.patients}")
+
+
+if __name__ == "__main__":
+    main()
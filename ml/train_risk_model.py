@@ -1,4 +1,3 @@
-import pandas as pd
 import os
 import joblib
 
@@ -6,11 +5,14 @@ from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, accuracy_score
 
+from columnar_io import read_frame
+from paths import DATA_ROOT
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+
+BASE_PATH = str(DATA_ROOT)
 
 # Load training data
-df = pd.read_csv(os.path.join(BASE_PATH, "ml_training_data.csv"))
+df = read_frame(os.path.join(BASE_PATH, "ml_training_data.cols"))
 
 X = df[["hr_avg", "bp_avg", "hr_trend"]]
 y = df["future_risk"]
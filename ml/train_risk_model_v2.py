@@ -1,46 +1,203 @@
-import pandas as pd
+"""Train the risk model, refitting from scratch or growing the last version with new rows.
+
+    python ml/train_risk_model_v2.py                   # auto: incremental when possible
+    python ml/train_risk_model_v2.py --mode full
+    python ml/train_risk_model_v2.py --mode incremental --compare
+
+Every run is stored in the model registry (ml/model_registry.py); the serving
+model, risk_model_v2.pkl, is left to ml/select_risk_model.py (the next pipeline
+stage) unless ``--serve`` publishes the new version there directly. An
+incremental update adds ``--trees`` trees fitted
+(``warm_start``) on the labelled rows after the parent version's watermark
+only; the forest keeps its newest ``--max-trees`` trees. Auto mode refits from
+scratch when there is no version yet, the feature set changed, or after
+``--refit-after`` incremental updates in a row. Patients are split into train
+and holdout by a hash of subject_id, so the holdout set is the same for every
+version; ``--compare`` also times a full refit on the same data and records its
+holdout metrics next to the update's.
+"""
+
+import argparse
 import os
-from sklearn.model_selection import train_test_split
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, accuracy_score
-import joblib
+from sklearn.metrics import accuracy_score, brier_score_loss, classification_report, roc_auc_score
+from sklearn.utils.class_weight import compute_class_weight
+
+from columnar_io import read_frame
+from features import FEATURE_COLUMNS
+from model_registry import KEY_COLUMNS, ModelRegistry, holdout_mask, labelled_mask, make_watermark, unseen_rows
+from paths import DATA_ROOT
+
+BASE_PATH = str(DATA_ROOT)
+TARGET = "future_risk"
+
+# Full refits reuse the latest version's parameters (e.g. from tune_risk_model.py) when there is one.
+FOREST_PARAMS = {"n_estimators": 200, "max_depth": 10, "random_state": 42, "class_weight": "balanced"}
+TREES_PER_UPDATE = 20
+MAX_TREES = 400
+REFIT_AFTER = 7
+
+
+def full_refit(train: pd.DataFrame, params: dict[str, Any] | None = None) -> RandomForestClassifier:
+    model = RandomForestClassifier(**(params or FOREST_PARAMS))
+    return model.fit(train[FEATURE_COLUMNS], train[TARGET])
+
+
+def incremental_update(
+    model: RandomForestClassifier, new_rows: pd.DataFrame, trees: int = TREES_PER_UPDATE, max_trees: int = MAX_TREES
+) -> RandomForestClassifier:
+    """Add ``trees`` trees fitted on ``new_rows`` to ``model`` (in place), keeping the newest ``max_trees``."""
+    y = new_rows[TARGET].to_numpy()
+    # "balanced" would be recomputed on the new rows anyway; passing it as weights
+    # avoids scikit-learn's warm_start warning about presets.
+    weights = compute_class_weight("balanced", classes=model.classes_, y=y)
+    model.set_params(
+        warm_start=True, n_estimators=len(model.estimators_) + trees, class_weight=dict(zip(model.classes_, weights))
+    )
+    model.fit(new_rows[FEATURE_COLUMNS], y)
+    model.set_params(warm_start=False, class_weight="balanced")
+    if len(model.estimators_) > max_trees:
+        model.estimators_ = model.estimators_[-max_trees:]
+        model.n_estimators = max_trees
+    return model
+
+
+def evaluate(model: RandomForestClassifier, holdout: pd.DataFrame) -> dict[str, float]:
+    y = holdout[TARGET].to_numpy()
+    prob = model.predict_proba(holdout[FEATURE_COLUMNS])[:, 1]
+    return {
+        "auroc": round(float(roc_auc_score(y, prob)), 4) if len(np.unique(y)) == 2 else float("nan"),
+        "accuracy": round(float(accuracy_score(y, prob >= 0.5)), 4),
+        "brier": round(float(brier_score_loss(y, prob)), 4),
+        "rows": int(len(y)),
+    }
+
+
+def choose_mode(mode: str, registry: ModelRegistry, refit_after: int) -> str:
+    if mode != "auto":
+        return mode
+    latest = registry.latest()
+    if latest is None or latest.feature_columns != FEATURE_COLUMNS:
+        return "full"
+    return "full" if registry.incremental_streak() >= refit_after else "incremental"
+
+
+def train(
+    data: pd.DataFrame,
+    registry: ModelRegistry,
+    serving_path: Path | None,
+    mode: str = "auto",
+    trees: int = TREES_PER_UPDATE,
+    max_trees: int = MAX_TREES,
+    refit_after: int = REFIT_AFTER,
+    compare: bool = False,
+    params: dict[str, Any] | None = None,
+):
+    """One training run over ``data`` (ml_training_data_v2 rows); returns the new version or None if up to date.
 
-BASE_PATH = r"C:\Users\LENOVO\Desktop\icu_project\data\mimic-iii-clinical-database-demo-1.4"
+    ``params`` are the forest's constructor arguments for a full refit (by default
+    the latest version's, or FOREST_PARAMS); incremental updates keep the parent's.
+    """
+    holdout_rows = holdout_mask(data["subject_id"])
+    holdout = data[holdout_rows]
+    candidates = data[~holdout_rows]
+    labelled = candidates[labelled_mask(candidates)]
+    mode = choose_mode(mode, registry, refit_after)
+    parent = registry.latest()
+    if mode == "incremental" or params is None:
+        params = (parent.params if parent is not None else None) or FOREST_PARAMS
 
-# Load dataset
-df = pd.read_csv(os.path.join(BASE_PATH, "ml_training_data_v2.csv"))
+    if mode == "incremental":
+        if parent is None:
+            raise ValueError("No model version to update; run a full refit first")
+        fit_rows = labelled[unseen_rows(labelled, registry.watermark(parent))]
+        if fit_rows.empty:
+            print(f"No newly labelled rows since {parent.name}; nothing to train.")
+            return None
+        if fit_rows[TARGET].nunique() < 2:
+            print(f"Newly labelled rows since {parent.name} hold one class only; skipping the update.")
+            return None
+        model = registry.model(parent)
+        started = time.perf_counter()
+        incremental_update(model, fit_rows, trees=trees, max_trees=max_trees)
+    else:
+        # A full refit also uses rows whose labels may still change; the watermark stops before them.
+        fit_rows = candidates
+        started = time.perf_counter()
+        model = full_refit(fit_rows, params)
+    train_seconds = time.perf_counter() - started
 
-# Features & Target
-X = df.drop("future_risk", axis=1)
-y = df["future_risk"]
+    metrics = evaluate(model, holdout)
+    comparison = None
+    if compare and mode == "incremental":
+        started = time.perf_counter()
+        refit = full_refit(candidates, params)
+        comparison = {"train_seconds": round(time.perf_counter() - started, 3), "metrics": evaluate(refit, holdout)}
 
-# Split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
+    print(f"Trained ({mode}) on {len(fit_rows)} rows in {train_seconds:.2f}s; holdout: {metrics}")
+    if comparison:
+        print(f"Full refit for comparison: {comparison['train_seconds']:.2f}s; holdout: {comparison['metrics']}")
+    if len(holdout):
+        print("\nClassification Report:")
+        print(classification_report(holdout[TARGET], model.predict(holdout[FEATURE_COLUMNS]), zero_division=0))
 
-# Train model
-model = RandomForestClassifier(
-    n_estimators=200,
-    max_depth=10,
-    random_state=42,
-    class_weight="balanced"
-)
+    return registry.publish(
+        model,
+        make_watermark(labelled),
+        serving_path=serving_path,
+        mode=mode,
+        parent=parent.version if mode == "incremental" else None,
+        feature_columns=list(FEATURE_COLUMNS),
+        n_estimators=len(model.estimators_),
+        train_rows=len(fit_rows),
+        seen_rows=len(labelled),
+        train_seconds=round(train_seconds, 3),
+        metrics=metrics,
+        comparison=comparison,
+        params=params,
+    )
 
-model.fit(X_train, y_train)
 
-# Predict
-y_pred = model.predict(X_test)
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Train risk_model_v2, fully or incrementally.")
+    parser.add_argument("--mode", choices=["auto", "full", "incremental"], default="auto")
+    parser.add_argument("--trees", type=int, default=TREES_PER_UPDATE, help="Trees added by an incremental update.")
+    parser.add_argument("--max-trees", type=int, default=MAX_TREES, help="Forest size cap; oldest trees go first.")
+    parser.add_argument(
+        "--refit-after", type=int, default=REFIT_AFTER, help="Auto mode refits after this many incremental updates."
+    )
+    parser.add_argument("--compare", action="store_true", help="Also time a full refit and record its metrics.")
+    parser.add_argument("--registry", type=Path, default=DATA_ROOT / "model_registry")
+    parser.add_argument(
+        "--serve", action="store_true", help="Also publish the new version as risk_model_v2.pkl, skipping selection."
+    )
+    return parser.parse_args()
 
-# Evaluate
-acc = accuracy_score(y_test, y_pred)
 
-print("Model Accuracy:", acc)
-print("\nClassification Report:")
-print(classification_report(y_test, y_pred))
+def main() -> None:
+    args = parse_args()
+    columns = KEY_COLUMNS + FEATURE_COLUMNS + [TARGET]
+    data = read_frame(os.path.join(BASE_PATH, "ml_training_data_v2.cols"), columns=columns)
+    model_path = os.path.join(BASE_PATH, "risk_model_v2.pkl")
+    version = train(
+        data,
+        ModelRegistry(args.registry),
+        Path(model_path) if args.serve else None,
+        mode=args.mode,
+        trees=args.trees,
+        max_trees=args.max_trees,
+        refit_after=args.refit_after,
+        compare=args.compare,
+    )
+    if version is not None:
+        print(f"Saved model {version.name} to: {model_path if args.serve else args.registry / version.name}")
 
-# Save
-MODEL_PATH = os.path.join(BASE_PATH, "risk_model_v2.pkl")
-joblib.dump(model, MODEL_PATH)
 
-print("Saved model to:", MODEL_PATH)
+if __name__ == "__main__":
+    main()
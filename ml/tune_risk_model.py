@@ -0,0 +1,219 @@
+"""Patient-grouped cross-validation and a parallel hyperparameter search for the risk model.
+
+    python ml/tune_risk_model.py --folds 5 --jobs 4 --report tune_report.json
+    python ml/tune_risk_model.py --param max_depth=6,10,none --param min_samples_leaf=1,5 --publish
+
+All rows of a patient fall in the same fold (GroupKFold on subject_id), and the
+hashed-patient holdout of train_risk_model_v2.py stays out of the search. The
+feature matrix, labels and fold numbers are written once as .npy files that
+every worker memory-maps, so a task only sends a candidate's parameters and a
+fold number to the pool. Each candidate x fold fit is one single-threaded task
+(``n_jobs`` is not a searchable parameter; ``--jobs`` sets the parallelism).
+
+The report has per-fold AUROC, Brier score and accuracy, and per candidate the
+mean fit time, predict latency and pickled size. The best candidate (mean
+AUROC) is refit on all search rows and scored on the holdout. ``--publish``
+stores that refit in the model registry and as risk_model_v2.pkl, and later
+full refits of train_risk_model_v2.py keep its parameters.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, brier_score_loss, roc_auc_score
+from sklearn.model_selection import GroupKFold
+
+from columnar_io import read_frame
+from features import FEATURE_COLUMNS
+from model_registry import KEY_COLUMNS, ModelRegistry, holdout_mask
+from paths import DATA_ROOT
+from train_risk_model_v2 import FOREST_PARAMS, TARGET, evaluate, full_refit, train
+
+DEFAULT_GRID: dict[str, list[Any]] = {
+    "n_estimators": [100, 200],
+    "max_depth": [6, 10, None],
+    "min_samples_leaf": [1, 5],
+}
+
+# Memory-mapped arrays of the search rows, opened once per worker process.
+_shared: dict[str, np.ndarray] = {}
+
+
+def parse_value(text: str) -> Any:
+    if text.lower() == "none":
+        return None
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def auroc_rank(summary: dict[str, Any]) -> float:
+    """Sort key for candidates by mean AUROC; NaN (no fold had both classes) ranks last."""
+    auroc = summary["auroc_mean"]
+    return float("-inf") if np.isnan(auroc) else auroc
+
+
+def candidates(grid: dict[str, list[Any]]) -> list[dict[str, Any]]:
+    """Every combination of ``grid`` over FOREST_PARAMS."""
+    names = list(grid)
+    return [{**FOREST_PARAMS, **dict(zip(names, values))} for values in itertools.product(*grid.values())]
+
+
+def share_arrays(folder: Path, search: pd.DataFrame, folds: int) -> None:
+    """Write X (float32, C order), y and each row's fold number where workers can map them."""
+    fold_of_row = np.empty(len(search), dtype=np.int8)
+    splitter = GroupKFold(n_splits=folds)
+    for fold, (_, test) in enumerate(splitter.split(search, groups=search["subject_id"])):
+        fold_of_row[test] = fold
+    np.save(folder / "X.npy", np.ascontiguousarray(search[FEATURE_COLUMNS].to_numpy(dtype=np.float32)))
+    np.save(folder / "y.npy", search[TARGET].to_numpy(dtype=np.int8))
+    np.save(folder / "fold.npy", fold_of_row)
+
+
+def _open_arrays(folder: str) -> None:
+    for name in ("X", "y", "fold"):
+        _shared[name] = np.load(Path(folder) / f"{name}.npy", mmap_mode="r")
+
+
+def fit_fold(candidate: int, params: dict[str, Any], fold: int) -> dict[str, Any]:
+    """Fit one candidate on every fold but ``fold`` and score it on ``fold``; runs in a worker."""
+    X, y, fold_of_row = _shared["X"], _shared["y"], _shared["fold"]
+    test = np.asarray(fold_of_row == fold)
+    model = RandomForestClassifier(**params, n_jobs=1)
+    started = time.perf_counter()
+    model.fit(X[~test], y[~test])
+    fit_seconds = time.perf_counter() - started
+
+    X_test, y_test = X[test], np.asarray(y[test])
+    started = time.perf_counter()
+    prob = model.predict_proba(X_test)[:, 1]
+    predict_seconds = time.perf_counter() - started
+    return {
+        "candidate": candidate,
+        "fold": fold,
+        "rows": int(test.sum()),
+        "auroc": float(roc_auc_score(y_test, prob)) if len(np.unique(y_test)) == 2 else float("nan"),
+        "brier": float(brier_score_loss(y_test, prob)),
+        "accuracy": float(accuracy_score(y_test, prob >= 0.5)),
+        "fit_seconds": fit_seconds,
+        "predict_us_per_row": predict_seconds / max(len(y_test), 1) * 1e6,
+        "model_bytes": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+    }
+
+
+def search(search_rows: pd.DataFrame, grid: dict[str, list[Any]], folds: int, jobs: int) -> list[dict[str, Any]]:
+    params = candidates(grid)
+    with tempfile.TemporaryDirectory(prefix="tune-") as folder:
+        share_arrays(Path(folder), search_rows, folds)
+        with ProcessPoolExecutor(max_workers=max(jobs, 1), initializer=_open_arrays, initargs=(folder,)) as pool:
+            futures = [pool.submit(fit_fold, i, p, fold) for i, p in enumerate(params) for fold in range(folds)]
+            results = [future.result() for future in futures]
+
+    summary = []
+    for i, p in enumerate(params):
+        rows = pd.DataFrame([r for r in results if r["candidate"] == i])
+        summary.append(
+            {
+                "candidate": i,
+                "params": p,
+                "auroc_mean": round(float(rows["auroc"].mean()), 4),
+                "auroc_std": round(float(rows["auroc"].std(ddof=0)), 4),
+                "brier_mean": round(float(rows["brier"].mean()), 4),
+                "accuracy_mean": round(float(rows["accuracy"].mean()), 4),
+                "fit_seconds_mean": round(float(rows["fit_seconds"].mean()), 3),
+                "predict_us_per_row": round(float(rows["predict_us_per_row"].mean()), 2),
+                "model_mb": round(float(rows["model_bytes"].mean()) / 1e6, 2),
+                "folds": rows.drop(columns="candidate").round(4).to_dict("records"),
+            }
+        )
+    return summary
+
+
+def print_summary(summary: list[dict[str, Any]], grid: dict[str, list[Any]]) -> None:
+    names = list(grid)
+    header = " ".join(f"{name:>16}" for name in names)
+    print(f"{header} {'auroc':>13} {'brier':>7} {'fit s':>7} {'us/row':>7} {'MB':>6}")
+    for s in sorted(summary, key=auroc_rank, reverse=True):
+        values = " ".join(f"{str(s['params'][name]):>16}" for name in names)
+        auroc = f"{s['auroc_mean']:.4f}±{s['auroc_std']:.3f}"
+        print(
+            f"{values} {auroc:>13} {s['brier_mean']:>7.4f} {s['fit_seconds_mean']:>7.2f} "
+            f"{s['predict_us_per_row']:>7.2f} {s['model_mb']:>6.2f}"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Grouped cross-validation and hyperparameter search.")
+    parser.add_argument("--folds", type=int, default=5, help="GroupKFold splits over subject_id.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2",
+        help="Values to search for one RandomForestClassifier argument (replaces the default grid).",
+    )
+    parser.add_argument("--report", type=Path, help="Write the per-fold and per-candidate results as JSON.")
+    parser.add_argument("--publish", action="store_true", help="Register the refit best model and serve it.")
+    parser.add_argument("--registry", type=Path, default=DATA_ROOT / "model_registry")
+    args = parser.parse_args()
+    if any(spec.partition("=")[0] == "n_jobs" for spec in args.param):
+        # Every fit runs single-threaded; parallelism comes from --jobs worker processes.
+        parser.error("n_jobs cannot be searched; use --jobs for parallel fits")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    grid = DEFAULT_GRID
+    if args.param:
+        grid = {}
+        for spec in args.param:
+            name, _, values = spec.partition("=")
+            grid[name] = [parse_value(v) for v in values.split(",")]
+
+    data = read_frame(DATA_ROOT / "ml_training_data_v2.cols", columns=KEY_COLUMNS + FEATURE_COLUMNS + [TARGET])
+    holdout_rows = holdout_mask(data["subject_id"])
+    search_rows = data[~holdout_rows].reset_index(drop=True)
+    print(f"Searching {len(candidates(grid))} candidates x {args.folds} folds on {len(search_rows)} rows")
+
+    started = time.perf_counter()
+    summary = search(search_rows, grid, args.folds, args.jobs)
+    print(f"Search took {time.perf_counter() - started:.1f}s")
+    print_summary(summary, grid)
+
+    best = max(summary, key=auroc_rank)
+    if args.publish:
+        registry = ModelRegistry(args.registry)
+        version = train(data, registry, DATA_ROOT / "risk_model_v2.pkl", mode="full", params=best["params"])
+        metrics = version.metrics
+        model_bytes = (registry.root / version.name / "model.pkl").stat().st_size
+        print(f"Published {version.name}")
+    else:
+        model = full_refit(search_rows, best["params"])
+        metrics = evaluate(model, data[holdout_rows])
+        model_bytes = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    final = {"params": best["params"], "holdout": metrics, "model_mb": round(model_bytes / 1e6, 2)}
+    print(f"Best: {best['params']}\nRefit on all search rows: holdout {metrics}, {final['model_mb']} MB")
+
+    if args.report:
+        report = {"folds": args.folds, "grid": grid, "candidates": summary, "final": final}
+        args.report.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()